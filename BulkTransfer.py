@@ -0,0 +1,1482 @@
+"""
+BulkTransfer.py - Bulk data movement between files and database tables
+
+This module contains the building blocks used by the import and export actions:
+- ColumnTypeMapper: converts text read from a file into values matching the table columns
+- DelimitedFileReader: streams a CSV/TSV file in chunks
+- BulkLoader and its subclasses: fastest append path of each driver
+  (PostgreSQL COPY FROM STDIN, oracledb array DML with batch errors,
+  pyodbc fast_executemany for SQL Server, sqlite3 executemany)
+- Exporter and its subclasses: fastest way of each driver to write a query result to a file
+  (PostgreSQL COPY TO STDOUT, oracledb large array fetch with numbers fetched as strings,
+  sqlite3 direct cursor iteration)
+- TablePartitioner / ParallelTableExport: range-partitioned extraction over pooled connections
+- ParallelRowCount: exact row counts of several tables over pooled connections
+- TableCopy: pipelined copy of a table from one connection into a bulk loader on another
+- SnapshotStore: per-connection local SQLite database of table and query result snapshots
+- TableDiff: verification of a table copy by range checksums, bisecting mismatching ranges
+- SchemaCatalog / SchemaDiff: structure comparison of two schemas and the DDL delta between them
+
+The loader and exporter matching the active connection are created by
+DBConnection.get_bulk_loader() and DBConnection.get_exporter().
+"""
+
+import bisect
+import csv
+import hashlib
+import io
+import itertools
+import json
+import math
+import os
+import queue
+import re
+import shutil
+import sqlite3
+import threading
+from datetime import date, datetime, time
+from decimal  import Decimal, InvalidOperation
+from typing   import List, Tuple
+
+from QueryManager import QueriesSQLite
+from ResultStore  import ResultDiff
+
+
+# ======================================================================
+# TYPE MAPPING
+# ======================================================================
+
+class ColumnTypeMapper:
+    """
+    Converts the text values of a file row into Python values the driver can bind,
+    using the column types returned by Queries.get_table_structure()
+    (fieldname, type, data_length, data_precision, data_scale, nullable).
+    Empty fields are loaded as NULL.
+    """
+
+    INTEGER_TYPE  = re.compile(r"^(TINY|SMALL|MEDIUM|BIG)?INT(EGER)?\d*$|^(SMALL|BIG)?SERIAL\d*$")
+    DECIMAL_TYPES = {"NUMBER", "NUMERIC", "DECIMAL", "DEC", "MONEY", "SMALLMONEY"}
+    FLOAT_TYPES   = {"FLOAT", "FLOAT4", "FLOAT8", "REAL", "DOUBLE", "DOUBLE PRECISION", "BINARY_FLOAT", "BINARY_DOUBLE"}
+    BOOLEAN_TYPES = {"BOOLEAN", "BOOL", "BIT"}
+    BINARY_TYPES  = {"BLOB", "BYTEA", "RAW", "LONG RAW", "BINARY", "VARBINARY", "IMAGE"}
+    TRUE_VALUES   = {"1", "true", "t", "y", "yes"}
+
+    # Categories of the cursor.description type codes: psycopg2 type OIDs, oracledb
+    # type names and the Python types of pyodbc
+    TYPE_CODE_OIDS  = {16: "boolean", 17: "binary", 20: "integer", 21: "integer", 23: "integer",
+                       700: "float", 701: "float", 1700: "decimal", 1082: "date", 1083: "time",
+                       1114: "timestamp", 1184: "timestamp"}
+    TYPE_CODE_NAMES = {"DB_TYPE_NUMBER": "decimal", "DB_TYPE_BINARY_INTEGER": "integer",
+                       "DB_TYPE_BINARY_FLOAT": "float", "DB_TYPE_BINARY_DOUBLE": "float",
+                       "DB_TYPE_DATE": "timestamp", "DB_TYPE_TIMESTAMP": "timestamp",
+                       "DB_TYPE_TIMESTAMP_TZ": "timestamp", "DB_TYPE_TIMESTAMP_LTZ": "timestamp",
+                       "DB_TYPE_BOOLEAN": "boolean", "DB_TYPE_RAW": "binary", "DB_TYPE_BLOB": "binary"}
+    TYPE_CODE_TYPES = {bool: "boolean", int: "integer", float: "float", Decimal: "decimal", date: "date",
+                       datetime: "timestamp", time: "time", bytes: "binary", bytearray: "binary"}
+
+    def __init__(self, structure_rows):
+        self.columns    = [row[0] for row in structure_rows]
+        self.converters = [self._converter_for(row[1], row[4]) for row in structure_rows]
+
+    @staticmethod
+    def base_type(type_name) -> str:
+        """Upper-case type name without its length/precision, e.g. 'VARCHAR(20)' -> 'VARCHAR'."""
+        return re.sub(r"\(.*$", "", str(type_name or "")).strip().upper()
+
+    @classmethod
+    def category(cls, type_name, scale=None) -> str:
+        """
+        Generic category of a column type: integer, decimal, float, boolean,
+        date, timestamp, time, binary or text.
+        """
+        base = cls.base_type(type_name)
+        if cls.INTEGER_TYPE.match(base):
+            return "integer"
+        if base in cls.DECIMAL_TYPES:
+            return "integer" if scale == 0 else "decimal"
+        if base in cls.FLOAT_TYPES:
+            return "float"
+        if base in cls.BOOLEAN_TYPES:
+            return "boolean"
+        if base == "DATE":
+            return "date"
+        if base.startswith("TIMESTAMP") or base in ("DATETIME", "DATETIME2", "SMALLDATETIME", "DATETIMEOFFSET"):
+            return "timestamp"
+        if base == "TIME":
+            return "time"
+        if base in cls.BINARY_TYPES:
+            return "binary"
+        return "text"
+
+    @classmethod
+    def category_of_type_code(cls, type_code, scale=None):
+        """
+        Category of a result column from its cursor.description type code, None when
+        unknown (text types, or sqlite3, which gives no type codes).
+        """
+        name = getattr(type_code, "name", None)  # oracledb DbType
+        if name is not None:
+            category = cls.TYPE_CODE_NAMES.get(name)
+        elif isinstance(type_code, type):
+            category = cls.TYPE_CODE_TYPES.get(type_code)
+        else:
+            category = cls.TYPE_CODE_OIDS.get(type_code)
+        if category == "decimal" and scale == 0:
+            return "integer"
+        return category
+
+    def _converter_for(self, type_name, scale):
+        return {
+            "integer":   int,
+            "decimal":   Decimal,
+            "float":     float,
+            "boolean":   lambda value: value.strip().lower() in self.TRUE_VALUES,
+            "date":      self._to_date,
+            "timestamp": datetime.fromisoformat,
+            "time":      time.fromisoformat,
+        }.get(self.category(type_name, scale))  # text, binary and unknown types are bound as strings
+
+    @staticmethod
+    def _to_date(value):
+        # Oracle DATE values carry a time part; keep it when the file has one
+        return date.fromisoformat(value) if len(value) <= 10 else datetime.fromisoformat(value)
+
+    def convert_row(self, row) -> tuple:
+        """Convert one row of text values. Raises ValueError if a value does not fit its column."""
+        if len(row) != len(self.converters):
+            raise ValueError(f"expected {len(self.converters)} field(s), found {len(row)}")
+        values = []
+        for column, converter, value in zip(self.columns, self.converters, row):
+            if value == "":
+                values.append(None)
+            elif converter is None:
+                values.append(value)
+            else:
+                try:
+                    values.append(converter(value.strip()))
+                except (ValueError, InvalidOperation):
+                    raise ValueError(f"invalid value {value!r} for column {column}")
+        return tuple(values)
+
+
+# ======================================================================
+# FILE READER
+# ======================================================================
+
+class DelimitedFileReader:
+    """Streams the records of a CSV/TSV file in chunks, reporting how far into the file it is."""
+
+    def __init__(self, path, delimiter=None, encoding="utf-8-sig"):
+        self.path         = path
+        self.total_bytes  = os.path.getsize(path)
+        self.delimiter    = delimiter or self.guess_delimiter(path)
+        self.records_read = 0
+        self._file        = open(path, "r", newline="", encoding=encoding)
+        self._reader      = csv.reader(self._file, delimiter=self.delimiter)
+        self._peeked      = None
+
+    @staticmethod
+    def guess_delimiter(path) -> str:
+        """Tab for .tsv/.tab files, otherwise the most frequent of , ; | and tab on the first line."""
+        if os.path.splitext(path)[1].lower() in (".tsv", ".tab"):
+            return "\t"
+        with open(path, "r", newline="", encoding="utf-8-sig", errors="replace") as f:
+            first_line = f.readline()
+        return max([",", "\t", ";", "|"], key=first_line.count)
+
+    def peek_row(self):
+        """Return the next record without consuming it (None at end of file)."""
+        if self._peeked is None:
+            self._peeked = next(self._reader, None)
+        return self._peeked
+
+    def skip_row(self):
+        """Consume the next record without counting it, e.g. a header line."""
+        if self._peeked is None:
+            next(self._reader, None)
+        self._peeked = None
+
+    def read_chunk(self, size) -> List[List[str]]:
+        """Read up to *size* records; an empty list means end of file."""
+        rows = []
+        if self._peeked:
+            rows.append(self._peeked)
+        self._peeked = None
+        for row in self._reader:
+            if row:  # blank lines carry no record
+                rows.append(row)
+                if len(rows) >= size:
+                    break
+        self.records_read += len(rows)
+        return rows
+
+    def bytes_read(self) -> int:
+        # Position of the underlying binary buffer: approximate, but enough for a progress bar
+        return self._file.buffer.tell()
+
+    def close(self):
+        self._file.close()
+
+
+# ======================================================================
+# BULK LOADERS
+# ======================================================================
+
+class BulkLoader:
+    """
+    Appends rows of text values to a table with cursor.executemany().
+    Subclasses plug in the fastest path of their driver. Rows that cannot be
+    converted are skipped and reported in self.errors as (record number, message).
+    Committing is left to the caller.
+    """
+
+    paramstyle = "qmark"
+
+    def __init__(self, connection, queries, schema, table, structure_rows):
+        self.connection  = connection
+        self.queries     = queries
+        self.table_name  = queries.get_qualified_name(schema, table)
+        self.mapper      = ColumnTypeMapper(structure_rows)
+        self.columns     = self.mapper.columns
+        self.rows_loaded = 0
+        self.errors: List[Tuple[int, str]] = []
+        self.cursor      = connection.cursor()
+
+    def column_list(self) -> str:
+        return ", ".join(self.queries.quote_identifier(column) for column in self.columns)
+
+    def placeholders(self) -> str:
+        if self.paramstyle == "numeric":
+            return ", ".join(f":{i}" for i in range(1, len(self.columns) + 1))
+        if self.paramstyle == "format":
+            return ", ".join(["%s"] * len(self.columns))
+        return ", ".join(["?"] * len(self.columns))
+
+    def insert_sql(self) -> str:
+        return f"INSERT INTO {self.table_name} ({self.column_list()}) VALUES ({self.placeholders()})"
+
+    def convert(self, rows, first_record) -> Tuple[List[int], List[tuple]]:
+        """Convert a chunk, returning the record numbers and values of the valid rows."""
+        records, values = [], []
+        for offset, row in enumerate(rows):
+            try:
+                values.append(self.mapper.convert_row(row))
+                records.append(first_record + offset)
+            except ValueError as e:
+                self.errors.append((first_record + offset, str(e)))
+        return records, values
+
+    def load(self, rows, first_record):
+        """Append a chunk of rows; *first_record* is the 1-based record number of rows[0] in the file."""
+        records, values = self.convert(rows, first_record)
+        if values:
+            self._insert(records, values)
+
+    def _insert(self, records, values):
+        self.cursor.executemany(self.insert_sql(), values)
+        self.rows_loaded += len(values)
+
+    def normalize(self, value):
+        """Adapt a value fetched from another database to what this driver can bind."""
+        return value
+
+    def load_values(self, rows, first_record=1):
+        """Append rows of Python values, e.g. fetched from another connection."""
+        values = [tuple(self.normalize(value) for value in row) for row in rows]
+        if values:
+            self._insert(list(range(first_record, first_record + len(values))), values)
+
+    def close(self):
+        try:
+            self.cursor.close()
+        except Exception:
+            pass
+
+
+class BulkLoaderOracleDB(BulkLoader):
+    """python-oracledb: one array DML round trip per chunk; bad rows are reported, not fatal."""
+
+    paramstyle = "numeric"
+
+    def _insert(self, records, values):
+        self.cursor.executemany(self.insert_sql(), values, batcherrors=True)
+        batch_errors = self.cursor.getbatcherrors()
+        for error in batch_errors:
+            self.errors.append((records[error.offset], error.message))
+        self.rows_loaded += len(values) - len(batch_errors)
+
+
+    def normalize(self, value):
+        # BOOLEAN only exists in SQL from Oracle 23; NUMBER(1) columns take 0/1
+        return int(value) if isinstance(value, bool) else value
+
+
+class BulkLoaderMSSQL(BulkLoader):
+    """pyodbc against SQL Server: fast_executemany sends the chunk as one parameter array."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor.fast_executemany = True
+
+
+class BulkLoaderSQLite(BulkLoader):
+    """
+    sqlite3: executemany inside the caller's single transaction.
+    Values are bound as text and converted by SQLite's column affinity.
+    """
+
+    def convert(self, rows, first_record):
+        records, values = [], []
+        expected = len(self.columns)
+        for offset, row in enumerate(rows):
+            if len(row) != expected:
+                self.errors.append((first_record + offset, f"expected {expected} field(s), found {len(row)}"))
+                continue
+            values.append(tuple(None if value == "" else value for value in row))
+            records.append(first_record + offset)
+        return records, values
+
+
+    def normalize(self, value):
+        # Bound without the deprecated default adapters; text keeps Decimal digits exact
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (Decimal, date, time)):  # datetime is a date subclass
+            return str(value)
+        if isinstance(value, memoryview):
+            return bytes(value)
+        return value
+
+
+class BulkLoaderPostgreSQL(BulkLoader):
+    """
+    psycopg2: streams each chunk through COPY ... FROM STDIN in text format.
+    Values stay text and are parsed by the server.
+    """
+
+    @staticmethod
+    def copy_text_escape(value) -> str:
+        return (value.replace("\\", "\\\\")
+                     .replace("\t", "\\t")
+                     .replace("\n", "\\n")
+                     .replace("\r", "\\r"))
+
+    def copy_sql(self) -> str:
+        return f"COPY {self.table_name} ({self.column_list()}) FROM STDIN"
+
+    def load(self, rows, first_record):
+        expected = len(self.columns)
+        buffer   = io.StringIO()
+        count    = 0
+        for offset, row in enumerate(rows):
+            if len(row) != expected:
+                self.errors.append((first_record + offset, f"expected {expected} field(s), found {len(row)}"))
+                continue
+            buffer.write("\t".join("\\N" if value == "" else self.copy_text_escape(value) for value in row))
+            buffer.write("\n")
+            count += 1
+        if count:
+            buffer.seek(0)
+            self.cursor.copy_expert(self.copy_sql(), buffer)
+            self.rows_loaded += count
+
+    def copy_text_value(self, value) -> str:
+        if value is None:
+            return "\\N"
+        if isinstance(value, bool):
+            return "t" if value else "f"
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return "\\\\x" + bytes(value).hex()
+        return self.copy_text_escape(str(value))
+
+    def load_values(self, rows, first_record=1):
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(self.copy_text_value(value) for value in row))
+            buffer.write("\n")
+        if rows:
+            buffer.seek(0)
+            self.cursor.copy_expert(self.copy_sql(), buffer)
+            self.rows_loaded += len(rows)
+
+
+# ======================================================================
+# EXPORTERS
+# ======================================================================
+
+class Exporter:
+    """
+    Writes the result of a query to a delimited file with a header line.
+    Rows are fetched fetch_size at a time and written straight to the file,
+    without going through the result grid. NULL is written as an empty field.
+
+    iter_export() yields after every chunk so that the export can be driven
+    step by step from the UI thread; export() runs it to completion. Exporters
+    with thread_safe = True may also be run from a worker thread: only drivers
+    whose connections can be shared between threads (DB-API threadsafety >= 2)
+    set it, pyodbc and sqlite3 connections stay on the UI thread.
+    """
+
+    fetch_size  = 10000
+    thread_safe = False
+
+    def __init__(self, connection, delimiter="\t", header=True):
+        self.connection   = connection
+        self.delimiter    = delimiter
+        self.header       = header
+        self.rows_written = 0
+        self.cancelled    = False
+
+    @staticmethod
+    def clean_sql(sql) -> str:
+        sql = sql.strip()
+        return sql[:-1].rstrip() if sql.endswith(";") else sql
+
+    def cancel(self):
+        self.cancelled = True
+
+    def prepare_cursor(self, cursor):
+        cursor.arraysize = self.fetch_size
+
+    def fetch_chunks(self, cursor):
+        while True:
+            rows = cursor.fetchmany(self.fetch_size)
+            if not rows:
+                return
+            yield rows
+
+    def iter_export(self, sql, path):
+        cursor = self.connection.cursor()
+        try:
+            self.prepare_cursor(cursor)
+            cursor.execute(self.clean_sql(sql))
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f, delimiter=self.delimiter)
+                if self.header:
+                    writer.writerow([d[0] for d in cursor.description])
+                for rows in self.fetch_chunks(cursor):
+                    if self.cancelled:
+                        return
+                    writer.writerows(rows)
+                    self.rows_written += len(rows)
+                    yield self.rows_written
+        finally:
+            cursor.close()
+
+    def export(self, sql, path) -> int:
+        for _ in self.iter_export(sql, path):
+            pass
+        return self.rows_written
+
+
+class ExporterSQLite(Exporter):
+    """
+    sqlite3: iterates the cursor directly instead of materialising fetchmany() lists.
+    sqlite3 connections cannot be used from another thread, so this runs step by step.
+    """
+
+    thread_safe = False
+
+    def fetch_chunks(self, cursor):
+        while True:
+            rows = list(itertools.islice(cursor, self.fetch_size))
+            if not rows:
+                return
+            yield rows
+
+
+class ExporterOracleDB(Exporter):
+    """
+    python-oracledb: large arraysize/prefetch to cut round trips; NUMBER columns are
+    fetched as strings (no Decimal/float objects, exact digits) and LOBs as inline
+    values instead of one locator round trip per row.
+    """
+
+    fetch_size  = 50000
+    thread_safe = True
+
+    @staticmethod
+    def output_type_handler(cursor, metadata):
+        import oracledb
+        if metadata.type_code is oracledb.DB_TYPE_NUMBER:
+            return cursor.var(oracledb.DB_TYPE_VARCHAR, arraysize=cursor.arraysize)
+        if metadata.type_code is oracledb.DB_TYPE_CLOB:
+            return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+        if metadata.type_code is oracledb.DB_TYPE_NCLOB:
+            return cursor.var(oracledb.DB_TYPE_LONG_NVARCHAR, arraysize=cursor.arraysize)
+        if metadata.type_code is oracledb.DB_TYPE_BLOB:
+            return cursor.var(oracledb.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
+        return None
+
+    def prepare_cursor(self, cursor):
+        cursor.arraysize   = self.fetch_size
+        cursor.prefetchrows = self.fetch_size
+        cursor.outputtypehandler = self.output_type_handler
+
+
+class ExporterPostgreSQL(Exporter):
+    """
+    psycopg2: COPY (query) TO STDOUT in CSV format, written by the server-side
+    formatter straight into the file. No Python row objects are created.
+    """
+
+    thread_safe = True
+
+    class _CountingFile:
+        """File wrapper counting written lines so that progress can be polled during COPY."""
+        def __init__(self, f, exporter):
+            self.f        = f
+            self.exporter = exporter
+            self.lines    = 0
+
+        def write(self, data):
+            # Quoted values may contain newlines: the count is only used for progress
+            self.lines += data.count("\n")
+            self.exporter.rows_written = max(0, self.lines - (1 if self.exporter.header else 0))
+            return self.f.write(data)
+
+    def copy_sql(self, sql) -> str:
+        delimiter = "E'\\t'" if self.delimiter == "\t" else "'" + self.delimiter.replace("'", "''") + "'"
+        header    = "true" if self.header else "false"
+        return f"COPY ({self.clean_sql(sql)}) TO STDOUT WITH (FORMAT csv, HEADER {header}, DELIMITER {delimiter})"
+
+    def cancel(self):
+        super().cancel()
+        try:
+            self.connection.cancel()  # interrupts the running COPY from any thread
+        except Exception:
+            pass
+
+    def iter_export(self, sql, path):
+        cursor = self.connection.cursor()
+        try:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                cursor.copy_expert(self.copy_sql(sql), self._CountingFile(f, self))
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                self.rows_written = cursor.rowcount
+            yield self.rows_written
+        finally:
+            cursor.close()
+
+
+# ======================================================================
+# PARALLEL EXTRACTION
+# ======================================================================
+
+class TablePartitioner:
+    """
+    Splits a table into WHERE predicates that together cover every row exactly once:
+    - ranges of the leading primary key column when it is an integer,
+    - otherwise physical ranges (PostgreSQL ctid pages, SQLite rowid),
+    - otherwise hash buckets of the row address (Oracle ROWID, SQL Server row checksum).
+    The first and last ranges are open-ended so rows beyond stale bounds are not lost.
+    """
+
+    def __init__(self, queries, schema, table):
+        self.queries = queries
+        self.schema  = schema
+        self.table   = table
+
+    @staticmethod
+    def boundaries(low, high, count) -> List[int]:
+        """Inner boundaries splitting the integer interval [low, high] into up to *count* ranges."""
+        span  = high - low + 1
+        count = max(1, min(count, span))
+        return sorted({low + math.ceil(i * span / count) for i in range(1, count)})
+
+    @staticmethod
+    def ranges(boundaries) -> List[Tuple]:
+        """(low, high) pairs, None meaning unbounded, from the inner boundaries."""
+        edges = [None] + list(boundaries) + [None]
+        return list(zip(edges[:-1], edges[1:]))
+
+    def key_range_predicate(self, column, low, high) -> str:
+        quoted     = self.queries.quote_identifier(column)
+        conditions = []
+        if low is not None:
+            conditions.append(f"{quoted} >= {low}")
+        if high is not None:
+            conditions.append(f"{quoted} < {high}")
+        return " AND ".join(conditions) or "1 = 1"
+
+    def plan(self, cursor, primary_key_columns, structure_rows, count) -> Tuple[str, List[str]]:
+        """Return (strategy description, predicates) for about *count* partitions."""
+        types = {row[0]: row for row in structure_rows}
+        if primary_key_columns and primary_key_columns[0] in types:
+            key = primary_key_columns[0]
+            if ColumnTypeMapper([types[key]]).converters[0] is int:
+                cursor.execute(self.queries.get_key_bounds_sql(self.schema, self.table, key))
+                low, high = cursor.fetchone()
+                if low is None:
+                    return "empty table", ["1 = 1"]
+                bounds = self.boundaries(int(low), int(high), count)
+                return (f"primary key ranges on {key}",
+                        [self.key_range_predicate(key, lo, hi) for lo, hi in self.ranges(bounds)])
+
+        bounds_sql = self.queries.get_physical_bounds_sql(self.schema, self.table)
+        if bounds_sql:
+            cursor.execute(bounds_sql)
+            low, high = cursor.fetchone() or (None, None)
+            if low is None or high is None or high <= low:
+                return "single range", ["1 = 1"]
+            bounds = self.boundaries(int(low), int(high), count)
+            return ("physical row ranges",
+                    [self.queries.get_physical_range_predicate(lo, hi) for lo, hi in self.ranges(bounds)])
+
+        return ("row hash buckets",
+                [self.queries.get_hash_partition_predicate(i, count) for i in range(count)])
+
+
+class ParallelTableExport:
+    """
+    Extracts the partitions of a table concurrently, one pooled connection per
+    worker thread, into one file per partition. Finished partitions are recorded
+    in a checkpoint file next to the output, so that an interrupted export resumes
+    with the missing partitions only. With merge=True the part files are finally
+    concatenated, in partition order, into the output file.
+    """
+
+    def __init__(self, pool, exporter_factory, base_sql, predicates, output_path, merge=True):
+        self.pool             = pool
+        self.exporter_factory = exporter_factory  # (connection, header) -> Exporter
+        self.base_sql         = base_sql
+        self.predicates       = predicates
+        self.output_path      = output_path
+        self.merge            = merge
+        self.checkpoint_path  = output_path + ".checkpoint.json"
+        self.done             = {}  # partition index -> rows written
+        self.errors           = []
+        self.cancelled        = False
+        self._active          = {}  # worker thread id -> running Exporter
+        self._lock            = threading.Lock()
+        self._threads         = []
+
+    def part_path(self, index) -> str:
+        stem, ext = os.path.splitext(self.output_path)
+        return f"{stem}.part{index + 1:04d}{ext}"
+
+    def partition_sql(self, index) -> str:
+        return f"{self.base_sql} WHERE {self.predicates[index]}"
+
+    def load_checkpoint(self) -> int:
+        """Adopt the finished partitions of a previous run of the same plan; returns how many."""
+        if not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("sql") != self.base_sql or checkpoint.get("predicates") != self.predicates \
+           or checkpoint.get("merge") != self.merge:
+            return 0
+        self.done = {int(index): rows for index, rows in checkpoint.get("done", {}).items()
+                     if os.path.exists(self.part_path(int(index)))}
+        return len(self.done)
+
+    def _save_checkpoint(self):
+        checkpoint = {"sql": self.base_sql, "predicates": self.predicates, "merge": self.merge, "done": self.done}
+        with open(self.checkpoint_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+
+    @property
+    def rows_written(self) -> int:
+        with self._lock:
+            return sum(self.done.values()) + sum(e.rows_written for e in self._active.values())
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self, workers):
+        pending = queue.Queue()
+        for index in range(len(self.predicates)):
+            if index not in self.done:
+                pending.put(index)
+        for _ in range(max(1, min(workers, pending.qsize()))):
+            thread = threading.Thread(target=self._worker, args=(pending,), daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            for exporter in self._active.values():
+                exporter.cancel()
+
+    def _worker(self, pending):
+        try:
+            connection = self.pool.acquire()
+        except Exception as e:
+            with self._lock:
+                self.errors.append(f"connection failed: {e}")
+            self.cancel()
+            return
+        try:
+            while not self.cancelled:
+                try:
+                    index = pending.get_nowait()
+                except queue.Empty:
+                    return
+                # Part files carry a header only when they are the final output (or the first merged part)
+                exporter = self.exporter_factory(connection, not self.merge or index == 0)
+                with self._lock:
+                    self._active[threading.get_ident()] = exporter
+                path = self.part_path(index)
+                try:
+                    exporter.export(self.partition_sql(index), path + ".tmp")
+                    if exporter.cancelled:
+                        return
+                    os.replace(path + ".tmp", path)
+                    with self._lock:
+                        self.done[index] = exporter.rows_written
+                        self._save_checkpoint()
+                except Exception as e:
+                    with self._lock:
+                        if not self.cancelled:
+                            self.errors.append(f"partition {index + 1} ({self.predicates[index]}): {e}")
+                    self.cancel()
+                    try:
+                        connection.rollback()
+                    except Exception:
+                        pass
+                    return
+                finally:
+                    with self._lock:
+                        self._active.pop(threading.get_ident(), None)
+        finally:
+            self.pool.release(connection)
+
+    def finish(self):
+        """After all workers stopped: merge parts if requested and drop the checkpoint when complete."""
+        if self.cancelled or self.errors or len(self.done) < len(self.predicates):
+            return False
+        if self.merge:
+            with open(self.output_path, "wb") as out:
+                for index in range(len(self.predicates)):
+                    with open(self.part_path(index), "rb") as part:
+                        shutil.copyfileobj(part, out, 1024 * 1024)
+            for index in range(len(self.predicates)):
+                os.remove(self.part_path(index))
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return True
+
+
+class ParallelRowCount:
+    """
+    Exact COUNT(*) of several tables or views at once, one pooled connection per
+    worker thread. cancel() drops the pending objects and interrupts the running
+    counts where the driver allows it (sqlite3 interrupt(), oracledb and psycopg2
+    connection cancel(), pyodbc cursor cancel()).
+    """
+
+    def __init__(self, pool, queries, targets):
+        self.pool      = pool
+        self.queries   = queries
+        self.targets   = list(targets)  # (schema, name) pairs
+        self.counts    = {}             # (schema, name) -> row count
+        self.errors    = {}             # (schema, name) -> message
+        self.cancelled = False
+        self._active   = {}             # worker thread id -> (connection, cursor)
+        self._lock     = threading.Lock()
+        self._threads  = []
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self, workers):
+        pending = queue.Queue()
+        for target in self.targets:
+            pending.put(target)
+        for _ in range(max(1, min(workers, len(self.targets)))):
+            thread = threading.Thread(target=self._worker, args=(pending,), daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    @staticmethod
+    def interrupt(connection, cursor):
+        for target, method in ((connection, "interrupt"), (connection, "cancel"), (cursor, "cancel")):
+            if hasattr(target, method):
+                try:
+                    getattr(target, method)()
+                except Exception:
+                    pass
+                return
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            for connection, cursor in self._active.values():
+                self.interrupt(connection, cursor)
+
+    def _worker(self, pending):
+        try:
+            connection = self.pool.acquire()
+        except Exception as e:
+            with self._lock:
+                self.errors[None] = f"connection failed: {e}"
+            self.cancel()
+            return
+        try:
+            while not self.cancelled:
+                try:
+                    schema, name = pending.get_nowait()
+                except queue.Empty:
+                    return
+                cursor = connection.cursor()
+                with self._lock:
+                    self._active[threading.get_ident()] = (connection, cursor)
+                try:
+                    cursor.execute(self.queries.count_records_sql(schema, name))
+                    row = cursor.fetchone()
+                    with self._lock:
+                        self.counts[(schema, name)] = int(row[0]) if row else 0
+                except Exception as e:
+                    with self._lock:
+                        if not self.cancelled:
+                            self.errors[(schema, name)] = str(e)
+                    try:
+                        connection.rollback()
+                    except Exception:
+                        pass
+                finally:
+                    with self._lock:
+                        self._active.pop(threading.get_ident(), None)
+                    cursor.close()
+        finally:
+            self.pool.release(connection)
+
+
+# ======================================================================
+# CROSS-CONNECTION COPY
+# ======================================================================
+
+class TableCopy:
+    """
+    Streams the rows of *source_sql* from a source connection into a BulkLoader
+    on a target connection. Fetching and inserting run in two threads linked by a
+    small queue, so the source fetches the next chunk while the target inserts the
+    previous one. Both connections must be usable from these threads and are owned
+    by the copy while it runs. The target is committed once at the end, rolled back
+    on failure or cancellation.
+    """
+
+    fetch_size = 10000
+    queue_size = 4  # chunks buffered between fetching and inserting
+
+    def __init__(self, source_connection, source_sql, target_connection, loader, source_params=()):
+        self.source_connection = source_connection
+        self.source_sql        = source_sql
+        self.source_params     = source_params
+        self.target_connection = target_connection
+        self.loader            = loader
+        self.rows_fetched      = 0
+        self.error             = None
+        self.cancelled         = False
+        self._chunks           = queue.Queue(self.queue_size)
+        self._threads          = []
+
+    @property
+    def rows_copied(self) -> int:
+        return self.loader.rows_loaded
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._fetch,  daemon=True),
+            threading.Thread(target=self._insert, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _fail(self, error):
+        if not self.error:
+            self.error = str(error)
+        self.cancel()
+
+    def _put(self, item):
+        # Bounded wait so that a cancelled copy does not block on a full queue
+        while not self.cancelled:
+            try:
+                self._chunks.put(item, timeout=0.2)
+                return
+            except queue.Full:
+                pass
+
+    def _fetch(self):
+        cursor = self.source_connection.cursor()
+        try:
+            cursor.arraysize = self.fetch_size
+            if self.source_params:
+                cursor.execute(self.source_sql, self.source_params)
+            else:
+                cursor.execute(self.source_sql)
+            while not self.cancelled:
+                rows = cursor.fetchmany(self.fetch_size)
+                if not rows:
+                    break
+                self.rows_fetched += len(rows)
+                self._put(rows)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._put(None)
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    def _insert(self):
+        try:
+            while not self.cancelled:
+                try:
+                    rows = self._chunks.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                if rows is None:
+                    break
+                self.loader.load_values(rows, self.rows_copied + 1)
+            if not self.cancelled:
+                self.target_connection.commit()
+        except Exception as e:
+            self._fail(e)
+        finally:
+            if self.cancelled:
+                try:
+                    self.target_connection.rollback()
+                except Exception:
+                    pass
+            self.loader.close()
+
+
+# ======================================================================
+# LOCAL SNAPSHOTS
+# ======================================================================
+
+class SnapshotStore:
+    """
+    Local SQLite database holding snapshots of tables, views and query results
+    of one saved connection (one file per connection). Each snapshot remembers
+    its source query and, optionally, a key column so that it can be refreshed
+    or extended with the rows whose key is above the last one copied.
+    """
+
+    DIRECTORY      = os.path.join(os.path.expanduser("~"), ".dbexp_snapshots")
+    METADATA_TABLE = "_dbexp_snapshots"
+    SOURCE_ALIAS   = "snapshot_src"
+
+    def __init__(self, connection_name, directory=None):
+        self.source_connection_name = connection_name
+        self.path = os.path.join(directory or self.DIRECTORY, f"{connection_name}.sqlite")
+
+    @property
+    def connection_name(self) -> str:
+        """Name under which the snapshot database is registered as a connection."""
+        return f"{self.source_connection_name}-local"
+
+    def connect(self):
+        """Open the snapshot database (usable from the copy threads), creating it when missing."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.METADATA_TABLE} ("
+            "snapshot_name TEXT PRIMARY KEY, source_sql TEXT NOT NULL, key_column TEXT, "
+            "last_key, row_count INTEGER, refreshed_at TEXT)"
+        )
+        connection.commit()
+        return connection
+
+    def get(self, connection, name):
+        """
+        Metadata of snapshot *name* as a dict, or None when it does not exist. The
+        last key is converted back to the type of the key column (a date stored as
+        text comes back as a datetime), ready to be bound on the source.
+        """
+        cursor = connection.execute(
+            f"SELECT source_sql, key_column, last_key, row_count, refreshed_at "
+            f"FROM {self.METADATA_TABLE} WHERE snapshot_name = ?", (name,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        metadata = dict(zip(("source_sql", "key_column", "last_key", "row_count", "refreshed_at"), row))
+        if metadata["key_column"] and metadata["last_key"] is not None:
+            declared = {str(column).lower(): type_sql for column, type_sql in
+                        connection.execute("SELECT name, type FROM pragma_table_info(?)", (name,))}
+            type_sql = declared.get(metadata["key_column"].lower())
+            if type_sql:
+                mapper = ColumnTypeMapper([(metadata["key_column"], type_sql, None, None, None, "Y")])
+                metadata["last_key"] = mapper.convert_row([str(metadata["last_key"])])[0]
+        return metadata
+
+    def prepare_replace(self, connection, name, column_definitions):
+        """
+        (Re)create the snapshot table inside an open transaction, so that the
+        previous content comes back if the following copy is rolled back.
+        column_definitions: [(name, type_sql, nullable)]; an empty type keeps
+        the values exactly as fetched.
+        """
+        if not connection.in_transaction:
+            connection.execute("BEGIN")
+        connection.execute(f"DROP TABLE IF EXISTS {QueriesSQLite.quote_identifier(name)}")
+        connection.execute(QueriesSQLite.get_create_table_sql("main", name, column_definitions))
+
+    @staticmethod
+    def column_definitions(description):
+        """
+        Definitions of the snapshot table of a query result, typed from the cursor
+        *description* so that keys compare as numbers or dates and not as text.
+        Columns of unknown type keep the values exactly as fetched.
+        """
+        definitions = []
+        for column in description:
+            category = ColumnTypeMapper.category_of_type_code(column[1], column[5] if len(column) > 5 else None)
+            type_sql = QueriesSQLite.get_column_type_sql(category, None, None, None) if category else ""
+            definitions.append((column[0], type_sql, True))
+        return definitions
+
+    # Bind placeholder of the single parameter of incremental_sql, per driver paramstyle
+    PLACEHOLDERS = {"qmark": "?", "numeric": ":1", "format": "%s"}
+
+    def incremental_sql(self, queries, source_sql, key_column, last_key, paramstyle="qmark"):
+        """
+        (*source_sql* restricted to the rows whose *key_column* is above *last_key*, its
+        parameters): the key is bound in the *paramstyle* of the source driver.
+        """
+        if last_key is None:
+            return source_sql, ()
+        if paramstyle == "format":
+            source_sql = source_sql.replace("%", "%%")  # psycopg2 reads % as a placeholder once there are parameters
+        return (f"SELECT * FROM ({source_sql}) {self.SOURCE_ALIAS} "
+                f"WHERE {self.SOURCE_ALIAS}.{queries.quote_identifier(key_column)} > {self.PLACEHOLDERS[paramstyle]}",
+                (last_key,))
+
+    def record(self, connection, name, source_sql, key_column=None):
+        """Store the metadata of snapshot *name* after a successful copy and commit."""
+        table     = QueriesSQLite.quote_identifier(name)
+        row_count = connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        last_key  = None
+        if key_column:
+            last_key = connection.execute(
+                f"SELECT MAX({QueriesSQLite.quote_identifier(key_column)}) FROM {table}"
+            ).fetchone()[0]
+        connection.execute(
+            f"INSERT OR REPLACE INTO {self.METADATA_TABLE} "
+            "(snapshot_name, source_sql, key_column, last_key, row_count, refreshed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (name, source_sql, key_column or None, last_key, row_count, datetime.now().isoformat(sep=" ", timespec="seconds"))
+        )
+        connection.commit()
+        return row_count
+
+
+# ======================================================================
+# TABLE DIFF
+# ======================================================================
+
+class TableDiff:
+    """
+    Compares a table held on two connections without fetching it: the row count and
+    a checksum of the rows are computed per range of an integer key column, and
+    only the ranges whose checksums differ are split again, until they are small
+    enough to be fetched and compared row by row (ResultDiff).
+
+    The checksums are computed server side (get_range_checksum_sql) when both sides
+    are the same engine; across engines, whose hash functions differ, or on SQLite,
+    which has none, the rows of each initial range are fetched and hashed once on
+    the client, and the checksums of its sub-ranges are derived from those hashes.
+
+    Each side is a dict: connection, queries, schema, table, columns (key column
+    first; the same columns in the same order on both sides) and optionally
+    lob_columns, the columns of a LOB type (hashed differently by some engines).
+    """
+
+    initial_ranges = 16
+    split_ranges   = 4
+    leaf_rows      = 2000  # ranges with at most this many rows are compared row by row
+
+    def __init__(self, left, right):
+        self.sides       = (left, right)
+        self.server_side = (type(left["queries"]) is type(right["queries"]) and
+                            left["queries"].get_range_checksum_sql(left["schema"], left["table"], left["columns"], "1 = 1") is not None)
+        self._hashed     = [None, None]  # per side, client mode: (low, high, sorted keys, running sums of the row hashes)
+        self.ranges_checked  = 0
+        self.ranges_matching = 0
+        self.rows_verified   = 0
+        self.rows_compared   = 0
+        self.rows_hashed     = 0  # rows fetched for client-side checksums
+        self.changed = self.removed = self.added = 0
+        self.detail_columns = ["Diff"] + list(left["columns"])
+        self.detail: List[Tuple] = []
+        self.cancelled = False
+
+    def _predicate(self, side, low, high) -> str:
+        partitioner = TablePartitioner(side["queries"], side["schema"], side["table"])
+        return partitioner.key_range_predicate(side["columns"][0], low, high)
+
+    def _fetch(self, side, low, high) -> List[Tuple]:
+        queries = side["queries"]
+        columns = ", ".join(queries.quote_identifier(column) for column in side["columns"])
+        cursor  = side["connection"].cursor()
+        try:
+            cursor.execute(f"SELECT {columns} FROM {queries.get_qualified_name(side['schema'], side['table'])} "
+                           f"WHERE {self._predicate(side, low, high)}")
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _row_hashes(self, side, low, high) -> Tuple[List[int], List[int]]:
+        """(keys in order, running sums of the row hashes from 0) of the rows of [low, high) on one side."""
+        queries   = side["queries"]
+        columns   = ", ".join(queries.quote_identifier(column) for column in side["columns"])
+        normalize = ResultDiff.normalize
+        digest    = ResultDiff.digest
+        hashes    = []
+        cursor    = side["connection"].cursor()
+        try:
+            cursor.execute(f"SELECT {columns} FROM {queries.get_qualified_name(side['schema'], side['table'])} "
+                           f"WHERE {self._predicate(side, low, high)}")
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                # 64 bits of a stable digest, as the server checksums take 64 bits of MD5
+                hashes.extend((int(row[0]), int.from_bytes(digest(map(normalize, row), 8), "big")) for row in rows)
+                self.rows_hashed += len(rows)
+        finally:
+            cursor.close()
+        hashes.sort(key=lambda pair: pair[0])
+        return [key for key, _ in hashes], list(itertools.accumulate((h for _, h in hashes), initial=0))
+
+    def _checksum(self, index, low, high) -> Tuple[int, int]:
+        """(row count, checksum) of the rows of [low, high) on side *index*."""
+        side = self.sides[index]
+        if not self.server_side:
+            # Sub-ranges are checked right after their parent (depth first): the hashes of
+            # the enclosing initial range serve them all, each row is fetched once
+            hashed = self._hashed[index]
+            if hashed is None or not (hashed[0] <= low and high <= hashed[1]):
+                hashed = self._hashed[index] = (low, high) + self._row_hashes(side, low, high)
+            keys, sums = hashed[2], hashed[3]
+            first, last = bisect.bisect_left(keys, low), bisect.bisect_left(keys, high)
+            return last - first, sums[last] - sums[first]
+
+        sql = side["queries"].get_range_checksum_sql(side["schema"], side["table"], side["columns"],
+                                                     self._predicate(side, low, high), side.get("lob_columns", ()))
+        cursor = side["connection"].cursor()
+        try:
+            cursor.execute(sql)
+            count, checksum = cursor.fetchone()
+        finally:
+            cursor.close()
+        return int(count or 0), int(checksum or 0)
+
+    def _compare_rows(self, low, high):
+        left, right = self.sides
+        left_rows, right_rows = self._fetch(left, low, high), self._fetch(right, low, high)
+        self.rows_compared += len(left_rows) + len(right_rows)
+
+        diff = ResultDiff(left["columns"], right["columns"], [left["columns"][0]])
+        diff.compare([left_rows], [right_rows])
+        self.changed += len(diff.changed)
+        self.removed += len(diff.removed)
+        self.added   += len(diff.added)
+        if len(self.detail) < ResultDiff.MAX_DETAIL_ROWS and diff.difference_count:
+            keys = [key for _, key in diff.detail_keys()]
+            _, rows = diff.detail_rows(diff.collect_rows([left_rows], 0, keys), diff.collect_rows([right_rows], 1, keys))
+            self.detail.extend(rows[:ResultDiff.MAX_DETAIL_ROWS - len(self.detail)])
+
+    def key_bounds(self):
+        """(low, high) of the key over both sides, None when both tables are empty."""
+        bounds = []
+        for side in self.sides:
+            cursor = side["connection"].cursor()
+            try:
+                cursor.execute(side["queries"].get_key_bounds_sql(side["schema"], side["table"], side["columns"][0]))
+                bounds.append(cursor.fetchone())
+            finally:
+                cursor.close()
+        lows  = [int(low)  for low, _  in bounds if low  is not None]
+        highs = [int(high) for _, high in bounds if high is not None]
+        return (min(lows), max(highs)) if lows else None
+
+    def run(self):
+        bounds = self.key_bounds()
+        if not bounds:
+            return
+        low, high = bounds
+        edges   = [low] + TablePartitioner.boundaries(low, high, self.initial_ranges) + [high + 1]
+        pending = list(zip(edges[:-1], edges[1:]))[::-1]
+
+        while pending and not self.cancelled:
+            low, high = pending.pop()
+            left_sum, right_sum = (self._checksum(index, low, high) for index in (0, 1))
+            self.ranges_checked += 1
+            if left_sum == right_sum:
+                self.ranges_matching += 1
+                self.rows_verified   += left_sum[0]
+            elif max(left_sum[0], right_sum[0]) <= self.leaf_rows or high - low <= self.split_ranges:
+                self._compare_rows(low, high)
+            else:
+                edges = [low] + TablePartitioner.boundaries(low, high - 1, self.split_ranges) + [high]
+                pending.extend(list(zip(edges[:-1], edges[1:]))[::-1])
+
+    @property
+    def difference_count(self) -> int:
+        return self.changed + self.removed + self.added
+
+    def summary(self) -> str:
+        text = (f"{self.ranges_checked:,} range(s) checked, {self.rows_verified:,} row(s) verified by checksum, "
+                f"{self.rows_compared:,} fetched: {self.changed:,} changed, {self.removed:,} only left, "
+                f"{self.added:,} only right")
+        if not self.server_side:
+            text += " (checksums computed on the client)"
+        return text
+
+
+# ======================================================================
+# SCHEMA DIFF
+# ======================================================================
+
+class SchemaCatalog:
+    """
+    Definitions of the objects of one schema, read on one cursor through the Queries
+    methods of the connection: tables with their columns, primary key and indexes,
+    views with their query, and procedures/functions as a hash of their source.
+    Each kind of definition is read for the whole schema in one query (get_schema_*_sql),
+    so the number of round trips does not grow with the number of objects.
+    Two catalogs are compared in memory by SchemaDiff.
+    """
+
+    def __init__(self, connection, queries, schema, connection_type=None):
+        self.connection      = connection
+        self.queries         = queries
+        self.schema          = schema
+        self.connection_type = connection_type
+        self.tables:   dict = {}  # name -> {"columns": structure rows, "primary_key": [...], "indexes": {name: (unique, columns)}}
+        self.views:    dict = {}  # name -> query text
+        self.routines: dict = {}  # (kind, name) -> hash of the source
+        self.objects_read = 0
+        self.cancelled    = False
+
+    @staticmethod
+    def source_hash(text) -> str:
+        """Hash of a source text, insensitive to the layout of its whitespace."""
+        return hashlib.sha1(" ".join(str(text or "").split()).encode("utf-8")).hexdigest()
+
+    def load(self):
+        queries = self.queries
+        cursor  = self.connection.cursor()
+
+        def rows(sql):
+            cursor.execute(sql)
+            return cursor.fetchall()
+
+        try:
+            # One query per kind of definition for the whole schema, grouped by object here
+            for (table,) in rows(queries.get_all_table_names_in_schema(self.schema)):
+                self.tables[table] = {"columns": [], "primary_key": [], "indexes": {}}
+            for row in rows(queries.get_schema_columns_sql(self.schema)):
+                if row[0] in self.tables:
+                    self.tables[row[0]]["columns"].append(tuple(row[1:7]))
+            if self.cancelled:
+                return
+            for table, column in rows(queries.get_schema_primary_keys_sql(self.schema)):
+                if table in self.tables:
+                    self.tables[table]["primary_key"].append(column)
+            for table, index, uniqueness, column in rows(queries.get_schema_index_columns_sql(self.schema)):
+                if table in self.tables:
+                    unique, columns = self.tables[table]["indexes"].get(index, (uniqueness == "UNIQUE", ()))
+                    column = str(column or "").strip()
+                    self.tables[table]["indexes"][index] = (unique, columns + (column,) if column else columns)
+            self.objects_read += len(self.tables)
+            if self.cancelled:
+                return
+
+            texts = {}
+            for view, text in rows(queries.get_schema_view_queries_sql(self.schema)):
+                if text:
+                    texts.setdefault(view, []).append(str(text))
+            for (view,) in rows(queries.get_all_views_in_schema(self.schema)):
+                self.views[view] = "\n".join(texts.get(view, ()))
+                self.objects_read += 1
+            if self.cancelled:
+                return
+
+            sources = {}
+            for kind, name, text in rows(queries.get_schema_routine_sources_sql(self.schema)):
+                if text:
+                    sources.setdefault((kind, name), []).append(str(text))
+            for kind, list_sql in (("procedure", queries.get_all_procedures_in_schema),
+                                   ("function",  queries.get_all_functions_in_schema)):
+                for (name,) in rows(list_sql(self.schema)):
+                    self.routines[(kind, name)] = self.source_hash("".join(sources.get((kind, name), ())))
+                    self.objects_read += 1
+        finally:
+            cursor.close()
+
+
+class SchemaDiff:
+    """
+    Differences between two SchemaCatalog objects, left being the reference, and the
+    DDL that brings the right schema to the left one.
+
+    Objects are matched by name without regard to case, so that schemas of different
+    engines can be compared; columns are then compared by generic type category
+    (ColumnTypeMapper.category) instead of by their declared types. Indexes are
+    matched by their columns, since generated names differ between databases.
+    """
+
+    columns = ["Diff", "Object", "Name", "Detail", "Left", "Right"]
+
+    def __init__(self, left: SchemaCatalog, right: SchemaCatalog):
+        self.left  = left
+        self.right = right
+        self.same_engine = type(left.queries) is type(right.queries)
+        self.rows: List[Tuple] = []
+        self.ddl:  List[str]   = []
+
+    @staticmethod
+    def _by_name(names) -> dict:
+        return {str(name).lower(): name for name in names}
+
+    @staticmethod
+    def describe_column(row) -> str:
+        _, type_name, length, precision, scale, nullable = row
+        if precision:
+            size = f"({precision},{scale})" if scale else f"({precision})"
+        elif length and ColumnTypeMapper.category(type_name, scale) == "text":
+            size = f"({length})"
+        else:
+            size = ""
+        return f"{type_name}{size}{' NOT NULL' if nullable == 'N' else ''}"
+
+    def _category(self, catalog, row) -> str:
+        category = ColumnTypeMapper.category(row[1], row[4])
+        if category == "date" and catalog.connection_type in ("Oracle", "OracleDB"):
+            category = "timestamp"  # Oracle DATE carries a time of day
+        return category
+
+    def _column_signature(self, catalog, row):
+        if self.same_engine:
+            return (ColumnTypeMapper.base_type(row[1]), row[2], row[3], row[4], row[5] == 'N')
+        return (self._category(catalog, row), row[5] == 'N')
+
+    def _type_sql(self, row) -> str:
+        return self.right.queries.get_column_type_sql(self._category(self.left, row), row[2], row[3], row[4])
+
+    def _add(self, status, kind, name, detail="", left="", right="", ddl=None):
+        self.rows.append((status, kind, name, detail, left, right))
+        if ddl:
+            self.ddl.append(ddl)
+
+    def _compare_table(self, name, left_table, right_name, right_table):
+        queries, schema = self.right.queries, self.right.schema
+        qualified = queries.get_qualified_name(schema, right_name)
+
+        left_columns  = {row[0].lower(): row for row in left_table["columns"]}
+        right_columns = {row[0].lower(): row for row in right_table["columns"]}
+        for key, row in left_columns.items():
+            if key not in right_columns:
+                self._add("removed", "column", f"{name}.{row[0]}", "missing on the right", self.describe_column(row), "",
+                          f"ALTER TABLE {qualified} ADD {queries.quote_identifier(row[0])} {self._type_sql(row)};")
+            elif self._column_signature(self.left, row) != self._column_signature(self.right, right_columns[key]):
+                self._add("changed", "column", f"{name}.{row[0]}", "type or nullability",
+                          self.describe_column(row), self.describe_column(right_columns[key]),
+                          f"-- {qualified}.{queries.quote_identifier(right_columns[key][0])}: "
+                          f"{self.describe_column(right_columns[key])} -> {self._type_sql(row)}"
+                          f"{' NOT NULL' if row[5] == 'N' else ''}")
+        for key, row in right_columns.items():
+            if key not in left_columns:
+                self._add("added", "column", f"{name}.{row[0]}", "only on the right", "", self.describe_column(row),
+                          f"-- ALTER TABLE {qualified} DROP COLUMN {queries.quote_identifier(row[0])};")
+
+        left_key  = [column.lower() for column in left_table["primary_key"]]
+        right_key = [column.lower() for column in right_table["primary_key"]]
+        if left_key != right_key:
+            self._add("changed", "primary key", name, "", ", ".join(left_table["primary_key"]),
+                      ", ".join(right_table["primary_key"]),
+                      f"-- {qualified}: primary key ({', '.join(left_table['primary_key'])}) "
+                      f"on the left, ({', '.join(right_table['primary_key'])}) on the right")
+
+        def definitions(table, key):
+            # The index backing the primary key is compared as the primary key
+            return {(unique, tuple(column.lower() for column in columns)): (index, columns)
+                    for index, (unique, columns) in table["indexes"].items()
+                    if [column.lower() for column in columns] != key}
+
+        left_indexes, right_indexes = definitions(left_table, left_key), definitions(right_table, right_key)
+        for definition, (index, columns) in left_indexes.items():
+            if definition not in right_indexes:
+                self._add("removed", "index", f"{name}.{index}", "missing on the right",
+                          f"{'UNIQUE ' if definition[0] else ''}({', '.join(columns)})", "",
+                          queries.get_create_index_sql(schema, right_name, index, columns, definition[0]) + ";")
+        for definition, (index, columns) in right_indexes.items():
+            if definition not in left_indexes:
+                self._add("added", "index", f"{name}.{index}", "only on the right", "",
+                          f"{'UNIQUE ' if definition[0] else ''}({', '.join(columns)})")
+
+    def compare(self):
+        left, right = self.left, self.right
+        queries, schema = right.queries, right.schema
+
+        right_tables = self._by_name(right.tables)
+        for name, table in left.tables.items():
+            right_name = right_tables.pop(name.lower(), None)
+            if right_name is None:
+                definitions = [(row[0], self._type_sql(row), row[5] != 'N') for row in table["columns"]]
+                self._add("removed", "table", name, "missing on the right", f"{len(definitions)} column(s)", "",
+                          queries.get_create_table_sql(schema, name, definitions) + ";")
+                for index, (unique, columns) in table["indexes"].items():
+                    if [column.lower() for column in columns] != [column.lower() for column in table["primary_key"]]:
+                        self.ddl.append(queries.get_create_index_sql(schema, name, index, columns, unique) + ";")
+            else:
+                self._compare_table(name, table, right_name, right.tables[right_name])
+        for right_name in right_tables.values():
+            self._add("added", "table", right_name, "only on the right", "",
+                      f"{len(right.tables[right_name]['columns'])} column(s)",
+                      f"-- {queries.delete_table_sql(schema, right_name)};")
+
+        right_views = self._by_name(right.views)
+        for name, text in left.views.items():
+            right_name = right_views.pop(name.lower(), None)
+            if right_name is None:
+                create = text if text.lstrip().upper().startswith("CREATE") else \
+                    f"CREATE VIEW {queries.get_qualified_name(schema, name)} AS\n{text}"
+                self._add("removed", "view", name, "missing on the right", SchemaCatalog.source_hash(text)[:12], "",
+                          create.rstrip().rstrip(";") + ";")
+            elif SchemaCatalog.source_hash(text) != SchemaCatalog.source_hash(right.views[right_name]):
+                self._add("changed", "view", name, "query differs", SchemaCatalog.source_hash(text)[:12],
+                          SchemaCatalog.source_hash(right.views[right_name])[:12],
+                          f"-- view {queries.get_qualified_name(schema, right_name)}: the query differs")
+        for right_name in right_views.values():
+            self._add("added", "view", right_name, "only on the right", "",
+                      SchemaCatalog.source_hash(right.views[right_name])[:12])
+
+        right_routines = {(kind, str(name).lower()): name for kind, name in right.routines}
+        for (kind, name), source_hash in left.routines.items():
+            right_name = right_routines.pop((kind, name.lower()), None)
+            if right_name is None:
+                self._add("removed", kind, name, "missing on the right", source_hash[:12], "",
+                          f"-- {kind} {name} is missing on the right")
+            elif source_hash != right.routines[(kind, right_name)]:
+                self._add("changed", kind, name, "source differs", source_hash[:12],
+                          right.routines[(kind, right_name)][:12], f"-- {kind} {name}: the source differs")
+        for (kind, _), right_name in right_routines.items():
+            self._add("added", kind, right_name, "only on the right", "", right.routines[(kind, right_name)][:12])
+
+    def summary(self) -> str:
+        counts = {status: sum(1 for row in self.rows if row[0] == status) for status in ("changed", "removed", "added")}
+        return (f"{len(self.left.tables):,} table(s), {len(self.left.views):,} view(s), {len(self.left.routines):,} "
+                f"routine(s) on the left: {counts['changed']:,} changed, {counts['removed']:,} only left, "
+                f"{counts['added']:,} only right")
+
+    def ddl_script(self) -> str:
+        header = (f"-- DDL bringing {self.right.schema} (right) to {self.left.schema} (left)\n"
+                  f"-- Commented lines need a manual decision\n")
+        return header + "\n".join(self.ddl) + "\n"
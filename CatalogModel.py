@@ -0,0 +1,202 @@
+"""
+CatalogModel.py - In-memory catalog of the database objects shown in the tree
+
+PanelDatabaseTree keeps the schemas, folders and objects of the active connection
+in this model and only renders it in the Treeview: lookups, search, breadcrumbs and
+the actions on a selection read the model instead of the widget, and the tree can
+materialize nodes lazily (the Tables folder is filled a page at a time).
+- CatalogNode: one schema, folder or object, with its parent and children by name
+- DatabaseCatalog: the schemas of the active connection and the tree item of each node
+- MetadataCache: results of the catalog queries of the active connection, by SQL text
+- CatalogPrefetcher: background thread filling the MetadataCache while the app is idle
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class CatalogNode:
+    """
+    A schema, a folder or a database object. kind is the tree node type ('schema',
+    'tables_folder', 'table', 'view', 'procedure', 'trigger', 'package_function', ...);
+    extra carries what identifies an object beyond its name (package routine overload).
+    """
+    __slots__ = ("name", "kind", "parent", "children", "by_name", "extra", "count", "loaded", "shown", "node")
+
+    def __init__(self, name, kind, parent=None, extra=None, count=None):
+        self.name     = name
+        self.kind     = kind
+        self.parent   = parent
+        self.children: List["CatalogNode"] = []
+        self.by_name:  Dict[str, "CatalogNode"] = {}
+        self.extra    = extra
+        self.count    = count  # known number of children (e.g. the table count of a schema) before they are read
+        self.loaded   = False  # children read from the database
+        self.shown    = 0      # children rendered, in order (Tables folders are rendered a page at a time)
+        self.node     = None   # Treeview item, None while the node is not rendered
+
+    def add(self, name, kind, extra=None, count=None) -> "CatalogNode":
+        child = CatalogNode(name, kind, self, extra, count)
+        self.children.append(child)
+        self.by_name.setdefault(name, child)
+        return child
+
+    def folder(self, kind) -> Optional["CatalogNode"]:
+        for child in self.children:
+            if child.kind == kind:
+                return child
+        return None
+
+    @property
+    def schema(self) -> "CatalogNode":
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def path(self) -> List["CatalogNode"]:
+        """Nodes from the schema down to this one."""
+        nodes, node = [], self
+        while node is not None:
+            nodes.append(node)
+            node = node.parent
+        return nodes[::-1]
+
+    def matches(self, term) -> List["CatalogNode"]:
+        """Children whose name contains *term*, case-insensitively."""
+        term = term.lower()
+        return [child for child in self.children if term in str(child.name).lower()]
+
+
+class DatabaseCatalog:
+    def __init__(self):
+        self.schemas: Dict[str, CatalogNode] = {}
+        self.nodes:   Dict[str, CatalogNode] = {}  # Treeview item -> rendered node
+
+    def clear(self):
+        self.schemas = {}
+        self.nodes   = {}
+
+    def add_schema(self, name, table_count) -> CatalogNode:
+        schema = CatalogNode(name, 'schema')
+        schema.add('Tables', 'tables_folder', count=table_count)
+        self.schemas[name] = schema
+        return schema
+
+    def render(self, catalog_node, item):
+        """Record the Treeview *item* rendering *catalog_node*."""
+        catalog_node.node = item
+        self.nodes[item]  = catalog_node
+        return item
+
+    def forget(self, catalog_node):
+        """Drop the rendered items of the children of *catalog_node* (before they are read again)."""
+        for child in catalog_node.children:
+            self.forget(child)
+            self.nodes.pop(child.node, None)
+        catalog_node.children = []
+        catalog_node.by_name  = {}
+        catalog_node.loaded   = False
+        catalog_node.shown    = 0
+
+    def object_of(self, item) -> Optional[CatalogNode]:
+        return self.nodes.get(item)
+
+
+class MetadataCache:
+    """
+    (column names, rows) of catalog queries by their SQL text, shared by the tree,
+    the structure views and the prefetcher. Thread safe; cleared on (re)connect and
+    after DDL. Every clear() starts a new generation: a result read before a clear
+    is stored with put(..., generation) and dropped if the cache was cleared since.
+    """
+
+    def __init__(self):
+        self._results: Dict[str, Tuple[List[str], list]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def __contains__(self, sql) -> bool:
+        return sql in self._results
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, sql) -> Optional[Tuple[List[str], list]]:
+        return self._results.get(sql)
+
+    def put(self, sql, columns, rows, generation=None):
+        """Store a result; with *generation*, only if the cache was not cleared since it was taken."""
+        with self._lock:
+            if generation is None or generation == self.generation:
+                self._results[sql] = (list(columns), list(rows))
+
+    def clear(self):
+        with self._lock:
+            self._results = {}
+            self.generation += 1
+
+
+class CatalogPrefetcher:
+    """
+    Runs catalog queries ahead of the user on its own connection, at most one
+    statement per *interval* seconds, and stores the results in a MetadataCache.
+
+    *plan* is a generator of SQL texts in priority order; it may read the cache to
+    decide what comes next (e.g. the structures of the tables of a schema once the
+    table names are in). Statements already cached are skipped, and failures are
+    ignored: the object is simply read on demand later. Each statement is followed
+    by a rollback, so that no read transaction (and its snapshot) stays open.
+    """
+
+    def __init__(self, open_connection: Callable, cache: MetadataCache, plan: Iterator[str], interval=0.05):
+        self.open_connection = open_connection  # () -> connection usable from the prefetch thread
+        self.cache           = cache
+        self.plan            = plan
+        self.interval        = interval
+        self.statements_run  = 0
+        self.stopped         = False
+        self._thread         = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.stopped = True
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self):
+        try:
+            connection = self.open_connection()
+        except Exception:
+            return
+        try:
+            cursor = connection.cursor()
+            for sql in self.plan:
+                if self.stopped:
+                    return
+                if sql in self.cache:
+                    continue
+                generation = self.cache.generation  # a clear (DDL, new connection) during the query voids its result
+                try:
+                    cursor.execute(sql)
+                    columns = [description[0] for description in cursor.description or ()]
+                    rows    = cursor.fetchall()
+                    if not self.stopped:
+                        self.cache.put(sql, columns, rows, generation)
+                except Exception:
+                    pass
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass
+                self.statements_run += 1
+                time.sleep(self.interval)
+            cursor.close()
+        finally:
+            connection.close()
@@ -0,0 +1,155 @@
+"""
+ColumnProfiler.py - Profile of every column of a table or of a result
+
+A profile gives, per column: rows, nulls, distinct values, min, max, average and
+the most frequent values.
+- On a table it comes from one aggregate query per dialect (Queries.get_profile_sql),
+  a single scan of the table or of a sample of it, completed by the planner statistics
+  where the dialect keeps distinct estimates (Queries.get_column_statistics_sql)
+- On a result already in memory it is computed locally, each column read once, from
+  the ResultStore of the grid
+"""
+
+import math
+from collections import Counter
+from decimal     import Decimal, localcontext
+from typing      import List, Sequence
+
+from BulkTransfer import ColumnTypeMapper
+from ResultStore  import ResultStore, LobValue
+
+
+class ColumnProfiler:
+    # What the aggregate query computes for a column, from its type:
+    # numeric   - distinct, min, max, avg, mode
+    # ordered   - distinct, min, max, mode (text, dates)
+    # unordered - distinct, mode (booleans: SQL Server cannot MIN a BIT, types without MIN/MAX)
+    # opaque    - nulls only (LOBs, binaries, XML/JSON: no comparison operators)
+    KINDS = ("numeric", "ordered", "unordered", "opaque")
+
+    # Types without equality or ordering in SQL (PostgreSQL reports extension types as USER-DEFINED)
+    OPAQUE_TYPES = {"CLOB", "NCLOB", "LONG", "BFILE", "NTEXT", "XML", "XMLTYPE", "JSON", "IMAGE",
+                    "SQL_VARIANT", "GEOMETRY", "GEOGRAPHY", "USER-DEFINED"}
+
+    # Types with equality but no MIN/MAX aggregate, per connection type
+    UNORDERED_TYPES = {"PostgreSQL": {"UUID", "TSVECTOR", "JSONB"},
+                       "MSSQL":      {"UNIQUEIDENTIFIER"}}
+
+    COLUMNS = ["Column", "Rows", "Nulls", "Null %", "Distinct", "Min", "Max", "Avg", "Top values"]
+
+    # Columns profiled per aggregate query (Oracle allows 1000 select expressions, 6 are used per column)
+    COLUMNS_PER_QUERY = 150
+
+    # Widest table still getting exact distinct counts where there are no estimates:
+    # each COUNT(DISTINCT) sorts or hashes its column
+    EXACT_DISTINCT_COLUMNS = 20
+
+    @classmethod
+    def kind_of(cls, type_name, scale=None, connection_type=None) -> str:
+        base = ColumnTypeMapper.base_type(type_name)
+        if base in cls.OPAQUE_TYPES or (base == "TEXT" and connection_type == "MSSQL"):
+            return "opaque"
+        if base in cls.UNORDERED_TYPES.get(connection_type, ()):
+            return "unordered"
+        category = ColumnTypeMapper.category(type_name, scale)
+        if category in ("integer", "decimal", "float"):
+            return "numeric"
+        if category == "boolean":
+            return "unordered"
+        if category == "binary":
+            return "opaque"
+        return "ordered"
+
+    @staticmethod
+    def _text(value) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, float):
+            return f"{value:.6g}"
+        if isinstance(value, Decimal):
+            return f"{value.normalize():f}" if value == value.to_integral() else f"{float(value):.6g}"
+        text = str(value)
+        return text if len(text) <= 60 else text[:57] + "..."
+
+    @classmethod
+    def _row(cls, column, rows, nulls, distinct, minimum, maximum, average, top) -> tuple:
+        null_percent = f"{100.0 * nulls / rows:.1f}%" if rows else ""
+        return (column, rows, nulls, null_percent, "" if distinct is None else distinct,
+                cls._text(minimum), cls._text(maximum), cls._text(average), top)
+
+    @classmethod
+    def from_aggregate_row(cls, columns: Sequence[str], row: Sequence) -> List[tuple]:
+        """Profile rows from the single row of Queries.get_profile_sql over *columns*."""
+        total   = row[0]
+        profile = []
+        for index, column in enumerate(columns):
+            non_null, distinct, minimum, maximum, average, mode = row[1 + 6 * index: 7 + 6 * index]
+            profile.append(cls._row(column, total, total - non_null, distinct, minimum, maximum, average,
+                                    cls._text(mode)))
+        return profile
+
+    @classmethod
+    def with_statistics(cls, profile: Sequence[tuple], kinds: Sequence[str], statistics: Sequence) -> List[tuple]:
+        """
+        *profile* rows completed by the rows (column, distinct, values, frequencies) of
+        Queries.get_column_statistics_sql: estimated distinct count and most frequent values.
+        """
+        by_column = {str(row[0]).lower(): row[1:] for row in statistics}
+        completed = []
+        for row, kind in zip(profile, kinds):
+            found = by_column.get(str(row[0]).lower())
+            if found is None or kind == "opaque":
+                completed.append(row)
+                continue
+            distinct, values, frequencies = found
+            top = ", ".join(f"{cls._text(value)} ({100.0 * frequency:.1f}%)"
+                            for value, frequency in zip(values or (), frequencies or ()))
+            completed.append(row[:4] + (row[4] if distinct is None else int(distinct),) + row[5:8] + (top or row[8],))
+        return completed
+
+    @classmethod
+    def of_result(cls, store: ResultStore, top=3) -> List[tuple]:
+        """
+        Profile rows of a result in memory, with the *top* most frequent values of each
+        column. A column is read once into its value counts; distinct count, min, max and
+        average then come from the distinct values only.
+        """
+        profile = []
+        for index, column in enumerate(store.columns):
+            counts = Counter()
+            nulls  = 0
+            try:
+                for row in store.rows:
+                    value = row[index]
+                    if value is None:
+                        nulls += 1
+                    else:
+                        counts[value] += 1
+            except TypeError:  # unhashable values (memoryview...)
+                aggregate = store.aggregate(index)
+                profile.append(cls._row(column, len(store), aggregate["nulls"], None, aggregate.get("min"),
+                                        aggregate.get("max"), aggregate.get("avg"), ""))
+                continue
+
+            minimum = maximum = average = None
+            if counts:
+                kinds = set(map(type, counts))
+                plain = kinds <= {int, float, Decimal} or (len(kinds) == 1 and LobValue not in kinds)
+                key   = None if plain else store.sort_key
+                minimum, maximum = min(counts, key=key), max(counts, key=key)
+                if kinds <= {int, float, Decimal}:
+                    average = cls._total(counts, kinds) / sum(counts.values())
+            top_text = ", ".join(f"{cls._text(value)} ({count})" for value, count in counts.most_common(top))
+            profile.append(cls._row(column, len(store), nulls, len(counts) or None, minimum, maximum, average, top_text))
+        return profile
+
+    @staticmethod
+    def _total(counts: Counter, kinds) -> object:
+        """Sum of the values counted in *counts*, as ResultStore.aggregate sums them."""
+        if float in kinds:
+            return math.fsum(value * count for value, count in counts.items())
+        if Decimal in kinds:
+            with localcontext() as context:
+                context.prec = ResultStore.SUM_PRECISION
+                return sum((value * count for value, count in counts.items()), Decimal(0))
+        return sum(value * count for value, count in counts.items())
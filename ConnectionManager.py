@@ -4,6 +4,7 @@ import sqlite3
 import psycopg2
 import oracledb
 import threading  # to timeout connection testing
+import queue
 
 # Conditionally import pyodbc only on Windows
 import sys
@@ -22,6 +23,88 @@ class ConnectionManager:
         self.panel_status_bar = panel_status_bar
         self.connection_name: Optional[str] = None
         self.credential_manager = credential_manager
+        self.query_manager = None
+
+    def set_query_manager(self, query_manager):
+        self.query_manager = query_manager
+
+    # Status bar suffix shown after "Connected via: <name>" for each connection type
+    CONNECTION_TYPE_LABELS = {
+        "Oracle":     "",
+        "SQLite":     " (SQLite)",
+        "OracleDB":   " (OracleDB)",
+        "PostgreSQL": " (PostgreSQL)",
+        "MSSQL":      " (SQL Server)",
+    }
+
+    def open_connection(self, connection_name: str, shared: bool = False):
+        """
+        Open a new connection for a stored *connection_name* and return
+        (connection, connection_type). The active connection is not touched.
+        shared: the connection may be used from other threads than the opening one.
+        Raises on failure.
+        """
+        conn_type = self.credential_manager.get_connection_type_offline(connection_name)
+
+        if conn_type == "Oracle":
+            conn_str = self.credential_manager.get_conn_string(connection_name)
+            if not pyodbc:
+                raise Exception("pyodbc module is not available")
+            return pyodbc.connect(conn_str), conn_type
+        elif conn_type == "SQLite":
+            db_path = self.credential_manager.get_sqlite_conn_string(connection_name)
+            return sqlite3.connect(db_path, check_same_thread=not shared), conn_type
+        elif conn_type == "OracleDB":
+            params = self.credential_manager.get_oracledb_conn_params(connection_name)
+            connection = oracledb.connect(
+                user=params["user"],
+                password=params["password"],
+                host=params["host"],
+                port=int(params["port"]),
+                sid=params["sid"],
+            )
+            return connection, conn_type
+        elif conn_type == "PostgreSQL":
+            params = self.credential_manager.get_postgresql_conn_params(connection_name)
+            ssl_args = {"sslmode": params["sslmode"]}
+            if params.get("sslrootcert"):
+                ssl_args["sslrootcert"] = params["sslrootcert"]
+            connection = psycopg2.connect(
+                host=params["host"],
+                port=int(params["port"]),
+                dbname=params["database"],
+                user=params["user"],
+                password=params["password"],
+                **ssl_args,
+            )
+            return connection, conn_type
+        elif conn_type == "MSSQL":
+            params = self.credential_manager.get_mssql_conn_params(connection_name)
+            server = f"{params['host']},{params['port']}" if params.get("port") else params["host"]
+            if params.get("auth_type") == "Windows":
+                conn_str = (
+                    f"DRIVER={params['driver']};"
+                    f"SERVER={server};"
+                    f"DATABASE={params['database']};"
+                    f"Trusted_Connection=yes;"
+                    f"Encrypt={params['encrypt']};"
+                    f"TrustServerCertificate={params['trust_server_cert']};"
+                )
+            else:
+                conn_str = (
+                    f"DRIVER={params['driver']};"
+                    f"SERVER={server};"
+                    f"DATABASE={params['database']};"
+                    f"UID={params['user']};"
+                    f"PWD={params['password']};"
+                    f"Encrypt={params['encrypt']};"
+                    f"TrustServerCertificate={params['trust_server_cert']};"
+                )
+            if not pyodbc:
+                raise Exception("pyodbc module is not available")
+            return pyodbc.connect(conn_str), conn_type
+        else:
+            raise ValueError(f"Unknown connection type: {conn_type}")
 
     def connect_with_credman(self, connection_name: str):
         """Connect using Windows Credential Manager via CredentialManager.py"""
@@ -30,86 +113,18 @@ class ConnectionManager:
 
         try:
             conn_type = self.credential_manager.get_connection_type_offline(connection_name)
-
-            if conn_type == "Oracle":
-                conn_str = self.credential_manager.get_conn_string(connection_name)
-                if pyodbc:
-                    self.db_connection.current_connection = pyodbc.connect(conn_str)
-                else:
-                    raise Exception("pyodbc module is not available")
-                self.db_connection.current_connection_type = "Oracle"
-                self.connection_name = connection_name
-                self.panel_status_bar.set_status(f"Connected via: {connection_name}")
-                self.panel_database_tree.load_database_objects()
-            elif conn_type == "SQLite":
-                db_path = self.credential_manager.get_sqlite_conn_string(connection_name)
-                self.db_connection.current_connection = sqlite3.connect(db_path)
-                self.db_connection.current_connection_type = "SQLite"
-                self.connection_name = connection_name
-                self.panel_status_bar.set_status(f"Connected via: {connection_name} (SQLite)")
-                self.panel_database_tree.load_database_objects()
-            elif conn_type == "OracleDB":
-                params = self.credential_manager.get_oracledb_conn_params(connection_name)
-                self.db_connection.current_connection = oracledb.connect(
-                    user=params["user"],
-                    password=params["password"],
-                    host=params["host"],
-                    port=int(params["port"]),
-                    sid=params["sid"],
-                )
-                self.db_connection.current_connection_type = "OracleDB"
-                self.connection_name = connection_name
-                self.panel_status_bar.set_status(f"Connected via: {connection_name} (OracleDB)")
-                self.panel_database_tree.load_database_objects()
-            elif conn_type == "PostgreSQL":
-                params = self.credential_manager.get_postgresql_conn_params(connection_name)
-                ssl_args = {"sslmode": params["sslmode"]}
-                if params.get("sslrootcert"):
-                    ssl_args["sslrootcert"] = params["sslrootcert"]
-                self.db_connection.current_connection = psycopg2.connect(
-                    host=params["host"],
-                    port=int(params["port"]),
-                    dbname=params["database"],
-                    user=params["user"],
-                    password=params["password"],
-                    **ssl_args,
-                )
-                self.db_connection.current_connection_type = "PostgreSQL"
-                self.connection_name = connection_name
-                self.panel_status_bar.set_status(f"Connected via: {connection_name} (PostgreSQL)")
-                self.panel_database_tree.load_database_objects()
-            elif conn_type == "MSSQL":
-                params = self.credential_manager.get_mssql_conn_params(connection_name)
-                server = f"{params['host']},{params['port']}" if params.get("port") else params["host"]
-                if params.get("auth_type") == "Windows":
-                    conn_str = (
-                        f"DRIVER={params['driver']};"
-                        f"SERVER={server};"
-                        f"DATABASE={params['database']};"
-                        f"Trusted_Connection=yes;"
-                        f"Encrypt={params['encrypt']};"
-                        f"TrustServerCertificate={params['trust_server_cert']};"
-                    )
-                else:
-                    conn_str = (
-                        f"DRIVER={params['driver']};"
-                        f"SERVER={server};"
-                        f"DATABASE={params['database']};"
-                        f"UID={params['user']};"
-                        f"PWD={params['password']};"
-                        f"Encrypt={params['encrypt']};"
-                        f"TrustServerCertificate={params['trust_server_cert']};"
-                    )
-                if pyodbc:
-                    self.db_connection.current_connection = pyodbc.connect(conn_str)
-                else:
-                    raise Exception("pyodbc module is not available")
-                self.db_connection.current_connection_type = "MSSQL"
-                self.connection_name = connection_name
-                self.panel_status_bar.set_status(f"Connected via: {connection_name} (SQL Server)")
-                self.panel_database_tree.load_database_objects()
-            else:
+            if conn_type not in self.CONNECTION_TYPE_LABELS:
                 messagebox.showerror("Connection Error", f"Unknown connection type: {conn_type}")
+                return
+
+            connection, conn_type = self.open_connection(connection_name)
+            self.db_connection.current_connection = connection
+            self.db_connection.current_connection_type = conn_type
+            self.connection_name = connection_name
+            if self.query_manager:
+                self.query_manager.connection_name = connection_name  # selects the limits of this connection
+            self.panel_status_bar.set_status(f"Connected via: {connection_name}{self.CONNECTION_TYPE_LABELS[conn_type]}")
+            self.panel_database_tree.load_database_objects()
 
         except ImportError as e:
             messagebox.showerror("Error", f"CredentialManager module not found: {str(e)}")
@@ -124,9 +139,21 @@ class ConnectionManager:
         except Exception as e:
             messagebox.showerror("Connection Error", f"Failed to connect: {str(e)}")
 
+    def create_pool(self, size: int):
+        """Return a ConnectionPool of up to *size* extra connections to the active connection name."""
+        if not self.connection_name:
+            raise Exception("Not connected")
+        return ConnectionPool(self, self.connection_name, size)
+
     def disconnect(self):
         """Disconnect from database"""
         if self.db_connection.current_connection:
+            if self.query_manager and self.query_manager.transaction_pending:
+                if messagebox.askyesno("Pending Transaction", "Commit the pending changes before disconnecting?"):
+                    result = self.query_manager.commit()
+                    if not result["success"]:
+                        messagebox.showerror("Commit Failed", result["error"])
+                self.query_manager.reset_transaction_state()
             try:
                 self.db_connection.current_connection.close()
             except:
@@ -276,4 +303,47 @@ class ConnectionManager:
             return True
         except Exception as e:
             messagebox.showerror("Error", f"Failed to delete connection: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+
+class ConnectionPool:
+    """
+    Extra connections to one stored connection, for background work that must not
+    share the active connection. Connections are opened on demand, up to *size*,
+    and can be used from any thread (one user at a time).
+    """
+
+    def __init__(self, connection_manager, connection_name: str, size: int):
+        self.connection_manager = connection_manager
+        self.connection_name    = connection_name
+        self.size               = max(1, size)
+        self.connection_type    = connection_manager.credential_manager.get_connection_type_offline(connection_name)
+        self._idle   = queue.Queue()
+        self._opened = []
+        self._lock   = threading.Lock()
+
+    def acquire(self):
+        """Return an idle connection, opening one while fewer than size are open, else wait for a release."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._opened) < self.size:
+                connection, _ = self.connection_manager.open_connection(self.connection_name, shared=True)
+                self._opened.append(connection)
+                return connection
+        return self._idle.get()
+
+    def release(self, connection):
+        self._idle.put(connection)
+
+    def close_all(self):
+        with self._lock:
+            for connection in self._opened:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            self._opened = []
+        self._idle = queue.Queue()
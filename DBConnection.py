@@ -2,6 +2,8 @@ import sqlite3
 import psycopg2
 import oracledb
 from QueryManager import QueriesSQLite, QueriesOracle, QueriesPostgreSQL, QueriesMSSQL
+from BulkTransfer import BulkLoader, BulkLoaderOracleDB, BulkLoaderPostgreSQL, BulkLoaderMSSQL, BulkLoaderSQLite
+from BulkTransfer import Exporter, ExporterOracleDB, ExporterPostgreSQL, ExporterSQLite
 
 # Conditionally import pyodbc only on Windows
 import sys
@@ -26,16 +28,24 @@ class DBConnection:
             "ssh_tunnel": ssh_tunnel,
         }
 
-    def get_queries_instance(self, connection):
-        # Prefer the explicit type tracker when available
-        if self.current_connection_type == "MSSQL":
+    @staticmethod
+    def get_queries_for_type(connection_type):
+        """Queries class instance of a connection type, None if the type is unknown."""
+        if connection_type == "MSSQL":
             return QueriesMSSQL()
-        if self.current_connection_type == "PostgreSQL":
+        if connection_type == "PostgreSQL":
             return QueriesPostgreSQL()
-        if self.current_connection_type in ("Oracle", "OracleDB"):
+        if connection_type in ("Oracle", "OracleDB"):
             return QueriesOracle()
-        if self.current_connection_type == "SQLite":
+        if connection_type == "SQLite":
             return QueriesSQLite()
+        return None
+
+    def get_queries_instance(self, connection):
+        # Prefer the explicit type tracker when available
+        queries = self.get_queries_for_type(self.current_connection_type)
+        if queries:
+            return queries
         # Fallback: isinstance checks (cannot distinguish Oracle ODBC from MSSQL)
         if type(connection) == sqlite3.Connection:
             return QueriesSQLite()
@@ -48,6 +58,41 @@ class DBConnection:
         else:
             return QueriesOracle()
 
+    def get_bulk_loader(self, schema, table, structure_rows, connection=None, connection_type=None):
+        """
+        Return the fastest loader of the driver for appending rows to *table*.
+        structure_rows are the get_table_structure() rows of the loaded columns, in file order.
+        connection/connection_type default to the current connection (e.g. another connection for copies).
+        """
+        if connection is None:
+            connection, connection_type = self.current_connection, self.current_connection_type
+        queries = self.get_queries_for_type(connection_type)
+        if connection_type == "PostgreSQL":
+            return BulkLoaderPostgreSQL(connection, queries, schema, table, structure_rows)
+        if connection_type == "OracleDB":
+            return BulkLoaderOracleDB(connection, queries, schema, table, structure_rows)
+        if connection_type == "MSSQL":
+            return BulkLoaderMSSQL(connection, queries, schema, table, structure_rows)
+        if connection_type == "SQLite":
+            return BulkLoaderSQLite(connection, queries, schema, table, structure_rows)
+        # Oracle through ODBC: plain executemany
+        return BulkLoader(connection, queries, schema, table, structure_rows)
+
+    def get_exporter(self, delimiter="\t", connection=None, header=True):
+        """
+        Return the exporter using the native bulk channel of the current driver, if it has one.
+        *connection* defaults to the current connection; pooled connections of the same type may be given.
+        """
+        connection = connection or self.current_connection
+        if self.current_connection_type == "PostgreSQL":
+            return ExporterPostgreSQL(connection, delimiter, header)
+        if self.current_connection_type == "OracleDB":
+            return ExporterOracleDB(connection, delimiter, header)
+        if self.current_connection_type == "SQLite":
+            return ExporterSQLite(connection, delimiter, header)
+        # ODBC drivers: generic fetchmany loop
+        return Exporter(connection, delimiter, header)
+
     def get_connection_type(self):
         """Get the type of the current database connection"""
         if not self.current_connection:
@@ -4,7 +4,7 @@ import json
 import os
 import signal
 from DBConnection        import DBConnection
-from Panels              import PanelStatusBar
+from Panels              import PanelStatusBar, QueryLimitsDialog
 from PanelSQLQueryEditor import PanelSQLQueryEditor
 from PanelDatabaseTree   import PanelDatabaseTree
 from PanelQueryResult    import PanelQueryResult
@@ -55,6 +55,12 @@ class Theme:
                             anchor='w',
                             relief='flat',
                             font=('Helvetica', 9))
+        self.style.configure('StatusPending.TLabel',
+                            background=secondary_color,
+                            foreground=error_color,
+                            anchor='e',
+                            relief='flat',
+                            font=('Helvetica', 9, 'bold'))
 
         # Style for buttons
         self.style.configure('TButton',
@@ -234,12 +240,21 @@ class DBExp:
 
         self.panel_query_result     = PanelQueryResult(self.root, self.panel_status_bar)
         self.query_manager          = QueryManager(self.db_connection, self.panel_query_result)
+        self.query_manager.dml_batch_size = self.config.get("dml_batch_size", self.query_manager.dml_batch_size)
+        self.query_manager.auto_commit    = self.config.get("auto_commit", True)
+        self.query_manager.fetch_lobs_inline = self.config.get("fetch_lobs_inline", False)
+        self.query_manager.query_limits.update(self.config.get("query_limits", {}))
+        self.query_manager.connection_limits = self.config.get("connection_limits", {})
+        self.query_manager.on_transaction_state_change = self.update_transaction_indicator
+        self.update_transaction_indicator()
         self.panel_sql_query_editor = PanelSQLQueryEditor(self.panel_query_result, self.db_connection, self.query_manager)
         self.panel_query_result.set_sql_query_editor(self.panel_sql_query_editor)
 
         # Left Panel: DB Treeview
         self.panel_database_tree    = PanelDatabaseTree(main_paned, self.db_connection, self.panel_sql_query_editor, self.query_manager)
         self.panel_database_tree.setup()
+        self.panel_database_tree.recent_objects = self.config.get("recent_objects", {})
+        self.panel_database_tree.sample_size    = self.config.get("sample_size", self.panel_database_tree.sample_size)
 
         # Right container for SQL Query and Query Result
         right_paned = ttk.PanedWindow(main_paned, orient=tk.VERTICAL)
@@ -259,6 +274,9 @@ class DBExp:
             self.panel_status_bar,
             self.credential_manager
         )
+        self.connection_manager.set_query_manager(self.query_manager)
+        self.panel_database_tree.set_connection_manager(self.connection_manager)
+        self.panel_sql_query_editor.set_connection_manager(self.connection_manager)
 
     def load_config(self) -> dict:
         """Load persistent configuration"""
@@ -275,10 +293,18 @@ class DBExp:
         # Save zoom settings
         if hasattr(self, 'panel_database_tree'):
             self.config["database_tree_zoom"] = self.panel_database_tree.zoom_level
+            self.config["recent_objects"]     = self.panel_database_tree.recent_objects
+            self.config["sample_size"]        = self.panel_database_tree.sample_size
         if hasattr(self, 'panel_sql_query_editor'):
             self.config["query_editor_zoom"] = self.panel_sql_query_editor.zoom_level
         if hasattr(self, 'panel_query_result'):
             self.config["query_result_zoom"] = self.panel_query_result.zoom_level
+        if self.query_manager:
+            self.config["dml_batch_size"] = self.query_manager.dml_batch_size
+            self.config["auto_commit"]    = self.query_manager.auto_commit
+            self.config["fetch_lobs_inline"] = self.query_manager.fetch_lobs_inline
+            self.config["query_limits"]      = self.query_manager.query_limits
+            self.config["connection_limits"] = self.query_manager.connection_limits
 
         with open(self.CONFIG_FILE, 'w') as f:
             json.dump(self.config, f)
@@ -323,7 +349,8 @@ class DBExp:
         )
 
         # Add submenu for existing connections
-        self.existing_connections_menu = tk.Menu(conn_menu, tearoff=0)
+        # Rebuilt on opening, so connections registered meanwhile (e.g. local snapshots) show up
+        self.existing_connections_menu = tk.Menu(conn_menu, tearoff=0, postcommand=self.populate_existing_connections_menu)
         conn_menu.add_cascade(label="Connect with Existing", menu=self.existing_connections_menu)
 
         # Add manage connections command
@@ -347,10 +374,100 @@ class DBExp:
         menubar.add_cascade(label="Query", menu=query_menu)
         query_menu.add_command(label="Execute (F5)",      command=self.panel_sql_query_editor.execute)
         query_menu.add_command(label="Execute Selection", command=self.panel_sql_query_editor.execute_selection)
+        query_menu.add_command(label="Execute with Limits...", command=self.panel_sql_query_editor.execute_with_limits)
+        query_menu.add_command(label="Execute on Tab Results (Local)", command=self.panel_sql_query_editor.execute_local)
+        query_menu.add_command(label="Export Query to File...", command=self.panel_sql_query_editor.export_query_to_file)
+        query_menu.add_command(label="Snapshot Query to Local...", command=self.panel_sql_query_editor.snapshot_query_to_local)
+        query_menu.add_command(label="Compare Results...",         command=self.panel_sql_query_editor.compare_results)
+        query_menu.add_separator()
+        self.auto_commit_var = tk.BooleanVar(value=self.query_manager.auto_commit)
+        query_menu.add_checkbutton(
+            label="Auto-commit",
+            variable=self.auto_commit_var,
+            command=self.toggle_auto_commit
+        )
+        query_menu.add_command(label="Commit",   command=self.commit_transaction)
+        query_menu.add_command(label="Rollback", command=self.rollback_transaction)
+        query_menu.add_separator()
+        self.fetch_lobs_inline_var = tk.BooleanVar(value=self.query_manager.fetch_lobs_inline)
+        query_menu.add_checkbutton(
+            label="Fetch Small LOBs Inline (OracleDB)",
+            variable=self.fetch_lobs_inline_var,
+            command=lambda: setattr(self.query_manager, "fetch_lobs_inline", self.fetch_lobs_inline_var.get())
+        )
+        query_menu.add_command(label="Query Limits...", command=self.edit_query_limits)
 
         # Populate existing connections menu
         self.populate_existing_connections_menu()
 
+    def update_transaction_indicator(self, pending=None):
+        """Refresh the transaction indicator of the status bar."""
+        self.panel_status_bar.set_transaction_state(
+            self.query_manager.auto_commit,
+            self.query_manager.transaction_pending
+        )
+
+    def edit_query_limits(self):
+        """Edit the timeout and fetch limits of every connection, or of the current one only."""
+        name   = self.query_manager.connection_name
+        scopes = ["All connections"]
+        if name:
+            scopes.append(f"This connection only ({name})")
+        dialog = QueryLimitsDialog(self.root, "Query Limits", self.query_manager.limits_for(), scopes,
+                                   scope=1 if name in self.query_manager.connection_limits else 0)
+        if not dialog.result:
+            return
+        limits, scope = dialog.result
+        if scope == 1:
+            self.query_manager.connection_limits[name] = limits
+        else:
+            self.query_manager.query_limits = limits
+            self.query_manager.connection_limits.pop(name, None)
+        self.save_config()
+
+    def toggle_auto_commit(self):
+        """Switch between auto-commit and manual transaction mode."""
+        enabled = self.auto_commit_var.get()
+        if enabled and self.query_manager.transaction_pending:
+            answer = messagebox.askyesnocancel(
+                "Pending Transaction",
+                "Commit the pending changes before switching to auto-commit?\n"
+                "Choose No to roll them back."
+            )
+            if answer is None:
+                self.auto_commit_var.set(False)
+                return
+            if not answer:
+                self.rollback_transaction()
+
+        result = self.query_manager.set_auto_commit(enabled)
+        if not result["success"]:
+            self.auto_commit_var.set(self.query_manager.auto_commit)
+            messagebox.showerror("Commit Failed", result["error"])
+        self.update_transaction_indicator()
+
+    def commit_transaction(self):
+        """Commit the current transaction."""
+        if not self.db_connection.current_connection:
+            messagebox.showwarning("Not Connected", "Please connect to a database first")
+            return
+        result = self.query_manager.commit()
+        if result["success"]:
+            self.panel_status_bar.set_query_result_status(result["message"])
+        else:
+            messagebox.showerror("Commit Failed", result["error"])
+
+    def rollback_transaction(self):
+        """Roll back the current transaction."""
+        if not self.db_connection.current_connection:
+            messagebox.showwarning("Not Connected", "Please connect to a database first")
+            return
+        result = self.query_manager.rollback()
+        if result["success"]:
+            self.panel_status_bar.set_query_result_status(result["message"])
+        else:
+            messagebox.showerror("Rollback Failed", result["error"])
+
     def change_storage_method(self):
         """Change the storage method between Windows Credential Manager and cred file"""
         current_method = self.storage_method_var.get()
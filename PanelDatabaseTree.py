@@ -1,14 +1,40 @@
-from Panels import *
+from Panels       import *
+from BulkTransfer import DelimitedFileReader, TablePartitioner, ParallelTableExport, TableCopy, ColumnTypeMapper, TableDiff, \
+                         SchemaCatalog, SchemaDiff, ParallelRowCount
+from QueryManager import QueriesSQLite
+from CatalogModel import DatabaseCatalog, CatalogPrefetcher
+from TableBrowser import KeysetPager, TableSample
+from ColumnProfiler import ColumnProfiler
+from tkinter      import simpledialog
+import time
 
 
 class PanelDatabaseTree:
+    IMPORT_CHUNK_SIZE = 5000  # file records sent to the bulk loader per step
+    COUNT_WORKERS     = 4     # pooled connections used by count_records
+    TABLE_PAGE_SIZE   = 500   # table nodes added per expansion of a Tables folder (then "Show more...")
+    PREFETCH_INTERVAL = 0.05  # seconds between two catalog queries of the background prefetch
+    PREFETCH_TABLES   = 200   # tables of the current schema whose columns, keys and indexes are prefetched
+    RECENT_OBJECTS    = 30    # recently opened tables remembered per connection, prefetched first
+    BROWSE_PAGE_SIZE  = 500   # rows per page of Browse Table
+
     def __init__(self, parent, db_connection, panel_sql_query_editor, query_manager):
         self.parent = parent
         self.db_connection = db_connection
         self.panel_sql_query_editor = panel_sql_query_editor
         self.queries = None  # Will be set based on connection type
         self.query_manager = query_manager
+        self.connection_manager = None  # Set by DBExp, opens the pooled connections of background jobs
         self.zoom_level = 100  # Default zoom level
+        self.catalog = DatabaseCatalog()  # objects of the active connection, rendered lazily by the tree
+        self.table_statistics = {}  # schema -> {table name (lower case): (rows, bytes)}, see show_table_statistics
+        self.sort_tables_by_size = False
+        self.prefetcher = None  # CatalogPrefetcher of the active connection
+        self.recent_objects = {}  # connection name -> [[schema, table], ...], most recent first; saved in the config
+        self.sample_size = "1000"  # last size asked by Sample Rows, a percentage ("1%") or a row count; saved in the config
+
+    def set_connection_manager(self, connection_manager):
+        self.connection_manager = connection_manager
 
     def setup(self):
         """Panel 1: Database object tree"""
@@ -100,6 +126,12 @@ class PanelDatabaseTree:
         # Add tooltip
         Tooltip(refresh_btn, "Refresh database tree")
 
+        self.show_sizes_var = tk.BooleanVar(value=False)
+        sizes_cb = ttk.Checkbutton(self.refresh_frame, text="sizes", variable=self.show_sizes_var,
+                                   command=self.toggle_size_column)
+        sizes_cb.pack(side=tk.LEFT, padx=2)
+        Tooltip(sizes_cb, "Show rows and size of the tables of expanded schemas")
+
         
         # ── Breadcrumb Frame ──────────────────────────────────────────────
         # Container for ariane wire (Nautilus style)
@@ -119,24 +151,42 @@ class PanelDatabaseTree:
         self.db_tree = Helper.create_treeview_with_scrollbars(tree_container)
         self.db_tree.configure(style='DBTree.Treeview')
 
+        # Optional rows/size column of table nodes, hidden until "sizes" is checked.
+        # The first values keep their (schema, type, name, overload) meaning.
+        self.db_tree['columns']        = ('schema', 'type', 'name', 'extra', 'size')
+        self.db_tree['displaycolumns'] = ()
+        self.db_tree.heading('size', text='Rows | Size', command=self.toggle_table_size_sort)
+        self.db_tree.column('size', width=170, anchor='e', stretch=False)
+        self.db_tree.heading('#0', text='Object')
+
         # Context menu for tables
         table_commands = [
             ("View first 100 rows",  lambda: self.view_table_data(100)),
             ("View first 1000 rows", lambda: self.view_table_data(1000)),
+            ("Browse Table (Pages)", lambda: self.browse_table()),
+            ("Sample Rows...",       lambda: self.sample_rows()),
+            ("Profile Columns...",   lambda: self.profile_table()),
             ("-------------------------", None),
             ("View Structure",       lambda: self.panel_sql_query_editor.show_table_structure(
-                *self.db_tree.item(self.db_tree.selection()[0])['values'][0:3:2]
+                *self._schema_and_name(self.db_tree.selection()[0])
             )),
             ("View Indexes",         lambda: self.panel_sql_query_editor.show_table_indexes(
-                *self.db_tree.item(self.db_tree.selection()[0])['values'][0:3:2]
+                *self._schema_and_name(self.db_tree.selection()[0])
             )),
             ("View Keys",            lambda: self.panel_sql_query_editor.show_table_keys(
-                *self.db_tree.item(self.db_tree.selection()[0])['values'][0:3:2]
+                *self._schema_and_name(self.db_tree.selection()[0])
             )),
             ("-------------------------", None),
             ("Clone Table",          lambda: self.clone_table()),
+            ("Import File into Table...", lambda: self.import_file_into_table()),
+            ("Export Table to File...",   lambda: self.export_table_to_file()),
+            ("Parallel Export...",        lambda: self.parallel_export_table()),
+            ("Copy Table to Connection...", lambda: self.copy_table_to_connection()),
+            ("Compare with Connection...",  lambda: self.compare_table_with_connection()),
+            ("Snapshot to Local...",        lambda: self.snapshot_to_local()),
             ("-------------------------", None),
             ("Count Records",        lambda: self.count_records()),
+            ("Estimate Row Counts (Statistics)", lambda: self.estimate_row_counts()),
             ("-------------------------", None),
             ("Empty Table",          lambda: self.empty_table()),
             ("Delete Table",         lambda: self.delete_table())
@@ -147,28 +197,39 @@ class PanelDatabaseTree:
         view_commands = [
             ("View first 100 rows",  lambda: self.view_view_data(100)),
             ("View first 1000 rows", lambda: self.view_view_data(1000)),
+            ("Sample Rows...",       lambda: self.sample_rows()),
             ("-------------------------", None),
             ("View Structure",       lambda: self.show_view_structure(
-                *self.db_tree.item(self.db_tree.selection()[0])['values'][0:3:2]
+                *self._schema_and_name(self.db_tree.selection()[0])
             )),
             ("View Query",           lambda: self.view_view_query(
-                *self.db_tree.item(self.db_tree.selection()[0])['values'][0:3:2]
+                *self._schema_and_name(self.db_tree.selection()[0])
             )),
             ("View Dependencies",    lambda: self.show_view_dependencies(
-                *self.db_tree.item(self.db_tree.selection()[0])['values'][0:3:2]
+                *self._schema_and_name(self.db_tree.selection()[0])
             )),
             ("View Comment",         lambda: self.show_view_comment(
-                *self.db_tree.item(self.db_tree.selection()[0])['values'][0:3:2]
+                *self._schema_and_name(self.db_tree.selection()[0])
             )),
             ("-------------------------", None),
+            ("Snapshot to Local...", lambda: self.snapshot_to_local()),
+            ("-------------------------", None),
             ("Count Records",        lambda: self.count_records()),
             ("-------------------------", None),
             ("Delete View",          lambda: self.delete_view())
         ]
         self.view_context_menu = Helper.create_context_menu(self.db_tree, view_commands)
 
+        # Context menu for schemas
+        schema_commands = [
+            ("Estimate Row Counts (Statistics)",  lambda: self.estimate_row_counts()),
+            ("-------------------------", None),
+            ("Compare Schema with Connection...", lambda: self.compare_schema_with_connection()),
+        ]
+        self.schema_context_menu = Helper.create_context_menu(self.db_tree, schema_commands)
+
         self.db_tree.bind("<Button-3>",         self.show_tree_context_menu)
-        self.db_tree.bind("<Double-1>",         lambda e: self.view_table_data(100))
+        self.db_tree.bind("<Double-1>",         self.on_tree_double_click)
         self.db_tree.bind("<<TreeviewOpen>>",   self.on_tree_expand)
         self.db_tree.bind("<<TreeviewSelect>>", lambda e: self._update_search_checkboxes_state())
         self.db_tree.bind("<<TreeviewSelect>>", self._update_breadcrumbs)
@@ -209,7 +270,7 @@ class PanelDatabaseTree:
             # Execute clone SQL
             clone_sql = queries.get_clone_sql(schema, original_table, new_table)
             cursor    = self.query_manager.cursor_execute(clone_sql, cursor)
-            self.db_connection.current_connection.commit()
+            self.query_manager.commit_statement()
             
             messagebox.showinfo("Success", f"Table '{original_table}' cloned to '{new_table}'")
             
@@ -220,60 +281,716 @@ class PanelDatabaseTree:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to clone table: {str(e)}")
 
+    def import_file_into_table(self):
+        """Stream a CSV/TSV file into the selected table through the bulk loader of the driver."""
+        selected = self.db_tree.selection()
+        if not selected:
+            messagebox.showwarning("No Selection", "Please select a table to import into")
+            return
+
+        schema, table = self._schema_and_name(selected[0])
+
+        filepath = filedialog.askopenfilename(
+            title=f"Import into {table}",
+            filetypes=[("CSV / TSV Files", "*.csv *.tsv *.tab *.txt"), ("All Files", "*.*")]
+        )
+        if not filepath:
+            return
+
+        reader = None
+        loader = None
+        try:
+            queries = self.get_queries_instance()
+            cursor  = self.db_connection.current_connection.cursor()
+            cursor  = self.query_manager.cursor_execute(queries.get_table_structure(schema, table), cursor)
+            structure = cursor.fetchall()
+            cursor.close()
+
+            reader    = DelimitedFileReader(filepath)
+            first_row = reader.peek_row() or []
+
+            # A first line naming table columns is a header and selects/orders the loaded columns
+            by_name = {str(row[0]).lower(): row for row in structure}
+            if first_row and all(field.strip().lower() in by_name for field in first_row):
+                structure = [by_name[field.strip().lower()] for field in first_row]
+                reader.skip_row()
+            elif len(first_row) != len(structure):
+                raise ValueError(
+                    f"The file has {len(first_row)} field(s) per line, the table has {len(structure)} column(s)\n"
+                    "and the first line does not name the table columns."
+                )
+
+            loader = self.db_connection.get_bulk_loader(schema, table, structure)
+            # The import must not abort or half-keep the pending work of a manual transaction
+            guarded = self.query_manager.begin_guarded(self.query_manager.IMPORT_SAVEPOINT)
+        except Exception as e:
+            if reader:
+                reader.close()
+            if loader:
+                loader.close()
+            messagebox.showerror("Error", f"Failed to prepare import: {str(e)}")
+            return
+
+        progress = ProgressDialog(self.parent.winfo_toplevel(), "Import", f"Importing {os.path.basename(filepath)} into {schema}.{table}")
+        started  = time.perf_counter()
+
+        def finish(error=None):
+            elapsed = time.perf_counter() - started
+            reader.close()
+            loader.close()
+            progress.close()
+
+            savepoint = self.query_manager.IMPORT_SAVEPOINT
+            try:
+                if error:
+                    self.query_manager.end_guarded(savepoint, guarded, success=False)
+                elif progress.cancelled:
+                    # Cancelled: auto-commit keeps nothing, a manual transaction keeps the rows pending
+                    self.query_manager.end_guarded(savepoint, guarded, success=not self.query_manager.auto_commit)
+                else:
+                    self.query_manager.end_guarded(savepoint, guarded, success=True)
+            except Exception as e:
+                cause = f"\n\nImport error near record {reader.records_read}: {error}" if error else ""
+                messagebox.showerror("Error", f"Failed to end the import into {schema}.{table}: {str(e)}{cause}")
+                return
+
+            if error:
+                kept = ("The rows of the import were rolled back, the work pending before it is kept."
+                        if guarded else "No rows were kept.")
+                messagebox.showerror("Error", f"Import failed near record {reader.records_read}: {error}\n\n{kept}")
+                return
+            if progress.cancelled:
+                if self.query_manager.auto_commit:
+                    messagebox.showinfo("Import Cancelled", "Import cancelled, no rows were kept.")
+                else:
+                    messagebox.showinfo("Import Cancelled", f"Import cancelled, {loader.rows_loaded:,} loaded row(s) are pending: use Rollback to discard them.")
+                return
+
+            summary = f"{ProgressDialog.format_throughput(loader.rows_loaded, elapsed)} loaded into {schema}.{table}"
+            if loader.errors:
+                summary += f"\n\n{len(loader.errors):,} record(s) rejected:\n"
+                summary += "\n".join(f"record {record}: {message}" for record, message in loader.errors[:20])
+                if len(loader.errors) > 20:
+                    summary += "\n..."
+                messagebox.showwarning("Import Finished", summary)
+            else:
+                messagebox.showinfo("Import Finished", summary)
+
+        def step():
+            if progress.cancelled:
+                finish()
+                return
+            try:
+                first_record = reader.records_read + 1
+                rows = reader.read_chunk(self.IMPORT_CHUNK_SIZE)
+                if rows:
+                    loader.load(rows, first_record)
+            except Exception as e:
+                finish(str(e))
+                return
+
+            if not rows:
+                finish()
+                return
+
+            elapsed  = time.perf_counter() - started
+            fraction = reader.bytes_read() / reader.total_bytes if reader.total_bytes else None
+            progress.update_progress(reader.bytes_read(), reader.total_bytes,
+                                     ProgressDialog.format_throughput(loader.rows_loaded, elapsed, fraction))
+            progress.after(1, step)
+
+        progress.after(1, step)
+
+    def export_table_to_file(self):
+        """Export the whole selected table to a file through the native bulk channel of the driver."""
+        selected = self.db_tree.selection()
+        if not selected:
+            messagebox.showwarning("No Selection", "Please select a table to export")
+            return
+
+        schema, table = self._schema_and_name(selected[0])
+        filepath = filedialog.asksaveasfilename(
+            title=f"Export {table}",
+            initialfile=f"{table}.csv",
+            defaultextension=".csv",
+            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
+        )
+        if not filepath:
+            return
+
+        sql      = f"SELECT * FROM {self.get_queries_instance().get_qualified_name(schema, table)}"
+        exporter = self.db_connection.get_exporter()
+        ExportRunner(self.parent.winfo_toplevel(), exporter, self.query_manager, sql, filepath).start()
+
+    def parallel_export_table(self):
+        """Export the selected table as key/row ranges extracted concurrently over pooled connections."""
+        selected = self.db_tree.selection()
+        if not selected:
+            messagebox.showwarning("No Selection", "Please select a table to export")
+            return
+
+        schema, table = self._schema_and_name(selected[0])
+        root = self.parent.winfo_toplevel()
+
+        workers = simpledialog.askinteger("Parallel Export", "Number of connections:",
+                                          initialvalue=4, minvalue=1, maxvalue=32, parent=root)
+        if not workers:
+            return
+
+        filepath = filedialog.asksaveasfilename(
+            title=f"Parallel export of {table}",
+            initialfile=f"{table}.csv",
+            defaultextension=".csv",
+            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
+        )
+        if not filepath:
+            return
+
+        merge = messagebox.askyesnocancel(
+            "Parallel Export",
+            "Merge the ranges into a single ordered file?\n\n"
+            "No: keep one file per range (name.part0001.csv, ...)."
+        )
+        if merge is None:
+            return
+
+        try:
+            queries = self.get_queries_instance()
+            cursor  = self.db_connection.current_connection.cursor()
+            cursor  = self.query_manager.cursor_execute(queries.get_table_primary_keys(schema, table), cursor)
+            key_columns = [row[0] for row in cursor.fetchall()]
+            cursor  = self.query_manager.cursor_execute(queries.get_table_structure(schema, table), cursor)
+            structure = cursor.fetchall()
+
+            # Several ranges per connection keep the connections busy when ranges are uneven
+            partitioner = TablePartitioner(queries, schema, table)
+            strategy, predicates = self.query_manager.run_guarded(
+                lambda: partitioner.plan(cursor, key_columns, structure, workers * 4)
+            )
+            cursor.close()
+            pool = self.connection_manager.create_pool(workers)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to prepare parallel export: {str(e)}")
+            return
+
+        job = ParallelTableExport(
+            pool,
+            lambda connection, header: self.db_connection.get_exporter(connection=connection, header=header),
+            f"SELECT * FROM {queries.get_qualified_name(schema, table)}",
+            predicates,
+            filepath,
+            merge
+        )
+        resumed = job.load_checkpoint()
+        if resumed and not messagebox.askyesno(
+            "Resume Export",
+            f"{resumed} of {len(predicates)} ranges were exported by a previous run.\nResume with the remaining ranges?"
+        ):
+            job.done = {}
+
+        progress = ProgressDialog(root, "Parallel Export",
+                                  f"{schema}.{table}: {len(predicates)} {strategy}, {workers} connection(s)")
+        started       = time.perf_counter()
+        resumed_rows  = job.rows_written
+
+        def poll():
+            if progress.cancelled and not job.cancelled:
+                job.cancel()
+            if job.running:
+                elapsed = time.perf_counter() - started
+                progress.update_progress(len(job.done), len(predicates),
+                                         f"{len(job.done)}/{len(predicates)} ranges - "
+                                         + ProgressDialog.format_throughput(job.rows_written - resumed_rows, elapsed))
+                progress.after(200, poll)
+                return
+
+            elapsed = time.perf_counter() - started
+            pool.close_all()
+            progress.close()
+            try:
+                completed = job.finish()
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to write {filepath}: {str(e)}")
+                return
+
+            if completed:
+                target = filepath if merge else os.path.dirname(filepath)
+                messagebox.showinfo("Export Finished",
+                                    f"{ProgressDialog.format_throughput(job.rows_written - resumed_rows, elapsed)} exported to {target}")
+            elif job.errors:
+                messagebox.showerror("Error", "Parallel export failed:\n" + "\n".join(job.errors[:5])
+                                     + "\n\nFinished ranges are kept: run the export again to resume.")
+            else:
+                messagebox.showinfo("Export Cancelled",
+                                    f"{len(job.done)} of {len(predicates)} ranges exported.\n"
+                                    "Run the export again with the same file to resume.")
+
+        job.start(workers)
+        progress.after(200, poll)
+
+    def _ask_copy_target(self, table, action="Copy", ask_table=True):
+        """Small modal dialog asking for the target connection, schema and table of a copy (or compare)."""
+        root = self.parent.winfo_toplevel()
+        dlg  = tk.Toplevel(root)
+        dlg.title(f"{action} {table} {'to' if action == 'Copy' else 'with'} Connection")
+        dlg.geometry("400x200")
+        dlg.transient(root)
+        dlg.grab_set()
+
+        names       = self.connection_manager.credential_manager.get_all_connection_names()
+        name_var    = tk.StringVar(value=names[0] if names else "")
+        schema_var  = tk.StringVar()
+        table_var   = tk.StringVar(value=table)
+
+        form = ttk.Frame(dlg)
+        form.pack(fill=tk.BOTH, expand=True, padx=14, pady=(14, 4))
+        ttk.Label(form, text="Target connection:").grid(row=0, column=0, sticky='w', pady=3)
+        ttk.Combobox(form, textvariable=name_var, values=names, state='readonly', width=28).grid(row=0, column=1, pady=3)
+        ttk.Label(form, text="Target schema (empty: default):").grid(row=1, column=0, sticky='w', pady=3)
+        ttk.Entry(form, textvariable=schema_var, width=30).grid(row=1, column=1, pady=3)
+        if ask_table:
+            ttk.Label(form, text="Target table:").grid(row=2, column=0, sticky='w', pady=3)
+            ttk.Entry(form, textvariable=table_var, width=30).grid(row=2, column=1, pady=3)
+
+        result = [None]
+
+        def _ok():
+            if name_var.get() and (table_var.get().strip() or not ask_table):
+                result[0] = (name_var.get(), schema_var.get().strip(), table_var.get().strip())
+            dlg.destroy()
+
+        btn_row = ttk.Frame(dlg)
+        btn_row.pack(pady=10)
+        ttk.Button(btn_row, text=action,   command=_ok).pack(side=tk.LEFT, padx=6)
+        ttk.Button(btn_row, text="Cancel", command=dlg.destroy).pack(side=tk.LEFT)
+        dlg.wait_window()
+        return result[0]
+
+    def copy_table_to_connection(self):
+        """
+        Copy the selected table into another stored connection: the target table is
+        created from the source structure (when missing) and rows are streamed into
+        the bulk loader of the target driver while the next chunk is being fetched.
+        """
+        selected = self.db_tree.selection()
+        if not selected:
+            messagebox.showwarning("No Selection", "Please select a table to copy")
+            return
+
+        schema, table = self._schema_and_name(selected[0])
+        target = self._ask_copy_target(table)
+        if not target:
+            return
+        target_name, target_schema, target_table = target
+
+        source_connection = None
+        target_connection = None
+        try:
+            queries = self.get_queries_instance()
+            cursor  = self.db_connection.current_connection.cursor()
+            cursor  = self.query_manager.cursor_execute(queries.get_table_structure(schema, table), cursor)
+            structure = cursor.fetchall()
+            # Only used for the ETA; the copy itself does not depend on it
+            cursor  = self.query_manager.cursor_execute(queries.count_records_sql(schema, table), cursor)
+            total_rows = cursor.fetchone()[0]
+            cursor.close()
+
+            source_type = self.db_connection.get_connection_type()
+            source_connection, _ = self.connection_manager.open_connection(self.connection_manager.connection_name, shared=True)
+            target_connection, target_type = self.connection_manager.open_connection(target_name, shared=True)
+            target_queries = self.db_connection.get_queries_for_type(target_type)
+            if not target_schema:
+                target_schema = "main" if target_type == "SQLite" else schema
+
+            # Target column types from the generic category of each source column
+            definitions = []
+            for name, type_name, length, precision, scale, nullable in structure:
+                category = ColumnTypeMapper.category(type_name, scale)
+                if category == "date" and source_type in ("Oracle", "OracleDB"):
+                    category = "timestamp"  # Oracle DATE carries a time of day
+                definitions.append((
+                    name,
+                    target_queries.get_column_type_sql(category, length, precision, scale),
+                    nullable != 'N'
+                ))
+
+            target_cursor = target_connection.cursor()
+            target_cursor.execute(target_queries.table_exists(target_schema, target_table))
+            exists = target_cursor.fetchone()[0] > 0
+            if exists:
+                if not messagebox.askyesno("Table Exists",
+                                           f"{target_schema}.{target_table} already exists on {target_name}.\n"
+                                           "Append the rows to it?"):
+                    raise InterruptedError()
+            else:
+                target_cursor.execute(target_queries.get_create_table_sql(target_schema, target_table, definitions))
+                target_connection.commit()
+            target_cursor.close()
+
+            columns    = ", ".join(queries.quote_identifier(row[0]) for row in structure)
+            source_sql = f"SELECT {columns} FROM {queries.get_qualified_name(schema, table)}"
+            loader     = self.db_connection.get_bulk_loader(
+                target_schema, target_table,
+                [(name, type_sql, None, None, None, 'Y') for name, type_sql, _ in definitions],
+                connection=target_connection, connection_type=target_type
+            )
+        except Exception as e:
+            for connection in (source_connection, target_connection):
+                if connection:
+                    connection.close()
+            if not isinstance(e, InterruptedError):
+                messagebox.showerror("Error", f"Failed to prepare copy: {str(e)}")
+            return
+
+        copy     = TableCopy(source_connection, source_sql, target_connection, loader)
+        progress = ProgressDialog(self.parent.winfo_toplevel(), "Copy Table",
+                                  f"{schema}.{table} -> {target_name}: {target_schema}.{target_table}")
+        started  = time.perf_counter()
+
+        def poll():
+            if progress.cancelled and not copy.cancelled:
+                copy.cancel()
+            elapsed = time.perf_counter() - started
+            if copy.running:
+                fraction = copy.rows_copied / total_rows if total_rows else None
+                progress.update_progress(copy.rows_copied, total_rows,
+                                         ProgressDialog.format_throughput(copy.rows_copied, elapsed, fraction))
+                progress.after(200, poll)
+                return
+
+            source_connection.close()
+            target_connection.close()
+            progress.close()
+            if copy.error:
+                messagebox.showerror("Error", f"Copy failed, the target was rolled back: {copy.error}")
+            elif copy.cancelled:
+                messagebox.showinfo("Copy Cancelled", "Copy cancelled, the target was rolled back.")
+            else:
+                messagebox.showinfo("Copy Finished",
+                                    f"{ProgressDialog.format_throughput(copy.rows_copied, elapsed)} copied to "
+                                    f"{target_name}: {target_schema}.{target_table}")
+
+        copy.start()
+        progress.after(200, poll)
+
+    def compare_table_with_connection(self):
+        """
+        Verify the selected table against the same table on another stored connection
+        by checksums of primary key ranges; only mismatching ranges are fetched.
+        """
+        selected = self.db_tree.selection()
+        if not selected:
+            messagebox.showwarning("No Selection", "Please select a table to compare")
+            return
+
+        schema, table = self._schema_and_name(selected[0])
+        target = self._ask_copy_target(table, action="Compare")
+        if not target:
+            return
+        target_name, target_schema, target_table = target
+
+        connections = []
+        try:
+            queries = self.get_queries_instance()
+            cursor  = self.db_connection.current_connection.cursor()
+            cursor  = self.query_manager.cursor_execute(queries.get_table_structure(schema, table), cursor)
+            structure = cursor.fetchall()
+            cursor  = self.query_manager.cursor_execute(queries.get_table_primary_keys(schema, table), cursor)
+            primary_keys = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+
+            types = {row[0]: row for row in structure}
+            if not primary_keys or ColumnTypeMapper([types[primary_keys[0]]]).converters[0] is not int:
+                raise ValueError("The table needs a primary key whose leading column is an integer")
+
+            source_connection, _ = self.connection_manager.open_connection(self.connection_manager.connection_name, shared=True)
+            connections.append(source_connection)
+            target_connection, target_type = self.connection_manager.open_connection(target_name, shared=True)
+            connections.append(target_connection)
+            target_queries = self.db_connection.get_queries_for_type(target_type)
+            if not target_schema:
+                target_schema = "main" if target_type == "SQLite" else schema
+
+            target_cursor = target_connection.cursor()
+            target_cursor.execute(target_queries.get_table_structure(target_schema, target_table))
+            target_structure = target_cursor.fetchall()
+            target_columns   = {row[0].lower(): row[0] for row in target_structure}
+            target_cursor.close()
+            lob_types = ("CLOB", "NCLOB", "BLOB")
+            if not target_columns:
+                raise ValueError(f"{target_schema}.{target_table} not found on {target_name}")
+
+            # The key first, then the columns both tables have
+            columns = [primary_keys[0]] + [row[0] for row in structure
+                                           if row[0] != primary_keys[0] and row[0].lower() in target_columns]
+            if primary_keys[0].lower() not in target_columns:
+                raise ValueError(f"Key column {primary_keys[0]} not found in the target table")
+            diff = TableDiff(
+                {"connection": source_connection, "queries": queries, "schema": schema, "table": table, "columns": columns,
+                 "lob_columns": {row[0] for row in structure if ColumnTypeMapper.base_type(row[1]) in lob_types}},
+                {"connection": target_connection, "queries": target_queries, "schema": target_schema,
+                 "table": target_table, "columns": [target_columns[column.lower()] for column in columns],
+                 "lob_columns": {row[0] for row in target_structure if ColumnTypeMapper.base_type(row[1]) in lob_types}},
+            )
+        except Exception as e:
+            for connection in connections:
+                connection.close()
+            messagebox.showerror("Error", f"Failed to prepare comparison: {str(e)}")
+            return
+
+        progress = ProgressDialog(self.parent.winfo_toplevel(), "Compare Table",
+                                  f"{schema}.{table} <-> {target_name}: {target_schema}.{target_table}")
+        state    = {"error": None, "done": False}
+
+        def work():
+            try:
+                diff.run()
+            except Exception as e:
+                state["error"] = str(e)
+            finally:
+                for connection in connections:
+                    connection.close()
+                state["done"] = True
+
+        def poll():
+            if progress.cancelled:
+                diff.cancelled = True
+            if not state["done"]:
+                progress.update_progress(0, None, f"{diff.ranges_checked:,} range(s) checked, "
+                                                  f"{diff.rows_verified:,} row(s) verified, "
+                                                  f"{diff.difference_count:,} difference(s)")
+                progress.after(200, poll)
+                return
+
+            progress.close()
+            if state["error"]:
+                messagebox.showerror("Error", f"Comparison failed: {state['error']}")
+            elif diff.cancelled:
+                messagebox.showinfo("Compare Cancelled", f"Comparison cancelled. {diff.summary()}")
+            elif not diff.difference_count:
+                messagebox.showinfo("Compare Table", f"The tables hold the same rows. {diff.summary()}")
+            else:
+                self.panel_sql_query_editor.show_diff_tab(f"Diff {table}", diff.detail_columns, diff.detail, diff.summary())
+
+        threading.Thread(target=work, daemon=True).start()
+        progress.after(200, poll)
+
+    def compare_schema_with_connection(self):
+        """
+        Compare the structure of the selected schema with a schema of another stored
+        connection; both catalogs are read at the same time, each on its own connection.
+        The differences open in a diff tab and the DDL delta in a new query tab.
+        """
+        selected = self.db_tree.selection()
+        if not selected:
+            messagebox.showwarning("No Selection", "Please select a schema to compare")
+            return
+
+        schema = self.catalog.object_of(selected[0]).schema.name
+        target = self._ask_copy_target(schema, action="Compare", ask_table=False)
+        if not target:
+            return
+        target_name, target_schema, _ = target
+
+        connections = []
+        try:
+            source_connection, source_type = self.connection_manager.open_connection(self.connection_manager.connection_name, shared=True)
+            connections.append(source_connection)
+            target_connection, target_type = self.connection_manager.open_connection(target_name, shared=True)
+            connections.append(target_connection)
+            if not target_schema:
+                target_schema = "main" if target_type == "SQLite" else schema
+            catalogs = (
+                SchemaCatalog(source_connection, self.db_connection.get_queries_for_type(source_type), schema, source_type),
+                SchemaCatalog(target_connection, self.db_connection.get_queries_for_type(target_type), target_schema, target_type),
+            )
+        except Exception as e:
+            for connection in connections:
+                connection.close()
+            messagebox.showerror("Error", f"Failed to prepare comparison: {str(e)}")
+            return
+
+        progress = ProgressDialog(self.parent.winfo_toplevel(), "Compare Schema",
+                                  f"{schema} <-> {target_name}: {target_schema}")
+        errors   = []
+
+        def work(catalog, connection):
+            try:
+                catalog.load()
+            except Exception as e:
+                errors.append(str(e))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work, args=(catalog, connection), daemon=True)
+                   for catalog, connection in zip(catalogs, connections)]
+
+        def poll():
+            if progress.cancelled:
+                for catalog in catalogs:
+                    catalog.cancelled = True
+            if any(thread.is_alive() for thread in threads):
+                progress.update_progress(0, None, f"{catalogs[0].objects_read:,} / {catalogs[1].objects_read:,} object(s) read")
+                progress.after(200, poll)
+                return
+
+            progress.close()
+            if errors:
+                messagebox.showerror("Error", f"Comparison failed: {errors[0]}")
+                return
+            if progress.cancelled:
+                messagebox.showinfo("Compare Cancelled", "Schema comparison cancelled.")
+                return
+
+            diff = SchemaDiff(*catalogs)
+            diff.compare()
+            if not diff.rows:
+                messagebox.showinfo("Compare Schema", f"The schemas have the same structure. {diff.summary()}")
+                return
+            self.panel_sql_query_editor.show_diff_tab(f"Diff {schema}", SchemaDiff.columns, diff.rows, diff.summary())
+
+            tab_id = self.panel_sql_query_editor.new_sql_tab()
+            self.panel_sql_query_editor.set_text_without_undo(
+                self.panel_sql_query_editor.sql_files[tab_id]["widget"],
+                diff.ddl_script()
+            )
+            self.panel_sql_query_editor.sql_files[tab_id]["modified"] = False
+            self.panel_sql_query_editor.sql_notebook.tab(
+                self.panel_sql_query_editor.sql_files[tab_id]["frame"],
+                text=f"{target_schema} (DDL delta)"
+            )
+
+        for thread in threads:
+            thread.start()
+        progress.after(200, poll)
+
+    def snapshot_to_local(self):
+        """Snapshot the selected table or view into the local SQLite database of the connection."""
+        selected = self.db_tree.selection()
+        if not selected:
+            messagebox.showwarning("No Selection", "Please select a table or view to snapshot")
+            return
+
+        schema, table = self._schema_and_name(selected[0])
+        try:
+            queries = self.get_queries_instance()
+            cursor  = self.db_connection.current_connection.cursor()
+            cursor  = self.query_manager.cursor_execute(queries.get_table_structure(schema, table), cursor)
+            structure = cursor.fetchall()
+            cursor.close()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read structure: {str(e)}")
+            return
+
+        source_type = self.db_connection.get_connection_type()
+        definitions = []
+        for name, type_name, length, precision, scale, nullable in structure:
+            category = ColumnTypeMapper.category(type_name, scale)
+            if category == "date" and source_type in ("Oracle", "OracleDB"):
+                category = "timestamp"  # Oracle DATE carries a time of day
+            definitions.append((name, QueriesSQLite.get_column_type_sql(category, length, precision, scale), True))
+
+        columns    = ", ".join(queries.quote_identifier(row[0]) for row in structure)
+        source_sql = f"SELECT {columns} FROM {queries.get_qualified_name(schema, table)}"
+        SnapshotRunner(self.parent.winfo_toplevel(), self.connection_manager, self.db_connection,
+                       source_sql, table, definitions).start()
+
+    def _show_row_count(self, item, count, estimated=False):
+        """Write a row count in the second portion of a tree node label ("~" for statistics, "n/a" when unknown)."""
+        if count is None:
+            text = "n/a rows"
+        else:
+            text = f"{'~' if estimated else ''}{int(count):\u00A0>9,} rows".replace(",", "'")
+        current_text = self.db_tree.item(item)['text']
+        self.db_tree.item(item, text=TextManip.update_spaced_line(current_text, text, 2, 28))
+
     def count_records(self):
-        """Count and display records for all selected tables or views, updating their tree nodes."""
+        """
+        Exact count of the records of all selected tables or views, run in parallel on
+        pooled connections; each tree node is updated as soon as its count is known.
+        """
         selected_items = self.db_tree.selection()
         if not selected_items:
             messagebox.showwarning("No Selection", "Please select at least one table or view")
             return
 
-        cursor = None
-        try:
-            cursor  = self.db_connection.current_connection.cursor()
-            queries = self.get_queries_instance()
-            
-            # Track if we skipped any invalid selections to notify the user later
-            invalid_selection_found = False
-
-            for item in selected_items:
-                values = self.db_tree.item(item)['values']
-                if len(values) < 3:
-                    continue
-                    
-                schema   = values[0]
-                obj_type = values[1]
-                obj_name = values[2]
-                
-                # Skip items that aren't tables or views
-                if obj_type not in ('table', 'view'):
-                    invalid_selection_found = True
-                    continue
-
-                # Get and execute the count SQL
-                count_sql = queries.count_records_sql(schema, obj_name)
-                cursor    = self.query_manager.cursor_execute(count_sql, cursor)
-                result    = cursor.fetchone()
-                count     = result[0] if result else 0
-
-                # Update the tree node text to show the count
-                current_text = self.db_tree.item(item)['text']
-                new_text     = TextManip.update_spaced_line(current_text, f"{count:\u00A0>9,} rows".replace(",", "'"), 2, 28)
-                self.db_tree.item(item, text=new_text)
-
-            if invalid_selection_found:
-                messagebox.showwarning("Invalid Selection", "Some selected items were skipped because they are not tables or views.")
+        items = {}
+        invalid_selection_found = False
+        for item in selected_items:
+            catalog_node = self.catalog.object_of(item)
+            if catalog_node is None or catalog_node.kind not in ('table', 'view'):
+                invalid_selection_found = True
+                continue
+            items.setdefault((catalog_node.schema.name, catalog_node.name), []).append(item)
+
+        if invalid_selection_found:
+            messagebox.showwarning("Invalid Selection", "Some selected items were skipped because they are not tables or views.")
+        if not items:
+            return
 
+        try:
+            pool = self.connection_manager.create_pool(min(self.COUNT_WORKERS, len(items)))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to count records: {str(e)}")
-            
-        finally:
-            # Ensures the cursor is closed at the very end, regardless of success or exceptions
-            if cursor:
-                try:
-                    cursor.close()
-                except Exception:
-                    pass
+            return
 
+        job      = ParallelRowCount(pool, self.get_queries_instance(), items)
+        progress = ProgressDialog(self.parent.winfo_toplevel(), "Count Records",
+                                  f"{len(items)} object(s), {pool.size} connection(s)")
+        shown    = set()
+
+        def show_counts():
+            for target, count in list(job.counts.items()):
+                if target not in shown:
+                    shown.add(target)
+                    for item in items[target]:
+                        if self.db_tree.exists(item):
+                            self._show_row_count(item, count)
+
+        def poll():
+            if progress.cancelled and not job.cancelled:
+                job.cancel()
+            show_counts()
+            if job.running:
+                progress.update_progress(len(job.counts), len(items), f"{len(job.counts)}/{len(items)} counted")
+                progress.after(200, poll)
+                return
+
+            pool.close_all()
+            progress.close()
+            if job.errors:
+                messagebox.showerror("Error", "Failed to count records:\n" + "\n".join(
+                    f"{target[1] if target else ''}: {error}" for target, error in list(job.errors.items())[:5]))
+
+        job.start(pool.size)
+        progress.after(200, poll)
+
+    def estimate_row_counts(self):
+        """
+        Row counts of every table of the selected schemas (or of the schemas of the
+        selected objects) from the optimizer statistics, one catalog query per schema.
+        """
+        schemas = []
+        for item in self.db_tree.selection():
+            catalog_node = self.catalog.object_of(item)
+            if catalog_node and catalog_node.schema.name not in schemas:
+                schemas.append(catalog_node.schema.name)
+        if not schemas:
+            messagebox.showwarning("No Selection", "Please select a schema or a table")
+            return
+
+        try:
+            queries = self.get_queries_instance()
+            cursor  = self.db_connection.current_connection.cursor()
+            for schema in schemas:
+                cursor = self.query_manager.cursor_execute(queries.get_estimated_row_counts_sql(schema), cursor)
+                counts = {str(name).lower(): count for name, count in cursor.fetchall()}
+                for table in self._shown_tables(schema):
+                    self._show_row_count(table.node, counts.get(str(table.name).lower()), estimated=True)
+            cursor.close()
+        except Exception as e:
+            hint = "\n\nRun ANALYZE to collect the statistics." if self.db_connection.get_connection_type() == "SQLite" else ""
+            messagebox.showerror("Error", f"Failed to read the statistics: {str(e)}{hint}")
 
     def empty_table(self):
         """Empty the selected table (remove all rows)."""
@@ -310,7 +1027,7 @@ class PanelDatabaseTree:
             self.query_manager.cursor_execute(empty_sql, cursor)
 
             # Commit the transaction
-            self.db_connection.current_connection.commit()
+            self.query_manager.commit_statement()
             messagebox.showinfo("Success", f"Table '{table_name}' emptied successfully")
 
             # Refresh the tree (optional, but good practice to update counts if displayed)
@@ -319,7 +1036,7 @@ class PanelDatabaseTree:
             cursor.close()
 
         except Exception as e:
-            self.db_connection.current_connection.rollback()
+            self.query_manager.rollback_statement()
             messagebox.showerror("Error", f"Failed to empty table: {str(e)}")
 
 
@@ -358,7 +1075,7 @@ class PanelDatabaseTree:
             self.query_manager.cursor_execute(delete_sql, cursor)
 
             # Commit the transaction
-            self.db_connection.current_connection.commit()
+            self.query_manager.commit_statement()
             messagebox.showinfo("Success", f"Table '{table_name}' deleted successfully")
 
             # Refresh the tree
@@ -367,7 +1084,7 @@ class PanelDatabaseTree:
             cursor.close()
 
         except Exception as e:
-            self.db_connection.current_connection.rollback()
+            self.query_manager.rollback_statement()
             messagebox.showerror("Error", f"Failed to delete table: {str(e)}")
 
 
@@ -406,7 +1123,7 @@ class PanelDatabaseTree:
             self.query_manager.cursor_execute(delete_sql, cursor)
 
             # Commit the transaction
-            self.db_connection.current_connection.commit()
+            self.query_manager.commit_statement()
             messagebox.showinfo("Success", f"View '{view_name}' deleted successfully")
 
             # Refresh the tree
@@ -415,7 +1132,7 @@ class PanelDatabaseTree:
             cursor.close()
 
         except Exception as e:
-            self.db_connection.current_connection.rollback()
+            self.query_manager.rollback_statement()
             messagebox.showerror("Error", f"Failed to delete view: {str(e)}")
 
 
@@ -467,27 +1184,90 @@ class PanelDatabaseTree:
         if not item:
             return
 
-        values = self.db_tree.item(item)['values']
-        if not values or len(values) < 2:
+        catalog_node = self.catalog.object_of(item)
+        if catalog_node is None:
+            return
+        schema = catalog_node.schema.name
+
+        if self.show_sizes_var.get() and catalog_node.kind in ('schema', 'tables_folder') and schema not in self.table_statistics:
+            self.show_table_statistics(schema)
+
+        if catalog_node.kind == 'tables_folder':
+            if not catalog_node.shown:
+                self.show_more_tables(schema)
+        elif catalog_node.kind in ('schema', 'table', 'package') and not catalog_node.loaded:
+            self._drop_placeholders(item)
+            if catalog_node.kind == 'schema':  # case strored procedure and functions
+                self.load_schema_children(item, schema)
+            elif catalog_node.kind == 'table':
+                self.load_table_children(item, schema, catalog_node.name)
+            else:
+                self.load_package_children(item, schema, catalog_node.name)
+
+    def on_tree_double_click(self, event):
+        item = self.db_tree.identify_row(event.y)
+        values = self.db_tree.item(item)['values'] if item else None
+        if values and values[1] == 'more_tables':
+            self.show_more_tables(values[0])
+            return "break"
+        self.view_table_data(100)
+
+    def _drop_placeholders(self, item):
+        """Delete the "Loading..." / "Show more..." children of *item*, the only ones not in the catalog."""
+        for child in self.db_tree.get_children(item):
+            if self.catalog.object_of(child) is None:
+                self.db_tree.delete(child)
+
+    def _insert_node(self, parent_item, catalog_node, text=None, expandable=False):
+        """Render *catalog_node* under *parent_item*; expandable nodes get a "Loading..." child."""
+        values = (catalog_node.schema.name, catalog_node.kind, catalog_node.name)
+        if catalog_node.kind.endswith('_folder'):
+            values = values[:2]
+        elif catalog_node.extra is not None:
+            values += (catalog_node.extra,)
+        item = self.catalog.render(catalog_node, self.db_tree.insert(
+            parent_item, 'end', text=catalog_node.name if text is None else text, values=values
+        ))
+        if expandable:
+            self.db_tree.insert(item, 'end', text='Loading...', values=(values[0], 'loading'))
+        return item
+
+    def _read_tables(self, tables):
+        """Table names of a Tables folder, read once into the catalog."""
+        if not tables.loaded:
+            _, rows = self.query_manager.fetch_metadata(self.get_queries_instance().get_all_table_names_in_schema(tables.schema.name))
+            for (table,) in rows:
+                tables.add(table, 'table')
+            tables.loaded = True
+
+    def show_more_tables(self, schema, up_to=None):
+        """
+        Add the next page of table nodes to the Tables folder of *schema* (or all the
+        nodes up to the catalog index *up_to*), followed by a "Show more..." node while
+        tables remain.
+        """
+        entry = self.catalog.schemas.get(schema)
+        if not entry:
+            return
+        tables = entry.folder('tables_folder')
+        try:
+            self._read_tables(tables)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load tables: {str(e)}")
             return
 
-        queries = self.get_queries_instance()
+        self._drop_placeholders(tables.node)
+        last = min(len(tables.children), max(tables.shown + self.TABLE_PAGE_SIZE, (up_to or 0) + 1))
+        for table in tables.children[tables.shown:last]:
+            self._insert_node(tables.node, table, expandable=True)
+        tables.shown = max(tables.shown, last)
 
-        if values[1] == 'table':
-            children = self.db_tree.get_children(item)
-            if children and self.db_tree.item(children[0])['values'][1] == 'loading':
-                self.db_tree.delete(*children)
-                self.load_table_children(item, values[0], values[2])
-        elif values[1] == 'schema': # case strored procedure and functions
-            children = self.db_tree.get_children(item)
-            if children and self.db_tree.item(children[1])['values'][1] == 'loading':
-                self.db_tree.delete(children[1])
-                self.load_schema_children(item, values[0])
-        elif values[1] == 'package':
-            children = self.db_tree.get_children(item)
-            if children and self.db_tree.item(children[0])['values'][1] == 'loading':
-                self.db_tree.delete(*children)
-                self.load_package_children(item, values[0], values[2])
+        remaining = len(tables.children) - tables.shown
+        if remaining:
+            self.db_tree.insert(tables.node, 'end', text=f"Show more... ({remaining:,} more)",
+                                values=(schema, 'more_tables'))
+        if schema in self.table_statistics:
+            self.show_table_statistics(schema)
 
     # Modifiez la méthode view_table_data pour gérer les vues
     def view_table_data(self, limit: int):
@@ -500,6 +1280,7 @@ class PanelDatabaseTree:
         if len(values) >= 3 and (values[1] == 'table' or values[1] == 'view'):
             schema = values[0]
             table_or_view = values[2]
+            self._note_recent(schema, table_or_view)
             sql = self.get_first_x_rows(schema, table_or_view, limit)
 
             tab_id = self.panel_sql_query_editor.new_sql_tab()
@@ -516,134 +1297,185 @@ class PanelDatabaseTree:
             )
             self.panel_sql_query_editor.run_query(sql)
 
+    def browse_table(self):
+        """Page through the selected table in primary key order, in a result tab with Previous / Next."""
+        selected = self.db_tree.selection()
+        if not selected:
+            return
+        schema, table = self._schema_and_name(selected[0])
+        try:
+            queries     = self.get_queries_instance()
+            _, keys     = self.query_manager.fetch_metadata(queries.get_table_primary_keys(schema, table))
+            key_columns = [row[0] for row in keys]
+            if not key_columns:
+                messagebox.showwarning("Browse Table", f"{table} has no primary key to page on, use View first rows instead.")
+                return
+            columns = self.query_manager.get_column_names(schema, table)
+            connection, _ = self.connection_manager.open_connection(self.connection_manager.connection_name, shared=True)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to browse {table}: {str(e)}")
+            return
+
+        self._note_recent(schema, table)
+        paramstyle = self.query_manager.PARAMSTYLES.get(self.db_connection.get_connection_type(), "qmark")
+        pager      = KeysetPager(connection, queries, schema, table, columns, key_columns, self.BROWSE_PAGE_SIZE, paramstyle)
+        self.panel_sql_query_editor.show_table_browser(f"{table} (Browse)", pager)
+
+    def sample_rows(self):
+        """Open a query tab reading a random sample of the selected table or view, sized by percentage or row count."""
+        selected = self.db_tree.selection()
+        if not selected:
+            return
+        catalog_node = self.catalog.object_of(selected[0])
+        if catalog_node is None or catalog_node.kind not in ('table', 'view'):
+            return
+        schema, name = catalog_node.schema.name, catalog_node.name
+        size = simpledialog.askstring("Sample Rows", "Sample size, as a percentage (e.g. 1%) or a number of rows (e.g. 1000):",
+                                      initialvalue=self.sample_size, parent=self.parent.winfo_toplevel())
+        if not size:
+            return
+        try:
+            percent, limit = TableSample.parse(size)
+        except ValueError as e:
+            messagebox.showerror("Sample Rows", str(e))
+            return
+        self.sample_size = size.strip()
+
+        queries = self.get_queries_instance()
+        if limit and catalog_node.kind == 'table':
+            try:
+                _, estimates = self.query_manager.fetch_metadata(queries.get_estimated_row_counts_sql(schema))
+                estimate     = {str(table).lower(): rows for table, rows in estimates}.get(str(name).lower())
+            except Exception:
+                estimate = None  # no statistics: the rows are shuffled instead
+            percent = TableSample.percent_for(limit, estimate)
+        try:
+            columns = self.query_manager.get_column_names(schema, name)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read the columns of {name}: {str(e)}")
+            return
+        sql = queries.get_sample_sql(schema, name, columns, percent, limit, catalog_node.kind == 'view')
+
+        tab_id = self.panel_sql_query_editor.new_sql_tab()
+        self.panel_sql_query_editor.set_text_without_undo(self.panel_sql_query_editor.sql_files[tab_id]["widget"], sql)
+        self.panel_sql_query_editor.sql_files[tab_id]["modified"] = False
+        self.panel_sql_query_editor.sql_notebook.tab(self.panel_sql_query_editor.sql_files[tab_id]["frame"],
+                                                     text=f"{name} (sample {self.sample_size})")
+        self.panel_sql_query_editor.run_query(sql)
+
+    def profile_table(self):
+        """
+        Profile every column of the selected table (nulls, distinct, min, max, avg, mode)
+        with one aggregate query, over the whole table or a sample of it, in a result tab.
+        Distinct counts and most frequent values come from the statistics where kept.
+        """
+        selected = self.db_tree.selection()
+        if not selected:
+            return
+        schema, table = self._schema_and_name(selected[0])
+        size = simpledialog.askstring("Profile Columns", "Profile the whole table (100%) or a sample, as a percentage "
+                                      "(e.g. 5%) or a number of rows (e.g. 100000):",
+                                      initialvalue="100%", parent=self.parent.winfo_toplevel())
+        if not size:
+            return
+        try:
+            percent, limit = TableSample.parse(size)
+        except ValueError as e:
+            messagebox.showerror("Profile Columns", str(e))
+            return
+
+        queries = self.get_queries_instance()
+        if limit:
+            try:
+                _, estimates = self.query_manager.fetch_metadata(queries.get_estimated_row_counts_sql(schema))
+                estimate     = {str(name).lower(): rows for name, rows in estimates}.get(str(table).lower())
+            except Exception:
+                estimate = None
+            percent = TableSample.percent_for(limit, estimate) or 100.0
+
+        try:
+            _, structure = self.query_manager.fetch_metadata(queries.get_table_structure(schema, table))
+            columns = [row[0] for row in structure]
+            kinds   = [ColumnProfiler.kind_of(row[1], row[4], self.db_connection.get_connection_type()) for row in structure]
+            if percent < 100:
+                source = f"({queries.get_sample_sql(schema, table, columns, percent, None, False)}) sampled"
+            else:
+                source = queries.get_qualified_name(schema, table)
+
+            profile    = []
+            statistics = []
+            cursor     = self.db_connection.current_connection.cursor()
+            statistics_sql = queries.get_column_statistics_sql(schema, table)
+            if statistics_sql:
+                cursor     = self.query_manager.cursor_execute(statistics_sql, cursor)
+                statistics = cursor.fetchall()
+            # Exact distinct counts only where there are no estimates, on tables narrow enough
+            exact = not statistics and len(columns) <= ColumnProfiler.EXACT_DISTINCT_COLUMNS
+            for start in range(0, len(columns), ColumnProfiler.COLUMNS_PER_QUERY):
+                chunk  = slice(start, start + ColumnProfiler.COLUMNS_PER_QUERY)
+                cursor = self.query_manager.cursor_execute(
+                    queries.get_profile_sql(source, columns[chunk], kinds[chunk], exact), cursor)
+                profile += ColumnProfiler.from_aggregate_row(columns[chunk], cursor.fetchone())
+            cursor.close()
+            if statistics:
+                profile = ColumnProfiler.with_statistics(profile, kinds, statistics)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to profile {table}: {str(e)}")
+            return
+
+        sample_note = "" if percent >= 100 else f", sample {percent:g}%"
+        self.panel_sql_query_editor.show_profile_tab(f"{table} (Profile{sample_note})", profile)
+
     def load_table_children(self, table_node, schema, table):
         """Load indexes, keys, and triggers for a table"""
+        entry = self.catalog.object_of(table_node)
+        entry.loaded = True  # read once, also when it fails
+        self._note_recent(schema, table)
         try:
-            cursor = self.db_connection.current_connection.cursor()
             queries = self.get_queries_instance()
 
-            cursor = self.query_manager.cursor_execute(queries.count_table_indexes(schema, table), cursor)
-            index_count = cursor.fetchone()[0]
+            index_count = self.query_manager.fetch_metadata(queries.count_table_indexes(schema, table))[1][0][0]
             if index_count > 0:
-                self.db_tree.insert(
-                    table_node, 'end',
-                    text=f'Indexes ({index_count})',
-                    values=(schema, 'indexes_summary', table)
-                )
+                self._insert_node(table_node, entry.add(table, 'indexes_summary', count=index_count),
+                                  text=f'Indexes ({index_count})')
 
-            cursor = self.query_manager.cursor_execute(queries.count_table_prim_and_foreign_keys(schema, table), cursor)
-            key_count = cursor.fetchone()[0]
+            key_count = self.query_manager.fetch_metadata(queries.count_table_prim_and_foreign_keys(schema, table))[1][0][0]
             if key_count > 0:
-                self.db_tree.insert(
-                    table_node, 'end',
-                    text=f'Keys ({key_count})',
-                    values=(schema, 'keys_summary', table)
-                )
+                self._insert_node(table_node, entry.add(table, 'keys_summary', count=key_count),
+                                  text=f'Keys ({key_count})')
 
-            cursor = self.query_manager.cursor_execute(queries.get_table_triggers(schema, table), cursor)
-            triggers = cursor.fetchall()
+            _, triggers = self.query_manager.fetch_metadata(queries.get_table_triggers(schema, table))
             if triggers:
-                triggers_node = self.db_tree.insert(
-                    table_node, 'end',
-                    text=f'Triggers ({len(triggers)})',
-                    values=(schema, 'triggers_folder')
-                )
+                folder        = entry.add('Triggers', 'triggers_folder', count=len(triggers))
+                triggers_node = self._insert_node(table_node, folder, text=f'Triggers ({len(triggers)})')
                 for (trigger_name,) in triggers:
-                    self.db_tree.insert(
-                        triggers_node, 'end',
-                        text=trigger_name,
-                        values=(schema, 'trigger', trigger_name)
-                    )
-
-            cursor.close()
+                    self._insert_node(triggers_node, folder.add(trigger_name, 'trigger'))
+                folder.loaded = True
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load table children: {str(e)}")
 
     def load_schema_children(self, schema_node, schema):
         """Load stored procedures, functions, packages, and views for a schema"""
+        entry = self.catalog.object_of(schema_node)
+        entry.loaded = True  # read once, also when it fails
         try:
-            cursor = self.db_connection.current_connection.cursor()
             queries = self.get_queries_instance()
 
-            # Load procedures
-            cursor = self.query_manager.cursor_execute(queries.count_procedures_in_schema(schema), cursor)
-            procedure_count = cursor.fetchone()[0]
-            if procedure_count > 0:
-                procedures_node = self.db_tree.insert(
-                    schema_node, 'end',
-                    text=f'Procedures ({procedure_count})',
-                    values=(schema, 'procedures_folder')
-                )
-
-                cursor = self.query_manager.cursor_execute(queries.get_all_procedures_in_schema(schema), cursor)
-                procedures = cursor.fetchall()
-                for (procedure_name,) in procedures:
-                    self.db_tree.insert(
-                        procedures_node, 'end',
-                        text=procedure_name,
-                        values=(schema, 'procedure', procedure_name)
-                    )
-
-            # Load functions
-            cursor = self.query_manager.cursor_execute(queries.count_functions_in_schema(schema), cursor)
-            function_count = cursor.fetchone()[0]
-            if function_count > 0:
-                functions_node = self.db_tree.insert(
-                    schema_node, 'end',
-                    text=f'Functions ({function_count})',
-                    values=(schema, 'functions_folder')
-                )
-
-                cursor = self.query_manager.cursor_execute(queries.get_all_functions_in_schema(schema), cursor)
-                functions = cursor.fetchall()
-                for (function_name,) in functions:
-                    self.db_tree.insert(
-                        functions_node, 'end',
-                        text=function_name,
-                        values=(schema, 'function', function_name)
-                    )
-
-            # Load packages
-            cursor = self.query_manager.cursor_execute(queries.count_packages_in_schema(schema), cursor)
-            package_count = cursor.fetchone()[0]
-            if package_count > 0:
-                packages_node = self.db_tree.insert(
-                    schema_node, 'end',
-                    text=f'Packages ({package_count})',
-                    values=(schema, 'packages_folder')
-                )
-
-                cursor = self.query_manager.cursor_execute(queries.get_all_packages_in_schema(schema), cursor)
-                packages = cursor.fetchall()
-                for (package_name,) in packages:
-                    package_node = self.db_tree.insert(
-                        packages_node, 'end',
-                        text=package_name,
-                        values=(schema, 'package', package_name)
-                    )
-                    # Add loading placeholder for package children
-                    self.db_tree.insert(package_node, 'end', text='Loading...', values=(schema, 'loading'))
-
-            # Load views
-            cursor = self.query_manager.cursor_execute(queries.count_views_in_schema(schema), cursor)
-            view_count = cursor.fetchone()[0]
-            if view_count > 0:
-                views_node = self.db_tree.insert(
-                    schema_node, 'end',
-                    text=f'Views ({view_count})',
-                    values=(schema, 'views_folder')
-                )
-
-                cursor = self.query_manager.cursor_execute(queries.get_all_views_in_schema(schema), cursor)
-                views = cursor.fetchall()
-                for (view_name,) in views:
-                    self.db_tree.insert(
-                        views_node, 'end',
-                        text=view_name,
-                        values=(schema, 'view', view_name)
-                    )
-
-            cursor.close()
+            # Procedures, functions, packages (with their routines loaded on expand) and views
+            for kind, label, count_sql, list_sql in (
+                ('procedure', 'Procedures', queries.count_procedures_in_schema, queries.get_all_procedures_in_schema),
+                ('function',  'Functions',  queries.count_functions_in_schema,  queries.get_all_functions_in_schema),
+                ('package',   'Packages',   queries.count_packages_in_schema,   queries.get_all_packages_in_schema),
+                ('view',      'Views',      queries.count_views_in_schema,      queries.get_all_views_in_schema),
+            ):
+                count = self.query_manager.fetch_metadata(count_sql(schema))[1][0][0]
+                if count > 0:
+                    folder      = entry.add(label, f'{kind}s_folder', count=count)
+                    folder_node = self._insert_node(schema_node, folder, text=f'{label} ({count})')
+
+                    for (name,) in self.query_manager.fetch_metadata(list_sql(schema))[1]:
+                        self._insert_node(folder_node, folder.add(name, kind), expandable=(kind == 'package'))
+                    folder.loaded = True
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load schema children: {str(e)}")
 
@@ -761,6 +1593,9 @@ class PanelDatabaseTree:
                 elif obj_type == 'view':
                     self.view_context_menu.tk_popup(event.x_root, event.y_root)
 
+                elif obj_type == 'schema':
+                    self.schema_context_menu.tk_popup(event.x_root, event.y_root)
+
                 # -------------------------------
                 # STANDALONE OBJECTS
                 # -------------------------------
@@ -862,12 +1697,12 @@ class PanelDatabaseTree:
 
     def load_package_children(self, package_node, schema, package_name):
         """Load functions and procedures within a package"""
+        entry = self.catalog.object_of(package_node)
+        entry.loaded = True  # read once, also when it fails
         try:
-            cursor = self.db_connection.current_connection.cursor()
             queries = self.get_queries_instance()
 
-            cursor = self.query_manager.cursor_execute(queries.get_package_functions_and_procedures(schema, package_name), cursor)
-            procedures = cursor.fetchall()
+            _, procedures = self.query_manager.fetch_metadata(queries.get_package_functions_and_procedures(schema, package_name))
 
             if procedures:
                 # Group by procedure name to handle overloads
@@ -881,26 +1716,21 @@ class PanelDatabaseTree:
                     if len(procedure_list) == 1:
                         # Single procedure/function
                         proc_name, proc_type, overload = procedure_list[0]
-                        display_text = f"{proc_name} ({proc_type})"
-                        self.db_tree.insert(
-                            package_node, 'end',
-                            text=display_text,
-                            values=(schema, f'package_{proc_type.lower()}', proc_name)
-                        )
+                        self._insert_node(package_node, entry.add(proc_name, f'package_{proc_type.lower()}'),
+                                          text=f"{proc_name} ({proc_type})")
                     else:
                         # Multiple overloads
                         for proc_name, proc_type, overload in procedure_list:
-                            display_text = f"{proc_name} ({proc_type}) - Overload {overload}"
-                            self.db_tree.insert(
-                                package_node, 'end',
-                                text=display_text,
-                                values=(schema, f'package_{proc_type.lower()}', proc_name, overload)
-                            )
-
-            cursor.close()
+                            self._insert_node(package_node, entry.add(proc_name, f'package_{proc_type.lower()}', extra=overload),
+                                              text=f"{proc_name} ({proc_type}) - Overload {overload}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load package children: {str(e)}")
 
+    def _schema_and_name(self, item):
+        """(schema, object name) of a tree item, from the catalog."""
+        catalog_node = self.catalog.object_of(item)
+        return catalog_node.schema.name, catalog_node.name
+
     def get_queries_instance(self):
         return self.db_connection.get_queries_instance(self.db_connection.current_connection)
 
@@ -911,7 +1741,7 @@ class PanelDatabaseTree:
             messagebox.showwarning("Not Connected", "Please connect to a database first")
             return
 
-        self.db_tree.delete(*self.db_tree.get_children())
+        self.clear_tree()
 
         try:
             cursor = self.db_connection.current_connection.cursor()
@@ -927,41 +1757,127 @@ class PanelDatabaseTree:
             self.db_tree.delete(*self.db_tree.get_children())
 
             for schema, table_count in schemas:
-                schema_node = self.db_tree.insert('', 'end', text=f"{schema} ({table_count} tables)", values=(schema, 'schema'))
+                entry       = self.catalog.add_schema(schema, table_count)
+                schema_node = self.catalog.render(entry, self.db_tree.insert(
+                    '', 'end', text=f"{schema} ({table_count} tables)", values=(schema, 'schema')
+                ))
 
-                # Insert tables folder first
-                tables_node = self.db_tree.insert(schema_node, 'end', text=f'Tables ({table_count})', values=(schema, 'tables_folder'))
+                # Insert tables folder first; its tables are read and shown when it is expanded
+                tables_node = self._insert_node(schema_node, entry.folder('tables_folder'),
+                                                text=f'Tables ({table_count})', expandable=bool(table_count))
 
                 # Add loading placeholder for schema children (procedures, functions, and packages) after tables
                 loading_placeholder = self.db_tree.insert(schema_node, 'end', text='Loading...', values=(schema, 'loading'))
 
-                cursor = self.query_manager.cursor_execute(queries.get_all_table_names_in_schema(schema), cursor)
-                table_results = cursor.fetchall()
-                for (table,) in table_results:
-                    table_node = self.db_tree.insert(tables_node, 'end', text=table, values=(schema, 'table', table))
-                    self.db_tree.insert(table_node, 'end', text='Loading...', values=(schema, 'loading'))
-
                 try:
                     cursor = self.query_manager.cursor_execute(queries.get_current_session_roles(), cursor)
                     roles = cursor.fetchall()
-                    roles_node = self.db_tree.insert(schema_node, 'end', text=f'Roles ({len(roles)})', values=(schema, 'roles_folder'))
-                    for (role,) in roles:
-                        self.db_tree.insert(roles_node, 'end', text=role, values=(schema, 'role', role))
                 except:
-                    roles_node = self.db_tree.insert(schema_node, 'end', text='Roles (0)', values=(schema, 'roles_folder'))
+                    roles = []
+                roles_folder = entry.add('Roles', 'roles_folder')
+                roles_node   = self._insert_node(schema_node, roles_folder, text=f'Roles ({len(roles)})')
+                for (role,) in roles:
+                    self._insert_node(roles_node, roles_folder.add(role, 'role'))
 
                 try:
                     cursor = self.query_manager.cursor_execute(queries.get_current_session_privileges(), cursor)
                     privileges = cursor.fetchall()
-                    privs_node = self.db_tree.insert(schema_node, 'end', text=f'Privileges ({len(privileges)})', values=(schema, 'privileges_folder'))
-                    for (privilege,) in privileges:
-                        self.db_tree.insert(privs_node, 'end', text=privilege, values=(schema, 'privilege', privilege))
                 except:
-                    privs_node = self.db_tree.insert(schema_node, 'end', text='Privileges (0)', values=(schema, 'privileges_folder'))
+                    privileges = []
+                privileges_folder = entry.add('Privileges', 'privileges_folder')
+                privs_node        = self._insert_node(schema_node, privileges_folder, text=f'Privileges ({len(privileges)})')
+                for (privilege,) in privileges:
+                    self._insert_node(privs_node, privileges_folder.add(privilege, 'privilege'))
 
             cursor.close()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load database objects: {str(e)}")
+            return
+        self.start_prefetch()
+
+    # ------------------------------------------------------------------
+    # CATALOG PREFETCH
+    # ------------------------------------------------------------------
+
+    def _note_recent(self, schema, table):
+        """Remember *table* as recently used on the active connection (prefetched first next time)."""
+        if not self.connection_manager or not self.connection_manager.connection_name:
+            return
+        recent = self.recent_objects.setdefault(self.connection_manager.connection_name, [])
+        if [schema, table] in recent:
+            recent.remove([schema, table])
+        recent.insert(0, [schema, table])
+        del recent[self.RECENT_OBJECTS:]
+
+    def _prefetch_plan(self, queries, schemas, recent):
+        """
+        Catalog queries in the order the user is most likely to need them: the
+        recently used tables, then the current schema (its folders, then the columns,
+        keys and indexes of its tables), then the folders of the other schemas.
+        """
+        cache = self.query_manager.metadata_cache
+
+        def table_queries(schema, table):
+            yield queries.get_col_names(schema, table)
+            yield queries.get_table_structure(schema, table)
+            yield queries.get_table_keys(schema, table)
+            yield queries.get_table_primary_keys(schema, table)
+            yield queries.get_table_indexes(schema, table)
+            yield queries.count_table_indexes(schema, table)
+            yield queries.count_table_prim_and_foreign_keys(schema, table)
+            yield queries.get_table_triggers(schema, table)
+
+        def schema_queries(schema):
+            yield queries.get_all_table_names_in_schema(schema)
+            for count_sql, list_sql in (
+                (queries.count_procedures_in_schema, queries.get_all_procedures_in_schema),
+                (queries.count_functions_in_schema,  queries.get_all_functions_in_schema),
+                (queries.count_packages_in_schema,   queries.get_all_packages_in_schema),
+                (queries.count_views_in_schema,      queries.get_all_views_in_schema),
+            ):
+                yield count_sql(schema)
+                count = cache.get(count_sql(schema))
+                if count and count[1] and count[1][0][0]:
+                    yield list_sql(schema)
+
+        schemas = list(schemas)
+        for schema, table in recent:
+            if schema in schemas:
+                yield from table_queries(schema, table)
+
+        current_sql = queries.get_current_schema_sql()
+        yield current_sql
+        current = cache.get(current_sql)
+        current = current[1][0][0] if current and current[1] else None
+        if current in schemas:
+            schemas.remove(current)
+            yield from schema_queries(current)
+            tables = cache.get(queries.get_all_table_names_in_schema(current))
+            for (table,) in (tables[1] if tables else [])[:self.PREFETCH_TABLES]:
+                yield from table_queries(current, table)
+
+        for schema in schemas:
+            yield from schema_queries(schema)
+
+    def start_prefetch(self):
+        """Read the catalog of the active connection ahead of the user, on a separate connection."""
+        self.stop_prefetch()
+        if not self.connection_manager or not self.connection_manager.connection_name:
+            return
+        name   = self.connection_manager.connection_name
+        recent = list(self.recent_objects.get(name, []))
+        self.prefetcher = CatalogPrefetcher(
+            lambda: self.connection_manager.open_connection(name, shared=True)[0],
+            self.query_manager.metadata_cache,
+            self._prefetch_plan(self.get_queries_instance(), list(self.catalog.schemas), recent),
+            self.PREFETCH_INTERVAL,
+        )
+        self.prefetcher.start()
+
+    def stop_prefetch(self):
+        if self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher = None
 
     def view_view_data(self, limit: int):
         """View first N rows of selected view - creates new tab with query"""
@@ -992,10 +1908,11 @@ class PanelDatabaseTree:
 
     def get_first_x_rows(self, schema, table_or_view, limit):
         queries = self.get_queries_instance()
-        query_get_col_names = queries.get_col_names(schema, table_or_view)
-        result = self.query_manager.execute_query(query_get_col_names)
-        if result['success'] == True:
-            col_names = queries.extract_col_names(result['rows'])
+        try:
+            col_names = self.query_manager.get_column_names(schema, table_or_view)
+        except Exception:
+            col_names = []
+        if col_names:
             return queries.get_first_x_rows(schema, table_or_view, limit, col_names)
         else:
             raise Exception(f"No columns found for table or view: {schema}.{table_or_view} !")
@@ -1222,7 +2139,72 @@ class PanelDatabaseTree:
 
 
     def clear_tree(self):
+        self.stop_prefetch()
         self.db_tree.delete(*self.db_tree.get_children())
+        self.catalog.clear()
+        self.query_manager.metadata_cache.clear()
+        self.table_statistics = {}
+
+    # ------------------------------------------------------------------
+    # TABLE SIZES
+    # ------------------------------------------------------------------
+
+    def _shown_tables(self, schema):
+        """Catalog tables of *schema* that have a tree node, in catalog order."""
+        entry = self.catalog.schemas.get(schema)
+        if not entry:
+            return []
+        tables = entry.folder('tables_folder')
+        return tables.children[:tables.shown]
+
+    def toggle_size_column(self):
+        """Show or hide the rows/size column; statistics are read for the expanded schemas."""
+        if self.show_sizes_var.get():
+            self.db_tree.configure(show='tree headings', displaycolumns=('size',))
+            for entry in list(self.catalog.schemas.values()):
+                if self.db_tree.item(entry.node, 'open'):
+                    self.show_table_statistics(entry.name)
+        else:
+            self.db_tree.configure(show='tree', displaycolumns=())
+
+    def show_table_statistics(self, schema):
+        """Fill the rows/size column of the table nodes of *schema*, with one statistics query per schema."""
+        if schema not in self.table_statistics:
+            try:
+                cursor = self.db_connection.current_connection.cursor()
+                cursor = self.query_manager.cursor_execute(self.get_queries_instance().get_table_sizes_sql(schema), cursor)
+                self.table_statistics[schema] = {str(name).lower(): (rows, size) for name, rows, size in cursor.fetchall()}
+                cursor.close()
+            except Exception as e:
+                self.table_statistics[schema] = {}
+                messagebox.showerror("Error", f"Failed to read the table sizes of {schema}: {str(e)}")
+
+        statistics = self.table_statistics[schema]
+        for table in self._shown_tables(schema):
+            rows, size = statistics.get(str(table.name).lower(), (None, None))
+            rows_text  = "?" if rows is None else f"{int(rows):,}".replace(",", "'")
+            size_text  = "?" if size is None else TextManip.format_bytes(int(size))
+            self.db_tree.set(table.node, 'size', f"{rows_text} | {size_text}")
+        if self.sort_tables_by_size:
+            self._sort_table_nodes(schema)
+
+    def _sort_table_nodes(self, schema):
+        """Order the shown tables of *schema* by decreasing size, or in catalog order."""
+        tables = self._shown_tables(schema)
+        if not tables:
+            return
+        if self.sort_tables_by_size:
+            statistics = self.table_statistics.get(schema, {})
+            tables = sorted(tables, key=lambda table: -(statistics.get(str(table.name).lower(), (None, None))[1] or -1))
+        for index, table in enumerate(tables):
+            self.db_tree.move(table.node, table.parent.node, index)
+
+    def toggle_table_size_sort(self):
+        """Heading click: order the tables by decreasing size, or back to the catalog order."""
+        self.sort_tables_by_size = not self.sort_tables_by_size
+        self.db_tree.heading('size', text='Rows | Size ▼' if self.sort_tables_by_size else 'Rows | Size')
+        for schema in self.table_statistics:
+            self._sort_table_nodes(schema)
 
     # ------------------------------------------------------------------
     # SEARCH
@@ -1243,38 +2225,38 @@ class PanelDatabaseTree:
                 state = 'disabled'
 
 
-    def _ensure_schema_loaded(self, schema_node):
+    def _ensure_schema_loaded(self, entry):
         """Force-load procedures/functions/packages/views for a schema if not yet expanded."""
-        children = self.db_tree.get_children(schema_node)
-        # The loading placeholder is always the second child (index 1), right after
-        # the tables_folder.  If it is still present the schema hasn't been expanded.
-        if len(children) > 1:
-            second_values = self.db_tree.item(children[1])['values']
-            if second_values and len(second_values) > 1 and second_values[1] == 'loading':
-                self.db_tree.delete(children[1])
-                schema_name = self.db_tree.item(schema_node)['values'][0]
-                self.load_schema_children(schema_node, schema_name)
-
-    def _collect_folder_matches(self, folder_node, term):
-        """Return all direct children of *folder_node* whose name contains *term*."""
-        results = []
-        for child in self.db_tree.get_children(folder_node):
-            child_values = self.db_tree.item(child)['values']
-            # Leaf objects always have at least 3 values: (schema, type, name)
-            if len(child_values) >= 3:
-                name = str(child_values[2])
-                if term.lower() in name.lower():
-                    results.append(child)
-        return results
-
-    def _search_in_schema_node(self, schema_node, term,
+        if not entry.loaded:
+            self._drop_placeholders(entry.node)
+            self.load_schema_children(entry.node, entry.name)
+
+    def _collect_folder_matches(self, folder, term):
+        """Return the tree items of all objects of the catalog *folder* whose name contains *term*."""
+        if folder.kind == 'tables_folder':
+            return self._collect_table_matches(folder, term)
+        return [child.node for child in folder.matches(term) if child.node]
+
+    def _collect_table_matches(self, tables, term):
+        """Matching tables of a Tables folder; their nodes are shown (in catalog order) if needed."""
+        try:
+            self._read_tables(tables)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load tables: {str(e)}")
+            return []
+        matches = tables.matches(term)
+        if matches and matches[-1].node is None:
+            self.show_more_tables(tables.schema.name, up_to=tables.children.index(matches[-1]))
+        return [table.node for table in matches]
+
+    def _search_in_schema_node(self, entry, term,
                                 tables, views, procedures, functions, packages):
-        """Return all matching items inside *schema_node* for the requested types."""
+        """Return all matching items inside the schema *entry* for the requested types."""
         results = []
 
         # Lazy-load procedures, functions, packages, views if requested
         if procedures or functions or packages or views:
-            self._ensure_schema_loaded(schema_node)
+            self._ensure_schema_loaded(entry)
 
         folder_type_map = {
             'tables_folder':     tables,
@@ -1284,13 +2266,9 @@ class PanelDatabaseTree:
             'packages_folder':   packages,
         }
 
-        for folder_node in self.db_tree.get_children(schema_node):
-            folder_values = self.db_tree.item(folder_node)['values']
-            if not folder_values or len(folder_values) < 2:
-                continue
-            folder_type = folder_values[1]
-            if folder_type_map.get(folder_type, False):
-                results += self._collect_folder_matches(folder_node, term)
+        for folder in entry.children:
+            if folder_type_map.get(folder.kind, False):
+                results += self._collect_folder_matches(folder, term)
 
         return results
 
@@ -1322,57 +2300,36 @@ class PanelDatabaseTree:
 
         if everywhere:
             # ── Search across ALL schemas ──────────────────────────────
-            for schema_node in self.db_tree.get_children(''):
-                node_vals = self.db_tree.item(schema_node)['values']
-                if node_vals and node_vals[1] == 'schema':
-                    results += self._search_in_schema_node(
-                        schema_node, term,
-                        do_tables, do_views, do_procs, do_funcs, do_pkgs
-                    )
+            for entry in list(self.catalog.schemas.values()):
+                results += self._search_in_schema_node(
+                    entry, term,
+                    do_tables, do_views, do_procs, do_funcs, do_pkgs
+                )
 
         elif not selection:
             messagebox.showinfo("Search", "Please select an item in the tree or check 'everywhere'.")
             return
 
         else:
-            selected_item = selection[0]
-            values    = self.db_tree.item(selected_item)['values']
-            item_type = values[1] if len(values) > 1 else ''
+            selected = self.catalog.object_of(selection[0])
+            if selected is None:
+                return
 
-            if item_type == 'schema':
+            if selected.kind == 'schema':
                 # ── Search within the selected schema ──────────────────
                 results += self._search_in_schema_node(
-                    selected_item, term,
+                    selected, term,
                     do_tables, do_views, do_procs, do_funcs, do_pkgs
                 )
 
-            elif item_type in ('tables_folder', 'views_folder',
-                               'procedures_folder', 'functions_folder',
-                               'packages_folder'):
+            elif selected.kind.endswith('_folder'):
                 # ── Search within the selected folder ──────────────────
-                results += self._collect_folder_matches(selected_item, term)
+                results += self._collect_folder_matches(selected, term)
 
             else:
-                # ── Leaf or sub-item: search siblings (parent folder) ──
-                parent = self.db_tree.parent(selected_item)
-                if not parent:
-                    return
-                parent_values = self.db_tree.item(parent)['values']
-                parent_type   = parent_values[1] if len(parent_values) > 1 else ''
-
-                if parent_type in ('tables_folder', 'views_folder',
-                                   'procedures_folder', 'functions_folder',
-                                   'packages_folder'):
-                    # Direct child of a folder — search all siblings
-                    results += self._collect_folder_matches(parent, term)
-
-                elif parent_type == 'schema':
-                    # The selected item *is* a folder node itself — search its contents
-                    results += self._collect_folder_matches(selected_item, term)
-
-                else:
-                    # Deeper nesting (trigger, index …) — search among siblings
-                    results += self._collect_folder_matches(parent, term)
+                # ── Leaf or sub-item: search siblings in its folder ────
+                # (or, for deeper nesting such as triggers, among its siblings)
+                results += self._collect_folder_matches(selected.parent, term)
 
         if not results:
             messagebox.showinfo("Search", f"No result found for '{term}'.")
@@ -1420,17 +2377,13 @@ class PanelDatabaseTree:
         if not selected:
             return
 
+        # 2. Path of the selected object in the catalog ("Loading..." / "Show more..." nodes: their parent)
         item_id = selected[0]
-        path_items = []
-
-        # 2. Walk up from child to parent to build the full path
-        temp_id = item_id
-        while temp_id:
-            item_text = self.db_tree.item(temp_id)['text']
-            # Clean the text (e.g. "schema (2823 tables)" -> "schema")
-            clean_text = item_text.split(' (')[0].split(' '*4)[0]
-            path_items.insert(0, (temp_id, clean_text))
-            temp_id = self.db_tree.parent(temp_id)
+        while item_id and self.catalog.object_of(item_id) is None:
+            item_id = self.db_tree.parent(item_id)
+        if not item_id:
+            return
+        path_items = [(node.node, str(node.name)) for node in self.catalog.object_of(item_id).path()]
 
         # 3. Create breadcrumb buttons horizontally
         for i, (original_id, label) in enumerate(path_items):
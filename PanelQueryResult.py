@@ -1,4 +1,6 @@
-from Panels import *
+from Panels      import *
+from ResultStore import ResultStore
+from ColumnProfiler import ColumnProfiler
 
 class PanelQueryResult:
     def __init__(self, root, panel_status_bar):
@@ -15,6 +17,15 @@ class PanelQueryResult:
         self.reg_thousand_sep6       = re.compile(r"^(-?)(\d{1,3})(\d{3})(\d{3})(\d{3})(\d{3})(\d{3})(\d{3})(?:(\.)(\d+))?$")
         self.thousand_sep            = "'"
         self.cols_anchor             = {}
+        self.result_store            = None   # ResultStore of the displayed rows, None for messages/errors
+        self.result_columns          = []
+        self.formatted_rows          = []
+        self.sort_spec               = []     # [(column index, descending)], most significant first
+        self.filter_matches          = None   # row indexes matching the filter bar, None when unfiltered
+        self.displayed_rows          = []     # ResultStore row index of each grid line, in display order
+        self.item_rows               = {}     # grid item id -> ResultStore row index
+        self.aggregate_column        = None   # column index of the status bar aggregates
+        self._filter_job             = None
 
     def set_sql_query_editor(self, panel_sql_query_editor):
         """Wire up the SQL editor panel so ORDER BY clicks can insert text there."""
@@ -91,6 +102,23 @@ class PanelQueryResult:
         ttk.Button(zoom_frame, text="-", command=self.zoom_out, width=2).pack(side=tk.RIGHT, padx=2)
         ttk.Button(zoom_frame, text="↻", command=self.reset_zoom, width=2).pack(side=tk.RIGHT, padx=2)
 
+        # ── Filter bar ────────────────────────────────────────────────
+        filter_bar = ttk.Frame(result_frame, style='TFrame')
+        filter_bar.pack(fill=tk.X, padx=5)
+        self.find_var   = tk.StringVar()
+        self.filter_var = tk.StringVar()
+        ttk.Label(filter_bar, text="Find:", style='TLabel').pack(side=tk.LEFT)
+        find_entry = ttk.Entry(filter_bar, textvariable=self.find_var, width=25)
+        find_entry.pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Label(filter_bar, text="Filter:", style='TLabel').pack(side=tk.LEFT)
+        filter_entry = ttk.Entry(filter_bar, textvariable=self.filter_var)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2)
+        Tooltip(filter_entry, "column op value; ...  with op among ~ (contains) = != > >= < <=\n"
+                              "e.g.  name ~ smith; amount >= 100")
+        ttk.Button(filter_bar, text="×", width=2, command=self.clear_filter).pack(side=tk.LEFT, padx=2)
+        for entry in (find_entry, filter_entry):
+            entry.bind("<KeyRelease>", self.schedule_filter)
+
         # ── Result grid ───────────────────────────────────────────────
         grid_container = ttk.Frame(result_frame, style='TFrame')
         grid_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -107,11 +135,15 @@ class PanelQueryResult:
             ("Copy All",            self.copy_all_rows),
             ("Export to CSV",       self.export_to_csv),
             ("Reset Column Widths", self.reset_column_widths),
+            ("Profile Columns",     self.profile_columns),
         ]
         self.result_context_menu = Helper.create_context_menu(self.result_tree, commands)
 
+        self.result_tree.bind("<Button-1>",   self.on_result_click)
+        self.result_tree.bind("<<TreeviewSelect>>", self.update_aggregates)
         self.result_tree.bind("<Button-3>",   self.show_result_context_menu)
         self.result_tree.bind("<Configure>",  self.on_tree_configure)
+        self.result_tree.bind("<Double-1>",   self.open_cell_viewer)
 
         # Stocker le texte brut des erreurs pour rafraîchissement
         self.raw_error_text = None
@@ -156,8 +188,8 @@ class PanelQueryResult:
 
 
 
-    def display_results(self, columns: List[str], rows: List[Tuple], description):
-        """Display query results in grid with duplicate column name handling"""
+    def display_results(self, columns: List[str], rows: List[Tuple], description, note=None):
+        """Display query results in grid with duplicate column name handling; *note* follows the row count"""
         self.result_tree.delete(*self.result_tree.get_children())
 
         # Handle duplicate column names by adding numbered suffixes
@@ -178,6 +210,14 @@ class PanelQueryResult:
 
         self.result_tree['columns'] = unique_columns
         self.result_tree.column('#0', width=0, stretch=tk.NO)
+        self.result_columns = unique_columns
+        self.result_store   = ResultStore(unique_columns, rows)
+        self.sort_spec      = []
+        self.filter_matches = None
+        self.aggregate_column = None
+        self.panel_status_bar.set_aggregates("")
+        self.find_var.set("")
+        self.filter_var.set("")
 
         # Indentify justification for columns
         self.cols_anchor = {}
@@ -212,6 +252,7 @@ class PanelQueryResult:
             for row in rows
         ]
         row_count = len(formatted_rows)
+        self.formatted_rows = formatted_rows  # kept for re-displaying in another order
 
         # ── 2. Column-wise width pass (one max() per column, not one branch per cell)
         if formatted_rows:
@@ -221,10 +262,7 @@ class PanelQueryResult:
                     max_widths[i] = col_max
 
         # ── 3. Bulk-insert via direct Tcl call ────────────────────────────────────
-        _tk_call   = self.result_tree.tk.call
-        _tree_path = self.result_tree._w
-        for formatted_row in formatted_rows:
-            _tk_call(_tree_path, 'insert', '', 'end', '-values', formatted_row)
+        self._insert_rows(range(row_count))
 
         # Apply widths directly — no Treeview re-query needed
         for col, w in zip(unique_columns, max_widths):
@@ -232,7 +270,160 @@ class PanelQueryResult:
         self.result_tree.update_idletasks()
 
         # Update status bar instead of result_info
-        self.panel_status_bar.set_query_result_status(f"{row_count} row(s) displayed")
+        self.panel_status_bar.set_query_result_status(f"{row_count} row(s) displayed" + (f" - {note}" if note else ""))
+
+    def _insert_rows(self, indexes):
+        """Bulk-insert the formatted rows *indexes* via direct Tcl calls, remembering item -> row."""
+        _tk_call       = self.result_tree.tk.call
+        _tree_path     = self.result_tree._w
+        formatted_rows = self.formatted_rows
+        item_rows      = {}
+        for i in indexes:
+            item_rows[_tk_call(_tree_path, 'insert', '', 'end', '-values', formatted_rows[i])] = i
+        self.item_rows      = item_rows
+        self.displayed_rows = list(indexes)
+
+    # ─────────────────────────────────────────────────────────────────
+    # CLIENT-SIDE SORT
+    # ─────────────────────────────────────────────────────────────────
+
+    def on_result_click(self, event):
+        """
+        Header click sorts locally by the column; Shift+click adds it as a further sort key.
+        Any click also makes the column the one aggregated in the status bar.
+        """
+        if not self.result_store:
+            return
+        region = self.result_tree.identify_region(event.x, event.y)
+        col_id = self.result_tree.identify_column(event.x)
+        if region not in ("heading", "cell") or not col_id or col_id == '#0':
+            return
+        self.aggregate_column = int(col_id[1:]) - 1
+        if region == "heading":
+            self.sort_by_column(self.aggregate_column, add=bool(event.state & 0x0001))
+        # The selection is updated by the class binding, after this one
+        self.root.after_idle(self.update_aggregates)
+
+    def sort_by_column(self, index, add=False):
+        """
+        Sort the displayed rows on their fetched values, without re-running the query.
+        Clicking the only sort column again reverses it; with *add* the column becomes
+        (or toggles as) a secondary key.
+        """
+        directions = dict(self.sort_spec)
+        if add:
+            if index in directions:
+                self.sort_spec = [(i, not d if i == index else d) for i, d in self.sort_spec]
+            else:
+                self.sort_spec = self.sort_spec + [(index, False)]
+        elif list(directions) == [index]:
+            self.sort_spec = [(index, not directions[index])]
+        else:
+            self.sort_spec = [(index, False)]
+
+        self._update_sort_headings()
+        self._refresh_rows()
+
+    def _refresh_rows(self):
+        """Re-display the fetched rows passing the filter, in the current sort order."""
+        order   = self.result_store.sort(self.sort_spec) if self.sort_spec else None
+        matches = self.filter_matches
+        if matches is None:
+            indexes = order if order is not None else range(len(self.formatted_rows))
+        elif order is None:
+            indexes = matches
+        else:
+            keep    = set(matches)
+            indexes = [i for i in order if i in keep]
+
+        self.result_tree.delete(*self.result_tree.get_children())
+        self._insert_rows(indexes)
+        self.update_aggregates()
+
+        status = f"{len(indexes)} row(s) displayed"
+        if matches is not None:
+            status = f"{len(indexes)} of {len(self.formatted_rows)} row(s) displayed, filtered locally"
+        if self.sort_spec:
+            status += ", sorted locally"
+        self.panel_status_bar.set_query_result_status(status)
+
+    # ─────────────────────────────────────────────────────────────────
+    # SELECTION AGGREGATES
+    # ─────────────────────────────────────────────────────────────────
+
+    def update_aggregates(self, event=None):
+        """
+        Show count/sum/avg/min/max/distinct of the active column in the status bar, over
+        the selected rows when several are selected, otherwise over all displayed rows.
+        Computed on the fetched values, not on the grid text.
+        """
+        if not self.result_store or self.aggregate_column is None:
+            return
+        selection = self.result_tree.selection()
+        if len(selection) > 1:
+            scope, rows = "selection", [self.item_rows[item] for item in selection if item in self.item_rows]
+        else:
+            scope, rows = "column", self.displayed_rows
+        stats = self.result_store.aggregate(self.aggregate_column, rows)
+
+        fmt   = self._format_value_with_thousands_separator
+        parts = [f"{self.result_columns[self.aggregate_column]} ({scope}):", f"count {stats['count']:,}"]
+        if "sum" in stats:
+            average = Decimal(f"{stats['avg']:.6f}".rstrip("0").rstrip("."))
+            parts += [f"sum {fmt(stats['sum'])}", f"avg {fmt(average)}"]
+        if "min" in stats:
+            parts += [f"min {fmt(stats['min'])}", f"max {fmt(stats['max'])}"]
+        if stats.get("distinct") is not None:
+            parts.append(f"distinct {stats['distinct']:,}")
+        if stats["nulls"]:
+            parts.append(f"nulls {stats['nulls']:,}")
+        self.panel_status_bar.set_aggregates("  ".join(parts))
+
+    # ─────────────────────────────────────────────────────────────────
+    # CLIENT-SIDE FILTER
+    # ─────────────────────────────────────────────────────────────────
+
+    def schedule_filter(self, event=None):
+        """Apply the filter bar shortly after the last keystroke."""
+        if self._filter_job:
+            self.root.after_cancel(self._filter_job)
+        self._filter_job = self.root.after(150, self.apply_filter)
+
+    def apply_filter(self):
+        """Keep the rows matching the Find text (any column) and every Filter term."""
+        self._filter_job = None
+        if not self.result_store:
+            return
+        find, text = self.find_var.get(), self.filter_var.get()
+        try:
+            terms = self.result_store.parse_filter(text)
+        except ValueError as e:
+            self.panel_status_bar.set_query_result_status(f"Filter: {str(e)}")
+            return
+        if not find and not terms:
+            if self.filter_matches is None:
+                return
+            self.filter_matches = None
+        else:
+            self.filter_matches = self.result_store.filter(terms, find)
+        self._refresh_rows()
+
+    def clear_filter(self):
+        self.find_var.set("")
+        self.filter_var.set("")
+        self.apply_filter()
+
+    def _update_sort_headings(self):
+        """Show ▲/▼ (and the key position when sorting on several columns) in the headings."""
+        directions = dict(self.sort_spec)
+        positions  = {index: position for position, (index, _) in enumerate(self.sort_spec, 1)}
+        for index, col in enumerate(self.result_columns):
+            text = col
+            if index in directions:
+                text += " ▼" if directions[index] else " ▲"
+                if len(self.sort_spec) > 1:
+                    text += str(positions[index])
+            self.result_tree.heading(col, text=text)
 
     def display_error(self, error: str):
         """Display error in result panel"""
@@ -241,6 +432,8 @@ class PanelQueryResult:
 
         # Store the cleaned error text
         self.raw_error_text = error
+        self.result_store   = None
+        self.panel_status_bar.set_aggregates("")
 
         # Display the cleaned error
         self.result_tree.delete(*self.result_tree.get_children())
@@ -260,6 +453,8 @@ class PanelQueryResult:
 
     def display_message(self, message: str):
         """Display a plain message in the result panel."""
+        self.result_store = None
+        self.panel_status_bar.set_aggregates("")
         self.result_tree.delete(*self.result_tree.get_children())
         self.result_tree['columns'] = ['Message']
         self.result_tree.column('#0',      width=0,   stretch=tk.NO)
@@ -270,6 +465,40 @@ class PanelQueryResult:
         # Update status bar
         self.panel_status_bar.set_query_result_status("Message displayed")
 
+    # ─────────────────────────────────────────────────────────────────
+    # COLUMN PROFILE
+    # ─────────────────────────────────────────────────────────────────
+
+    def profile_columns(self):
+        """Profile every column of the displayed result, computed locally, in a result tab."""
+        if not self.result_store:
+            return
+        self.panel_sql_query_editor.show_profile_tab("Result (Profile)", ColumnProfiler.of_result(self.result_store))
+
+    # ─────────────────────────────────────────────────────────────────
+    # LOB CELL VIEWER
+    # ─────────────────────────────────────────────────────────────────
+
+    def open_cell_viewer(self, event):
+        """Double-click on a LOB cell: read its content and show it in a LobViewer."""
+        if not self.result_store:
+            return
+        item   = self.result_tree.identify_row(event.y)
+        col_id = self.result_tree.identify_column(event.x)
+        if not item or not col_id or col_id == '#0' or item not in self.item_rows:
+            return
+        row_index = self.item_rows[item]
+        col_index = int(col_id[1:]) - 1
+        value     = self.result_store.rows[row_index][col_index]
+        if not isinstance(value, LobValue):
+            return
+        LobViewer(self.root, self.result_columns[col_index], value)
+        if value.loaded:  # the placeholder now shows the size and first characters
+            cells = list(self.formatted_rows[row_index])
+            cells[col_index] = str(value)
+            self.formatted_rows[row_index] = tuple(cells)
+            self.result_tree.set(item, col_id, cells[col_index])
+
     # ─────────────────────────────────────────────────────────────────
     # COLUMN WIDTHS
     # ─────────────────────────────────────────────────────────────────
@@ -324,8 +553,8 @@ class PanelQueryResult:
         region = self.result_tree.identify_region(event.x, event.y)
         if region == "heading":
             col_id = self.result_tree.identify_column(event.x)
-            if col_id and col_id != '#0':
-                col_name = self.result_tree.heading(col_id)['text']
+            if col_id and col_id != '#0' and self.result_store:
+                col_name = self.result_columns[int(col_id[1:]) - 1]  # heading text may carry a sort arrow
                 self._show_order_by_menu(event, col_name)
         else:
             self.result_context_menu.tk_popup(event.x_root, event.y_root)
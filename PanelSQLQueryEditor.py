@@ -1,4 +1,7 @@
-from Panels import *
+from Panels    import *
+from SQLScript import SQLScript
+from ResultStore import LocalResultDatabase
+from ColumnProfiler import ColumnProfiler
 
 
 class PanelSQLQueryEditor:
@@ -9,6 +12,12 @@ class PanelSQLQueryEditor:
         self.tab_results         = {}  # Store results for each tab
         self.zoom_level          = 100  # Default zoom level
         self.last_created_tab_id = None
+        self.connection_manager  = None  # set later via set_connection_manager()
+        self.local_results       = None  # LocalResultDatabase, created on first local execution
+
+    def set_connection_manager(self, connection_manager):
+        """Wire up the connection manager, which opens the extra connections of snapshots."""
+        self.connection_manager = connection_manager
 
     def setup(self, parent, root, theme):
         """Panel 2: SQL Query Editor with tabs"""
@@ -110,7 +119,8 @@ class PanelSQLQueryEditor:
                 self.panel_query_result.display_results(
                     result_data["columns"],
                     result_data["rows"],
-                    result_data["description"]
+                    result_data["description"],
+                    result_data.get("truncated"),
                 )
             elif result_data["type"] == "message":
                 self.panel_query_result.display_message(result_data["message"])
@@ -404,12 +414,9 @@ class PanelSQLQueryEditor:
     def show_table_keys(self, schema: str, table: str):
         """Fetch and display table or view keys (primary and foreign) in a new tab."""
         try:
-            cursor  = self.db_connection.current_connection.cursor()
             queries = self.get_queries_instance()
 
-            cursor   = self.query_manager.cursor_execute(queries.get_table_keys(schema, table), cursor)
-            raw_rows = cursor.fetchall()
-            cursor.close()
+            _, raw_rows = self.query_manager.fetch_metadata(queries.get_table_keys(schema, table))
 
             if not raw_rows:
                 messagebox.showinfo("Info", f"No keys found for {table}.")
@@ -436,11 +443,8 @@ class PanelSQLQueryEditor:
     def show_table_structure(self, schema: str, table: str):
         """Fetch and display table or view structure in a new tab."""
         try:
-            cursor  = self.db_connection.current_connection.cursor()
             queries = self.get_queries_instance()
-            cursor  = self.query_manager.cursor_execute(queries.get_table_structure(schema, table), cursor)
-            columns = [desc[0] for desc in cursor.description]
-            rows    = cursor.fetchall()
+            columns, rows = self.query_manager.fetch_metadata(queries.get_table_structure(schema, table))
 
             tree    = self._create_result_tab(f"{table} (Structure)", columns, rows)
 
@@ -451,8 +455,6 @@ class PanelSQLQueryEditor:
                 lambda: self._copy_all_to_clipboard(tree)
             )
             tree.bind("<Button-3>", lambda event: context_menu.tk_popup(event.x_root, event.y_root))
-
-            cursor.close()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load table structure: {str(e)}")
 
@@ -463,12 +465,8 @@ class PanelSQLQueryEditor:
     def show_table_indexes(self, schema: str, table: str, index_name: str | None = None):
         """Fetch and display table indexes in a new tab."""
         try:
-            cursor  = self.db_connection.current_connection.cursor()
             queries = self.get_queries_instance()
-            cursor  = self.query_manager.cursor_execute(queries.get_table_indexes(schema, table), cursor)
-            columns = [desc[0] for desc in cursor.description]
-            rows    = cursor.fetchall()
-            cursor.close()
+            columns, rows = self.query_manager.fetch_metadata(queries.get_table_indexes(schema, table))
 
             if not rows:
                 messagebox.showinfo("Info", f"No indexes found for table {table}.")
@@ -710,8 +708,8 @@ class PanelSQLQueryEditor:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save file: {str(e)}")
 
-    def execute(self, selection_only=False):
-        """Execute SQL query from current tab"""
+    def execute(self, selection_only=False, limits=None):
+        """Execute SQL query from current tab (*limits*: timeout/fetch limits of this execution only)"""
 
         sql = None
         if not self.db_connection.current_connection:
@@ -731,24 +729,273 @@ class PanelSQLQueryEditor:
             sql = info["widget"].get('1.0', 'end-1c').strip()
             
         if sql:
-            self.run_query(sql)
+            if len(SQLScript.split_statements(sql)) > 1:
+                self.run_script(sql, limits)
+            else:
+                self.run_query(sql, limits)
 
     def execute_selection(self):
         """Execute selected SQL text"""
         self.execute(selection_only=True)
 
+    def execute_with_limits(self):
+        """Execute the current tab with a timeout and fetch limits asked for this run only."""
+        if not self.db_connection.current_connection:
+            messagebox.showwarning("Not Connected", "Please connect to a database first")
+            return
+        dialog = QueryLimitsDialog(self.root, "Execute with Limits", self.query_manager.limits_for())
+        if dialog.result:
+            self.execute(limits=dialog.result[0])
+
+
+    def execute_local(self):
+        """
+        Execute the SQL of the current tab (or its selection) locally against the
+        last results of the tabs, available as tables tab_1, tab_2, ...
+        """
+        tab_id, info = self.get_current_sql_tab()
+        if not info:
+            return
+
+        try:
+            sql = info["widget"].get(tk.SEL_FIRST, tk.SEL_LAST).strip()
+        except tk.TclError:
+            sql = info["widget"].get('1.0', 'end-1c').strip()
+
+        statements = SQLScript.split_statements(sql)
+        if len(statements) != 1:
+            messagebox.showwarning("Local Query", "Please select a single query to execute locally")
+            return
+
+        self.panel_query_result.display_message("Executing locally...")
+        self.root.after(150, lambda: self._execute_query_after_delay(statements[0], local=True))
+
+    def compare_results(self):
+        """
+        Compare the results of two tabs aligned on key columns. Each side is the stored
+        result of its tab, or the tab's query run again on a chosen saved connection.
+        """
+        tabs = [(tab_id, self.sql_notebook.tab(info["frame"], "text")) for tab_id, info in self.sql_files.items()]
+        if len(tabs) < 1:
+            return
+        labels     = [f"{label} ({tab_id})" for tab_id, label in tabs]
+        stored     = "(stored result)"
+        names      = self.connection_manager.credential_manager.get_all_connection_names() if self.connection_manager else []
+        current_id, _ = self.get_current_sql_tab()
+        current    = next((i for i, (tab_id, _) in enumerate(tabs) if tab_id == current_id), 0)
+
+        dlg = tk.Toplevel(self.root)
+        dlg.title("Compare Results")
+        dlg.geometry("520x230")
+        dlg.transient(self.root)
+        dlg.grab_set()
+
+        left_tab    = tk.StringVar(value=labels[current])
+        right_tab   = tk.StringVar(value=labels[current + 1] if current + 1 < len(labels) else labels[current])
+        left_src    = tk.StringVar(value=stored)
+        right_src   = tk.StringVar(value=stored)
+        keys_var    = tk.StringVar()
+
+        form = ttk.Frame(dlg)
+        form.pack(fill=tk.BOTH, expand=True, padx=14, pady=(14, 4))
+        for row, (title, tab_var, src_var) in enumerate((("Left:", left_tab, left_src), ("Right:", right_tab, right_src))):
+            ttk.Label(form, text=title).grid(row=row, column=0, sticky='w', pady=3)
+            ttk.Combobox(form, textvariable=tab_var, values=labels, state='readonly', width=24).grid(row=row, column=1, pady=3)
+            ttk.Combobox(form, textvariable=src_var, values=[stored] + names, state='readonly', width=22).grid(row=row, column=2, padx=4, pady=3)
+        ttk.Label(form, text="Key columns (comma separated):").grid(row=2, column=0, columnspan=2, sticky='w', pady=3)
+        ttk.Entry(form, textvariable=keys_var, width=24).grid(row=2, column=2, padx=4, pady=3)
+
+        result = [None]
+
+        def _ok():
+            keys = [key.strip() for key in keys_var.get().split(",") if key.strip()]
+            if keys:
+                result[0] = (tabs[labels.index(left_tab.get())][0], left_src.get(),
+                             tabs[labels.index(right_tab.get())][0], right_src.get(), keys)
+            dlg.destroy()
+
+        btn_row = ttk.Frame(dlg)
+        btn_row.pack(pady=10)
+        ttk.Button(btn_row, text="Compare", command=_ok).pack(side=tk.LEFT, padx=6)
+        ttk.Button(btn_row, text="Cancel",  command=dlg.destroy).pack(side=tk.LEFT)
+        dlg.wait_window()
+        if not result[0]:
+            return
+
+        left_id, left_source, right_id, right_source, keys = result[0]
+        sides = []
+        for tab_id, source in ((left_id, left_source), (right_id, right_source)):
+            if source == stored:
+                tab_result = self.tab_results.get(tab_id, {})
+                if tab_result.get("type") != "results":
+                    messagebox.showwarning("Compare Results", f"{tab_id} has no stored result, run its query first")
+                    return
+                sides.append({"columns": tab_result["columns"], "rows": tab_result["rows"]})
+            else:
+                statements = SQLScript.split_statements(self.sql_files[tab_id]["widget"].get('1.0', 'end-1c'))
+                if len(statements) != 1:
+                    messagebox.showwarning("Compare Results", f"{tab_id} must hold a single query to run it on {source}")
+                    return
+                sides.append({"connection": source, "sql": statements[0].strip().rstrip(";")})
+
+        ResultDiffRunner(self.root, self.connection_manager, sides[0], sides[1], keys,
+                         lambda diff, columns, rows: self.show_diff_tab("Diff", columns, rows, diff.summary())).start()
+
+    def show_diff_tab(self, title, columns, rows, summary):
+        """Result tab of differences; the first column (changed/removed/added) colours the row."""
+        tree = self._create_result_tab(title, columns, rows)
+        tree.tag_configure("added",   background="#d8f0d8")
+        tree.tag_configure("removed", background="#f4d6d6")
+        tree.tag_configure("changed", background="#f7efc8")
+        for item, row in zip(tree.get_children(), rows):
+            tree.item(item, tags=(row[0],))
+        context_menu = self._create_context_menu(
+            tree, lambda: self._copy_selected_rows(tree), lambda: self._export_to_csv(tree, "diff"),
+            lambda: self._copy_all_to_clipboard(tree)
+        )
+        tree.bind("<Button-3>", lambda event: context_menu.tk_popup(event.x_root, event.y_root))
+        self.panel_query_result.panel_status_bar.set_query_result_status(summary)
+
+    def show_profile_tab(self, title, profile):
+        """Result tab of a column profile (ColumnProfiler.COLUMNS)."""
+        tree = self._create_result_tab(title, ColumnProfiler.COLUMNS, profile)
+        context_menu = self._create_context_menu(
+            tree, lambda: self._copy_selected_rows(tree), lambda: self._export_to_csv(tree, "profile"),
+            lambda: self._copy_all_to_clipboard(tree)
+        )
+        tree.bind("<Button-3>", lambda event: context_menu.tk_popup(event.x_root, event.y_root))
+
+    def show_table_browser(self, title, pager):
+        """Result tab paging through a table with a KeysetPager; the pager's connection is closed with the tab."""
+        frame   = ttk.Frame(self.sql_notebook, style='TFrame')
+        toolbar = ttk.Frame(frame, style='TFrame')
+        toolbar.pack(fill=tk.X, padx=5, pady=(5, 0))
+        previous_button = ttk.Button(toolbar, text="◀ Previous")
+        previous_button.pack(side=tk.LEFT, padx=2)
+        next_button = ttk.Button(toolbar, text="Next ▶")
+        next_button.pack(side=tk.LEFT, padx=2)
+        position = ttk.Label(toolbar, style='TLabel')
+        position.pack(side=tk.LEFT, padx=10)
+
+        tree_container = ttk.Frame(frame, style='TFrame')
+        tree_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        tree = Helper.create_treeview_with_scrollbars(tree_container, pager.columns, 'tree headings')
+        tree.column('#0', width=0, stretch=tk.NO)
+        for col in pager.columns:
+            tree.column(col, minwidth=100, width=150, stretch=tk.NO, anchor=tk.W)
+            tree.heading(col, text=col, anchor=tk.W)
+
+        def show(move):
+            try:
+                rows = move()
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to read the page: {str(e)}")
+                return
+            tree.delete(*tree.get_children())
+            for row in rows:
+                tree.insert('', 'end', values=['' if value is None else str(value) for value in row])
+            first = pager.page * pager.page_size
+            position.configure(text=f"Rows {first + 1:,} - {first + len(rows):,}".replace(",", "'") if rows else "No rows")
+            previous_button.state(["!disabled" if pager.has_previous else "disabled"])
+            next_button.state(["!disabled" if pager.has_next else "disabled"])
+
+        previous_button.configure(command=lambda: show(pager.previous))
+        next_button.configure(command=lambda: show(pager.next))
+
+        def close():
+            self.close_result_tab(frame)
+            pager.close()
+
+        close_button = ttk.Button(frame, text='×', command=close, style='Close.TButton', width=2)
+        close_button.place(relx=1.0, rely=0, anchor='ne', x=-23, y=8)
+
+        context_menu = self._create_context_menu(
+            tree, lambda: self._copy_selected_rows(tree), lambda: self._export_to_csv(tree, pager.table),
+            lambda: self._copy_all_to_clipboard(tree)
+        )
+        tree.bind("<Button-3>", lambda event: context_menu.tk_popup(event.x_root, event.y_root))
 
-    def run_query(self, sql: str):
+        self.sql_notebook.add(frame, text=title)
+        self.sql_notebook.select(frame)
+        show(pager.first)
+
+    def export_query_to_file(self):
+        """Export the result of the query in the current tab (or its selection) straight to a file."""
+        if not self.db_connection.current_connection:
+            messagebox.showwarning("Not Connected", "Please connect to a database first")
+            return
+
+        tab_id, info = self.get_current_sql_tab()
+        if not info:
+            return
+
+        try:
+            sql = info["widget"].get(tk.SEL_FIRST, tk.SEL_LAST).strip()
+        except tk.TclError:
+            sql = info["widget"].get('1.0', 'end-1c').strip()
+
+        statements = SQLScript.split_statements(sql)
+        if len(statements) != 1:
+            messagebox.showwarning("Export", "Please select a single query to export")
+            return
+
+        filepath = filedialog.asksaveasfilename(
+            title="Export Query to File",
+            defaultextension=".csv",
+            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
+        )
+        if filepath:
+            exporter = self.db_connection.get_exporter()
+            ExportRunner(self.root, exporter, self.query_manager, statements[0], filepath).start()
+
+    def snapshot_query_to_local(self):
+        """Snapshot the result of the query in the current tab (or its selection) into the local SQLite database."""
+        if not self.db_connection.current_connection:
+            messagebox.showwarning("Not Connected", "Please connect to a database first")
+            return
+
+        tab_id, info = self.get_current_sql_tab()
+        if not info:
+            return
+
+        try:
+            sql = info["widget"].get(tk.SEL_FIRST, tk.SEL_LAST).strip()
+        except tk.TclError:
+            sql = info["widget"].get('1.0', 'end-1c').strip()
+
+        statements = SQLScript.split_statements(sql)
+        if len(statements) != 1:
+            messagebox.showwarning("Snapshot", "Please select a single query to snapshot")
+            return
+
+        tab_name = os.path.splitext(self.sql_notebook.tab(info["frame"], "text"))[0].strip("• ")
+        SnapshotRunner(self.root, self.connection_manager, self.db_connection,
+                       statements[0], re.sub(r"\W+", "_", tab_name) or "query").start()
+
+    def run_query(self, sql: str, limits=None):
         """Execute SQL and display results"""
         # Clear previous results first
         self.panel_query_result.display_message("Executing query...")
 
         # Add a small delay to ensure the user sees the clearing
-        self.root.after(150, lambda: self._execute_query_after_delay(sql))
-
-    def _execute_query_after_delay(self, sql: str):
-        """Execute the query after a small delay"""
-        result = self.query_manager.execute_query(sql)
+        self.root.after(150, lambda: self._execute_query_after_delay(sql, limits=limits))
+
+    def run_script(self, sql: str, limits=None):
+        """Execute a multi-statement script and display the last result"""
+        self.panel_query_result.display_message("Executing script...")
+        self.root.after(150, lambda: self._execute_query_after_delay(sql, script=True, limits=limits))
+
+    def _execute_query_after_delay(self, sql: str, script: bool = False, local: bool = False, limits=None):
+        """Execute the query (or script) after a small delay"""
+        if local:
+            if not self.local_results:
+                self.local_results = LocalResultDatabase()
+            self.local_results.sync(self.tab_results)
+            result = self.local_results.execute_query(sql)
+        elif script:
+            result = self.query_manager.execute_script(sql, limits)
+        else:
+            result = self.query_manager.execute_query(sql, limits)
 
         # Get current tab
         tab_id, info = self.get_current_sql_tab()
@@ -762,12 +1009,14 @@ class PanelSQLQueryEditor:
                     "type": "results",
                     "columns": result["columns"],
                     "rows": result["rows"],
-                    "description": result["description"]
+                    "description": result["description"],
+                    "truncated": result.get("truncated"),
                 }
                 self.panel_query_result.display_results(
                     result["columns"],
                     result["rows"],
                     result["description"],
+                    result.get("truncated"),
                 )
             else:
                 # Store the message for this tab
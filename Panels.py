@@ -3,9 +3,14 @@ import datetime
 import csv
 import os
 import re
+import threading
+import time
 from tkinter      import ttk, filedialog, messagebox
 from decimal      import Decimal
 from SQLText      import SQLText
+from BulkTransfer import SnapshotStore, TableCopy
+from QueryManager import QueryManager
+from ResultStore  import ResultDiff, LobValue
 from typing       import List, Tuple
 
 
@@ -73,6 +78,523 @@ class Helper:
         return menu
 
 
+class ProgressDialog:
+    """Modal progress window for long operations processed chunk by chunk with after()."""
+    def __init__(self, root, title, message=""):
+        self.cancelled = False
+
+        self.dialog = tk.Toplevel(root)
+        self.dialog.title(title)
+        self.dialog.geometry("460x150")
+        self.dialog.resizable(False, False)
+        self.dialog.transient(root)
+
+        self.message_label = ttk.Label(self.dialog, text=message, anchor='w')
+        self.message_label.pack(fill=tk.X, padx=12, pady=(12, 4))
+
+        self.progressbar = ttk.Progressbar(self.dialog, mode='determinate', maximum=100)
+        self.progressbar.pack(fill=tk.X, padx=12, pady=4)
+
+        self.detail_label = ttk.Label(self.dialog, text="", anchor='w')
+        self.detail_label.pack(fill=tk.X, padx=12, pady=4)
+
+        ttk.Button(self.dialog, text="Cancel", command=self.cancel).pack(pady=(4, 12))
+
+        self.dialog.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.dialog.grab_set()
+
+    def cancel(self):
+        self.cancelled = True
+        self.detail_label.config(text="Cancelling...")
+
+    def set_message(self, message):
+        self.message_label.config(text=message)
+
+    def update_progress(self, done, total, detail=None):
+        """Move the bar to done/total (unknown total: indeterminate bounce) and show *detail*."""
+        if total:
+            self.progressbar.config(mode='determinate')
+            self.progressbar['value'] = min(100, done * 100 / total)
+        else:
+            self.progressbar.config(mode='indeterminate')
+            self.progressbar.step(2)
+        if detail is not None and not self.cancelled:
+            self.detail_label.config(text=detail)
+        self.dialog.update_idletasks()
+
+    @staticmethod
+    def format_throughput(rows, elapsed, fraction=None):
+        """'12,345 rows - 4,321 rows/s - ETA 0:00:12' (ETA only when the done fraction is known)."""
+        rate = rows / elapsed if elapsed > 0 else 0
+        text = f"{rows:,} rows - {rate:,.0f} rows/s"
+        if fraction and 0 < fraction < 1:
+            remaining = int(elapsed * (1 - fraction) / fraction)
+            text += f" - ETA {datetime.timedelta(seconds=remaining)}"
+        return text
+
+    def after(self, ms, callback):
+        return self.dialog.after(ms, callback)
+
+    def close(self):
+        self.dialog.grab_release()
+        self.dialog.destroy()
+
+
+class ExportRunner:
+    """
+    Runs an Exporter behind a ProgressDialog: in a worker thread when the driver
+    allows it (the modal dialog keeps the UI off the connection meanwhile),
+    otherwise step by step from the UI thread with after(). The export query is
+    bounded by the timeout of the query limits; the fetch limits do not apply,
+    the rows going to the file and not to memory.
+    """
+    POLL_MS = 200
+
+    def __init__(self, root, exporter, query_manager, sql, path):
+        self.root          = root
+        self.exporter      = exporter
+        self.query_manager = query_manager
+        self.sql           = sql
+        self.path          = path
+        self.error         = None
+        self.done          = False
+
+    def start(self):
+        try:
+            self.timeout, self.restore = self.query_manager.apply_timeout(self.exporter.connection)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export data: {str(e)}")
+            return
+        self.progress = ProgressDialog(self.root, "Export", f"Exporting to {os.path.basename(self.path)}")
+        self.started  = time.perf_counter()
+        if self.exporter.thread_safe:
+            threading.Thread(target=self._run_in_thread, daemon=True).start()
+            self.progress.after(self.POLL_MS, self._poll)
+        else:
+            self.steps = self.exporter.iter_export(self.sql, self.path)
+            self.progress.after(1, self._step)
+
+    def _run_in_thread(self):
+        try:
+            self.query_manager.run_guarded(lambda: self.exporter.export(self.sql, self.path))
+        except Exception as e:
+            self.error = self._error_text(e)
+        self.done = True
+
+    def _error_text(self, error) -> str:
+        if self.timeout and self.query_manager.is_timeout(error):
+            return self.query_manager.timeout_message(self.timeout, error)
+        return str(error)
+
+    def _poll(self):
+        if self.progress.cancelled and not self.exporter.cancelled:
+            self.exporter.cancel()
+        if self.done:
+            self._finish()
+            return
+        self._show_progress()
+        self.progress.after(self.POLL_MS, self._poll)
+
+    def _step(self):
+        if self.progress.cancelled:
+            self.exporter.cancel()
+        try:
+            next(self.steps)
+        except StopIteration:
+            self._finish()
+            return
+        except Exception as e:
+            self.error = self._error_text(e)
+            self._finish()
+            return
+        self._show_progress()
+        self.progress.after(1, self._step)
+
+    def _show_progress(self):
+        elapsed = time.perf_counter() - self.started
+        self.progress.update_progress(0, None, ProgressDialog.format_throughput(self.exporter.rows_written, elapsed))
+
+    def _finish(self):
+        elapsed = time.perf_counter() - self.started
+        try:
+            self.restore()
+        except Exception:
+            pass
+        self.progress.close()
+        if self.exporter.cancelled:
+            messagebox.showinfo("Export Cancelled", f"Export cancelled, {self.path} is incomplete.")
+        elif self.error:
+            messagebox.showerror("Error", f"Failed to export data: {self.error}")
+        else:
+            messagebox.showinfo("Export Finished",
+                                f"{ProgressDialog.format_throughput(self.exporter.rows_written, elapsed)} exported to {self.path}")
+
+
+class SnapshotRunner:
+    """
+    Copies a table, view or query result of the active connection into the local
+    snapshot database of that connection (BulkTransfer.SnapshotStore), which is
+    registered as a SQLite connection "<connection>-local" the first time.
+    An existing snapshot is either replaced or appended with the rows whose key
+    column is above the last copied key.
+    """
+    POLL_MS = 200
+
+    def __init__(self, root, connection_manager, db_connection, source_sql, default_name, column_definitions=None):
+        self.root               = root
+        self.connection_manager = connection_manager
+        self.db_connection      = db_connection
+        self.source_sql         = source_sql.strip().rstrip(";").rstrip()
+        self.default_name       = default_name
+        # [(name, SQLite type, nullable)]; None: typed from the description of the query result
+        self.column_definitions = column_definitions
+
+    def _ask_options(self, columns, metadata):
+        """Modal dialog asking for the snapshot name, key column and replace/append mode."""
+        dlg = tk.Toplevel(self.root)
+        dlg.title("Snapshot to Local")
+        dlg.geometry("440x220")
+        dlg.transient(self.root)
+        dlg.grab_set()
+
+        key    = metadata["key_column"] if metadata else ""
+        name_var = tk.StringVar(value=self.default_name)
+        key_var  = tk.StringVar(value=key or "")
+        mode_var = tk.StringVar(value="append" if key else "replace")
+
+        form = ttk.Frame(dlg)
+        form.pack(fill=tk.BOTH, expand=True, padx=14, pady=(14, 4))
+        ttk.Label(form, text="Snapshot table:").grid(row=0, column=0, sticky='w', pady=3)
+        ttk.Entry(form, textvariable=name_var, width=30).grid(row=0, column=1, pady=3)
+        ttk.Label(form, text="Key column (optional):").grid(row=1, column=0, sticky='w', pady=3)
+        ttk.Combobox(form, textvariable=key_var, values=[""] + list(columns), state='readonly', width=28).grid(row=1, column=1, pady=3)
+        ttk.Radiobutton(form, text="Replace (full refresh)", variable=mode_var, value="replace").grid(row=2, column=0, columnspan=2, sticky='w')
+        ttk.Radiobutton(form, text="Append rows with a key above the last snapshot", variable=mode_var, value="append").grid(row=3, column=0, columnspan=2, sticky='w')
+
+        result = [None]
+
+        def _ok():
+            if name_var.get().strip():
+                result[0] = (name_var.get().strip(), key_var.get(), mode_var.get())
+            dlg.destroy()
+
+        btn_row = ttk.Frame(dlg)
+        btn_row.pack(pady=10)
+        ttk.Button(btn_row, text="Snapshot", command=_ok).pack(side=tk.LEFT, padx=6)
+        ttk.Button(btn_row, text="Cancel",   command=dlg.destroy).pack(side=tk.LEFT)
+        dlg.wait_window()
+        return result[0]
+
+    def start(self):
+        connection_name = self.connection_manager.connection_name
+        if not connection_name:
+            messagebox.showwarning("Snapshot", "Snapshots are only available for saved connections")
+            return
+
+        store  = SnapshotStore(connection_name)
+        source = local = None
+        params = ()
+        try:
+            conn_type = self.db_connection.get_connection_type()
+            queries   = self.db_connection.get_queries_for_type(conn_type)
+            source, _ = self.connection_manager.open_connection(connection_name, shared=True)
+            if self.column_definitions is None:
+                cursor = source.cursor()
+                cursor.execute(f"SELECT * FROM ({self.source_sql}) {store.SOURCE_ALIAS} WHERE 1 = 0")
+                self.column_definitions = store.column_definitions(cursor.description)
+                cursor.close()
+            columns = [definition[0] for definition in self.column_definitions]
+
+            local    = store.connect()
+            options  = self._ask_options(columns, store.get(local, self.default_name))
+            if not options:
+                raise InterruptedError()
+            name, key_column, mode = options
+            metadata = store.get(local, name)
+
+            sql = self.source_sql
+            if mode == "append" and metadata:
+                key_column = key_column or metadata["key_column"]
+                if not key_column:
+                    raise ValueError("Appending to a snapshot needs a key column")
+                last_key = metadata["last_key"]
+                if conn_type == "SQLite" and isinstance(last_key, Decimal):
+                    last_key = float(last_key)  # sqlite3 cannot bind Decimal
+                sql, params = store.incremental_sql(queries, self.source_sql, key_column, last_key,
+                                                    QueryManager.PARAMSTYLES.get(conn_type, "qmark"))
+            else:
+                store.prepare_replace(local, name, self.column_definitions)
+
+            loader = self.db_connection.get_bulk_loader(
+                "main", name,
+                [(column, type_sql, None, None, None, 'Y') for column, type_sql, _ in self.column_definitions],
+                connection=local, connection_type="SQLite"
+            )
+        except Exception as e:
+            for connection in (source, local):
+                if connection:
+                    connection.close()
+            if not isinstance(e, InterruptedError):
+                messagebox.showerror("Error", f"Failed to prepare snapshot: {str(e)}")
+            return
+
+        copy     = TableCopy(source, sql, local, loader, params)
+        progress = ProgressDialog(self.root, "Snapshot to Local", f"{self.default_name} -> {store.connection_name}: {name}")
+        started  = time.perf_counter()
+
+        def poll():
+            if progress.cancelled and not copy.cancelled:
+                copy.cancel()
+            elapsed = time.perf_counter() - started
+            if copy.running:
+                progress.update_progress(copy.rows_copied, None, ProgressDialog.format_throughput(copy.rows_copied, elapsed))
+                progress.after(self.POLL_MS, poll)
+                return
+
+            source.close()
+            progress.close()
+            try:
+                if copy.error:
+                    messagebox.showerror("Error", f"Snapshot failed, the previous snapshot was kept: {copy.error}")
+                elif copy.cancelled:
+                    messagebox.showinfo("Snapshot Cancelled", "Snapshot cancelled, the previous snapshot was kept.")
+                else:
+                    total = store.record(local, name, self.source_sql, key_column)
+                    credential_manager = self.connection_manager.credential_manager
+                    if store.connection_name not in credential_manager.get_all_connection_names():
+                        credential_manager.save_sqlite_credentials(store.connection_name, store.path)
+                    messagebox.showinfo("Snapshot Finished",
+                                        f"{ProgressDialog.format_throughput(copy.rows_copied, elapsed)} copied, "
+                                        f"{total:,} rows in {store.connection_name}: {name}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to record snapshot: {str(e)}")
+            finally:
+                local.close()
+
+        copy.start()
+        progress.after(self.POLL_MS, poll)
+
+
+class ResultDiffRunner:
+    """
+    Runs a ResultDiff in a worker thread behind a ProgressDialog. Each side is either
+    a stored result {"columns", "rows"} or a query {"connection", "sql"} streamed from
+    its own connection, executed again for the rows found different.
+    *on_done(diff, columns, rows)* receives the difference grid.
+    """
+    POLL_MS    = 200
+    FETCH_SIZE = 10000
+
+    def __init__(self, root, connection_manager, left, right, key_columns, on_done):
+        self.root               = root
+        self.connection_manager = connection_manager
+        self.sides              = (left, right)
+        self.key_columns        = key_columns
+        self.on_done            = on_done
+        self.diff               = None
+        self.detail             = None
+        self.error              = None
+        self.done               = False
+        self._connections       = {}  # side index -> connection of a query side
+
+    def _chunks(self, index):
+        """(columns, iterator of row chunks) of side *index*."""
+        side = self.sides[index]
+        if "rows" in side:
+            rows = side["rows"]
+            return side["columns"], (rows[i:i + self.FETCH_SIZE] for i in range(0, len(rows), self.FETCH_SIZE))
+
+        if index not in self._connections:
+            self._connections[index], _ = self.connection_manager.open_connection(side["connection"], shared=True)
+        cursor = self._connections[index].cursor()
+        cursor.arraysize = self.FETCH_SIZE
+        cursor.execute(side["sql"])
+        columns = [d[0] for d in cursor.description]
+
+        def fetch():
+            try:
+                while True:
+                    rows = cursor.fetchmany(self.FETCH_SIZE)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+        return columns, fetch()
+
+    def start(self):
+        self.progress = ProgressDialog(self.root, "Compare Results", "Hashing rows...")
+        self.started  = time.perf_counter()
+        threading.Thread(target=self._run, daemon=True).start()
+        self.progress.after(self.POLL_MS, self._poll)
+
+    def _run(self):
+        try:
+            (left_columns, left_chunks), (right_columns, right_chunks) = self._chunks(0), self._chunks(1)
+            self.diff = ResultDiff(left_columns, right_columns, self.key_columns)
+            self.diff.compare(left_chunks, right_chunks)
+            if self.diff.difference_count and not self.diff.cancelled:
+                keys       = [key for _, key in self.diff.detail_keys()]
+                left_rows  = self.diff.collect_rows(self._chunks(0)[1], 0, keys)
+                right_rows = self.diff.collect_rows(self._chunks(1)[1], 1, keys)
+                self.detail = self.diff.detail_rows(left_rows, right_rows)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            for connection in self._connections.values():
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            self.done = True
+
+    def _poll(self):
+        if self.progress.cancelled and self.diff and not self.diff.cancelled:
+            self.diff.cancelled = True
+        if not self.done:
+            rows = sum(self.diff.rows_read) if self.diff else 0
+            self.progress.update_progress(0, None, ProgressDialog.format_throughput(rows, time.perf_counter() - self.started))
+            self.progress.after(self.POLL_MS, self._poll)
+            return
+
+        self.progress.close()
+        if self.error:
+            messagebox.showerror("Error", f"Failed to compare results: {self.error}")
+        elif self.diff.cancelled:
+            messagebox.showinfo("Compare Cancelled", "Comparison cancelled.")
+        elif not self.diff.difference_count:
+            messagebox.showinfo("Compare Results", f"No differences. {self.diff.summary()}")
+        else:
+            self.on_done(self.diff, *self.detail)
+
+
+class LobViewer:
+    """Window showing the content of a LobValue: text, or a hex dump of the first bytes."""
+    SHOWN = 65536  # characters (bytes) displayed; Save As writes the whole content
+
+    def __init__(self, root, title, value: LobValue):
+        self.value = value
+        try:
+            content = value.load()
+        except Exception as e:
+            messagebox.showerror("LOB Error", f"Error reading the value:\n{e}")
+            return
+
+        self.dialog = tk.Toplevel(root)
+        self.dialog.title(f"{title} - {TextManip.format_bytes(len(content))}")
+        self.dialog.geometry("800x500")
+        self.dialog.transient(root)
+
+        buttons = ttk.Frame(self.dialog)
+        buttons.pack(side=tk.BOTTOM, fill=tk.X, padx=8, pady=8)
+        ttk.Button(buttons, text="Save As...", command=self.save_as).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Close", command=self.dialog.destroy).pack(side=tk.RIGHT)
+
+        text = tk.Text(self.dialog, wrap=tk.NONE if value.is_binary else tk.WORD, font=("Courier New", 10))
+        scrollbar = ttk.Scrollbar(self.dialog, orient=tk.VERTICAL, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        text.pack(fill=tk.BOTH, expand=True)
+        text.insert("1.0", self.hex_dump(content[:self.SHOWN]) if value.is_binary else content[:self.SHOWN])
+        if len(content) > self.SHOWN:
+            text.insert(tk.END, f"\n... first {self.SHOWN:,} of {len(content):,} shown, Save As for the rest")
+        text.config(state=tk.DISABLED)
+
+    @staticmethod
+    def hex_dump(data: bytes) -> str:
+        """Offset, 16 bytes in hex and their printable characters, per line."""
+        lines = []
+        for offset in range(0, len(data), 16):
+            chunk = data[offset:offset + 16]
+            ascii_text = "".join(chr(b) if 32 <= b < 127 else "." for b in chunk)
+            lines.append(f"{offset:08x}  {chunk.hex(' '):<47}  {ascii_text}")
+        return "\n".join(lines)
+
+    def save_as(self):
+        binary = self.value.is_binary
+        path = filedialog.asksaveasfilename(parent=self.dialog, defaultextension=".bin" if binary else ".txt",
+                                            filetypes=[("Binary files", "*.bin")] if binary else [("Text files", "*.txt")])
+        if not path:
+            return
+        try:
+            if binary:
+                with open(path, "wb") as f:
+                    f.write(self.value.load())
+            else:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(self.value.load())
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Error saving the value:\n{e}")
+
+
+class QueryLimitsDialog:
+    """
+    Modal form of the limits of the queries run from the editor: timeout in seconds,
+    maximum rows and maximum size in MB, 0 or empty meaning no limit. *scopes*, when
+    given, are the choices of what the limits apply to (e.g. every connection or the
+    current one). After the dialog closes, result is (limits, scope index) or None.
+    """
+    def __init__(self, root, title, limits, scopes=None, scope=0):
+        self.result = None
+
+        self.dialog = tk.Toplevel(root)
+        self.dialog.title(title)
+        self.dialog.resizable(False, False)
+        self.dialog.transient(root)
+        self.dialog.grab_set()
+
+        form = ttk.Frame(self.dialog)
+        form.pack(fill=tk.BOTH, expand=True, padx=14, pady=(14, 4))
+        self.timeout_var = tk.StringVar(value=self._text(limits.get("timeout")))
+        self.rows_var    = tk.StringVar(value=self._text(limits.get("max_rows")))
+        self.mb_var      = tk.StringVar(value=self._text((limits.get("max_bytes") or 0) / 1048576))
+        fields = (("Timeout (seconds):", self.timeout_var), ("Maximum rows:", self.rows_var),
+                  ("Maximum size (MB):", self.mb_var))
+        for row, (label, variable) in enumerate(fields):
+            ttk.Label(form, text=label).grid(row=row, column=0, sticky='w', pady=3)
+            ttk.Entry(form, textvariable=variable, width=12).grid(row=row, column=1, sticky='w', padx=6, pady=3)
+        ttk.Label(form, text="0 or empty: no limit").grid(row=len(fields), column=0, columnspan=2, sticky='w', pady=3)
+
+        self.scope_var = tk.IntVar(value=scope)
+        for index, label in enumerate(scopes or ()):
+            ttk.Radiobutton(form, text=label, variable=self.scope_var, value=index).grid(
+                row=len(fields) + 1 + index, column=0, columnspan=2, sticky='w')
+
+        buttons = ttk.Frame(self.dialog)
+        buttons.pack(pady=10)
+        ttk.Button(buttons, text="OK",     command=self.ok).pack(side=tk.LEFT, padx=6)
+        ttk.Button(buttons, text="Cancel", command=self.dialog.destroy).pack(side=tk.LEFT)
+        self.dialog.wait_window()
+
+    @staticmethod
+    def _text(value):
+        return f"{value:g}" if value else ""
+
+    @staticmethod
+    def _number(text, name):
+        text = text.strip().replace("'", "")
+        try:
+            value = float(text) if text else 0
+        except ValueError:
+            raise ValueError(f"{name} must be a number")
+        if value < 0:
+            raise ValueError(f"{name} cannot be negative")
+        return value
+
+    def ok(self):
+        try:
+            limits = {
+                "timeout":   self._number(self.timeout_var.get(), "The timeout"),
+                "max_rows":  int(self._number(self.rows_var.get(), "The maximum rows")),
+                "max_bytes": int(self._number(self.mb_var.get(), "The maximum size") * 1048576),
+            }
+        except ValueError as e:
+            messagebox.showerror("Query Limits", str(e), parent=self.dialog)
+            return
+        self.result = (limits, self.scope_var.get())
+        self.dialog.destroy()
+
+
 class TextManip:
     PORTION_LEN = 150
 
@@ -113,12 +635,28 @@ class TextManip:
         spaces   = " "*(portion_len - text_len)
         return spaces
 
+    def format_bytes(size):
+        """Human readable size: 512 B, 1.5 KB, 12.0 MB, ..."""
+        for unit in ("B", "KB", "MB", "GB", "TB"):
+            if size < 1024 or unit == "TB":
+                return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+            size /= 1024
+
 class PanelStatusBar:
     def __init__(self, root, text, style):
         # Create a container frame to hold the status bar
         self.container = ttk.Frame(root)
         self.container.pack(side=tk.BOTTOM, fill=tk.X)
 
+        # Transaction mode indicator, kept on the right of the status bar
+        self.transaction_label = ttk.Label(
+            self.container,
+            text="Auto-commit",
+            style=style,
+            anchor='e'
+        )
+        self.transaction_label.pack(side=tk.RIGHT, fill=tk.Y, pady=(2, 0), padx=(0, 8))
+
         # Add the status bar to the container with minimum height
         self.status_bar = ttk.Label(
             self.container,
@@ -145,4 +683,17 @@ class PanelStatusBar:
             
     
     def set_query_result_status(self, new_query_result_status):
-        self.update_bar(new_query_result_status, 2)
\ No newline at end of file
+        self.update_bar(new_query_result_status, 2)
+
+    def set_aggregates(self, aggregates_text):
+        """Aggregates of the result grid selection, third portion of the bar."""
+        self.update_bar(aggregates_text, 3)
+
+    def set_transaction_state(self, auto_commit, pending):
+        """Show the transaction mode and whether uncommitted changes are pending."""
+        if auto_commit:
+            self.transaction_label.config(text="Auto-commit", style='Status.TLabel')
+        elif pending:
+            self.transaction_label.config(text="Manual commit: UNCOMMITTED CHANGES", style='StatusPending.TLabel')
+        else:
+            self.transaction_label.config(text="Manual commit: no pending changes", style='Status.TLabel')
\ No newline at end of file
@@ -1,5 +1,10 @@
-from typing import Dict, Any, List, Tuple
-from abc    import ABC, abstractmethod
+import time
+from typing    import Dict, Any, List, Tuple
+from abc       import ABC, abstractmethod
+from decimal   import Decimal
+from SQLScript import SQLScript, DMLBatch
+from CatalogModel import MetadataCache
+from ResultStore  import LobValue
 
 # ======================================================================
 # QUERY INTERFACE
@@ -164,6 +169,114 @@ class Queries(ABC):
     def limit_results_to(self, limit_value):
         pass
 
+    @abstractmethod
+    def quote_identifier(self, name):
+        pass
+
+    @abstractmethod
+    def get_qualified_name(self, schema, table):
+        pass
+
+    @abstractmethod
+    def get_key_bounds_sql(self, schema, table, key_column):
+        pass
+
+    @abstractmethod
+    def get_physical_bounds_sql(self, schema, table):
+        pass
+
+    @abstractmethod
+    def get_physical_range_predicate(self, low, high):
+        pass
+
+    @abstractmethod
+    def get_hash_partition_predicate(self, index, count):
+        pass
+
+    @abstractmethod
+    def get_column_type_sql(self, category, length, precision, scale):
+        pass
+
+    @abstractmethod
+    def get_create_table_sql(self, schema, table, column_definitions):
+        pass
+
+    @abstractmethod
+    def get_range_checksum_sql(self, schema, table, columns, predicate, lob_columns=()):
+        pass
+
+    @abstractmethod
+    def get_create_index_sql(self, schema, table, index, columns, unique):
+        pass
+
+    @abstractmethod
+    def get_estimated_row_counts_sql(self, schema):
+        pass
+
+    @abstractmethod
+    def get_table_sizes_sql(self, schema):
+        pass
+
+    @abstractmethod
+    def get_current_schema_sql(self):
+        pass
+
+    @abstractmethod
+    def get_keyset_page_sql(self, schema, table, columns, key_columns, predicate, descending, limit):
+        pass
+
+    @abstractmethod
+    def get_keyset_predicate_sql(self, key_columns, operator, bind):
+        pass
+
+    @abstractmethod
+    def get_sample_sql(self, schema, table, columns, percent, limit, is_view):
+        pass
+
+    @abstractmethod
+    def get_profile_sql(self, source, columns, kinds, exact=True):
+        pass
+
+    @abstractmethod
+    def get_column_statistics_sql(self, schema, table):
+        pass
+
+    @abstractmethod
+    def get_schema_columns_sql(self, schema):
+        pass
+
+    @abstractmethod
+    def get_schema_primary_keys_sql(self, schema):
+        pass
+
+    @abstractmethod
+    def get_schema_index_columns_sql(self, schema):
+        pass
+
+    @abstractmethod
+    def get_schema_view_queries_sql(self, schema):
+        pass
+
+    @abstractmethod
+    def get_schema_routine_sources_sql(self, schema):
+        pass
+
+    @abstractmethod
+    def savepoint_sql(self, name):
+        pass
+
+    @abstractmethod
+    def rollback_to_savepoint_sql(self, name):
+        pass
+
+    @abstractmethod
+    def release_savepoint_sql(self, name):
+        pass
+
+    @abstractmethod
+    def statement_timeout_sql(self):
+        pass
+
 # ======================================================================
 # ORACLE QUERIES
 # ======================================================================
@@ -598,6 +711,283 @@ class QueriesOracle(Queries):
     def limit_results_to(limit_value):
         return f"FETCH FIRST {limit_value} ROWS ONLY"
 
+    @staticmethod
+    def quote_identifier(name):
+        return '"' + str(name).replace('"', '""') + '"'
+
+    @staticmethod
+    def get_qualified_name(schema, table):
+        return f"{QueriesOracle.quote_identifier(schema)}.{QueriesOracle.quote_identifier(table)}"
+
+    @staticmethod
+    def get_key_bounds_sql(schema, table, key_column):
+        return f"SELECT MIN({QueriesOracle.quote_identifier(key_column)}), MAX({QueriesOracle.quote_identifier(key_column)}) FROM {QueriesOracle.get_qualified_name(schema, table)}"
+
+    @staticmethod
+    def get_physical_bounds_sql(schema, table):
+        # No cheap physical ranges without DBMS_PARALLEL_EXECUTE privileges: hash partitions are used
+        return None
+
+    @staticmethod
+    def get_physical_range_predicate(low, high):
+        return None
+
+    @staticmethod
+    def get_hash_partition_predicate(index, count):
+        return f"ORA_HASH(ROWID, {count - 1}) = {index}"
+
+    @staticmethod
+    def get_column_type_sql(category, length, precision, scale):
+        """Oracle column type for a generic category (see ColumnTypeMapper.category)."""
+        if category == "integer":
+            return f"NUMBER({precision})" if precision and precision <= 38 else "NUMBER(19)"
+        if category == "decimal":
+            return f"NUMBER({precision},{scale or 0})" if precision and precision <= 38 else "NUMBER"
+        if category == "float":
+            return "BINARY_DOUBLE"
+        if category == "boolean":
+            return "NUMBER(1)"
+        if category == "date":
+            return "DATE"
+        if category == "timestamp":
+            return "TIMESTAMP"
+        if category == "binary":
+            return "BLOB"
+        if category == "time":
+            return "VARCHAR2(20)"
+        return f"VARCHAR2({length} CHAR)" if length and 0 < length <= 4000 else "CLOB"
+
+    @staticmethod
+    def get_create_table_sql(schema, table, column_definitions):
+        """column_definitions: (name, type_sql, nullable) tuples."""
+        columns = ",\n  ".join(
+            f"{QueriesOracle.quote_identifier(name)} {type_sql}{'' if nullable else ' NOT NULL'}"
+            for name, type_sql, nullable in column_definitions
+        )
+        return f"CREATE TABLE {QueriesOracle.get_qualified_name(schema, table)} (\n  {columns}\n)"
+
+    @staticmethod
+    def get_range_checksum_sql(schema, table, columns, predicate, lob_columns=()):
+        """
+        COUNT(*) and the sum of ORA_HASH of each row's values (rows of *predicate*). Each
+        value is hashed on its own so that the row text stays short; LOBs, which neither
+        || nor ORA_HASH accept, are hashed as their length and first 1000 characters (bytes).
+        """
+        hashes = []
+        for column in columns:
+            quoted = QueriesOracle.quote_identifier(column)
+            if column in lob_columns:
+                hashes.append(f"DBMS_LOB.GETLENGTH({quoted}) || ':' || ORA_HASH(DBMS_LOB.SUBSTR({quoted}, 1000, 1))")
+            else:
+                hashes.append(f"ORA_HASH({quoted})")
+        row_text = " || '|' || ".join(hashes)
+        return (f"SELECT COUNT(*), SUM(ORA_HASH({row_text})) "
+                f"FROM {QueriesOracle.get_qualified_name(schema, table)} WHERE {predicate}")
+
+    @staticmethod
+    def get_create_index_sql(schema, table, index, columns, unique):
+        column_list = ", ".join(QueriesOracle.quote_identifier(column) for column in columns)
+        return (f"CREATE {'UNIQUE ' if unique else ''}INDEX {QueriesOracle.get_qualified_name(schema, index)} "
+                f"ON {QueriesOracle.get_qualified_name(schema, table)} ({column_list})")
+
+    @staticmethod
+    def get_estimated_row_counts_sql(schema):
+        """(table name, row count) of every table of *schema* from the optimizer statistics (NULL if never gathered)."""
+        return f"""
+            SELECT table_name, num_rows
+            FROM all_tables
+            WHERE owner = '{schema}'
+        """
+
+    @staticmethod
+    def get_table_sizes_sql(schema):
+        """(table name, rows from the statistics, segment bytes) of every table of *schema*."""
+        # Segment sizes come from user_segments (dba_segments needs a grant), so only for the own schema
+        return f"""
+            SELECT t.table_name, t.num_rows, seg.bytes
+            FROM all_tables t
+            LEFT JOIN (
+                SELECT segment_name, SUM(bytes) AS bytes
+                FROM user_segments
+                WHERE segment_type LIKE 'TABLE%'
+                GROUP BY segment_name
+            ) seg
+                ON seg.segment_name = t.table_name
+               AND t.owner = USER
+            WHERE t.owner = '{schema}'
+        """
+
+    @staticmethod
+    def get_current_schema_sql():
+        """Schema of the unqualified names of the session (ALTER SESSION SET CURRENT_SCHEMA)."""
+        return "SELECT SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA') FROM dual"
+
+    @staticmethod
+    def get_keyset_page_sql(schema, table, columns, key_columns, predicate, descending, limit):
+        """First *limit* rows matching *predicate* in primary key order (descending to read backwards)."""
+        q         = QueriesOracle.quote_identifier
+        direction = " DESC" if descending else ""
+        where     = f"\nWHERE {predicate}" if predicate else ""
+        return (f"SELECT {', '.join(q(c) for c in columns)}\nFROM {QueriesOracle.get_qualified_name(schema, table)}{where}\n"
+                f"ORDER BY {', '.join(q(c) + direction for c in key_columns)}\nFETCH FIRST {limit} ROWS ONLY")
+
+    @staticmethod
+    def get_keyset_predicate_sql(key_columns, operator, bind):
+        """
+        Rows after (operator '>') or before ('<') a key in key order. No row-value
+        comparison here: k1 >= ? AND (k1 > ? OR (k1 = ? AND k2 > ?) ...), the leading
+        bound letting the optimizer seek in the key index. bind(i) returns the
+        placeholder of key value i, called once per occurrence.
+        """
+        q            = QueriesOracle.quote_identifier
+        quoted       = [q(c) for c in key_columns]
+        leading      = f"{quoted[0]} {operator}= {bind(0)} AND " if len(quoted) > 1 else ""  # bound first: text order
+        alternatives = []
+        for i in range(len(quoted)):
+            terms = [f"{quoted[j]} = {bind(j)}" for j in range(i)]
+            terms.append(f"{quoted[i]} {operator} {bind(i)}")
+            alternatives.append("(" + " AND ".join(terms) + ")")
+        if len(quoted) == 1:
+            return alternatives[0]
+        return f"{leading}({' OR '.join(alternatives)})"
+
+    @staticmethod
+    def get_sample_sql(schema, table, columns, percent, limit, is_view):
+        """
+        Random rows of a table or view: about *percent* % of them (None: unknown, the
+        rows are shuffled instead), at most *limit*. Below 1 % whole blocks are sampled,
+        which reads only those blocks; above, SAMPLE picks rows uniformly in one scan.
+        """
+        fields = ", ".join(QueriesOracle.quote_identifier(c) for c in columns)
+        sql    = f"SELECT {fields}\nFROM {QueriesOracle.get_qualified_name(schema, table)}"
+        if percent is None:
+            sql += "\nORDER BY DBMS_RANDOM.VALUE"
+        elif percent < 100 and is_view:
+            sql += f"\nWHERE DBMS_RANDOM.VALUE < {percent / 100}"
+        elif percent < 100:
+            sql += f" SAMPLE BLOCK ({percent})" if percent < 1 else f" SAMPLE ({percent})"
+        if limit:
+            sql += f"\nFETCH FIRST {limit} ROWS ONLY"
+        return sql
+
+    @staticmethod
+    def get_profile_sql(source, columns, kinds, exact=True):
+        """
+        One aggregate row over *source* (a table or a subquery): COUNT(*), then for each
+        column (see ColumnProfiler.KINDS) its non-null count, approximate distinct count,
+        min, max, average and most frequent value, NULL where the kind has none. Without
+        *exact*, the aggregates sorting or hashing each column (here STATS_MODE) are left
+        out; the HyperLogLog distinct count is always taken.
+        """
+        expressions = ["COUNT(*)"]
+        for column, kind in zip(columns, kinds):
+            c = QueriesOracle.quote_identifier(column)
+            expressions += [
+                f"COUNT({c})",
+                "NULL" if kind == "opaque" else f"APPROX_COUNT_DISTINCT({c})",
+                f"MIN({c})" if kind in ("numeric", "ordered") else "NULL",
+                f"MAX({c})" if kind in ("numeric", "ordered") else "NULL",
+                f"AVG({c})" if kind == "numeric" else "NULL",
+                "NULL" if kind == "opaque" or not exact else f"STATS_MODE({c})",
+            ]
+        return "SELECT\n  " + ",\n  ".join(expressions) + f"\nFROM {source}"
+
+    @staticmethod
+    def get_column_statistics_sql(schema, table):
+        """None: APPROX_COUNT_DISTINCT already gives the distinct counts in the profile scan."""
+        return None
+
+    @staticmethod
+    def get_schema_columns_sql(schema):
+        """(table, then the columns of get_table_structure) of every table column of *schema*."""
+        return f"""
+                SELECT
+                    c.table_name,
+                    c.column_name,
+                    c.data_type AS type,
+                    c.data_length,
+                    c.data_precision,
+                    c.data_scale,
+                    c.nullable
+                FROM all_tab_columns c
+                JOIN all_tables t
+                    ON t.owner = c.owner
+                    AND t.table_name = c.table_name
+                WHERE c.owner = '{schema}'
+                ORDER BY c.table_name, c.column_id
+            """
+
+    @staticmethod
+    def get_schema_primary_keys_sql(schema):
+        """(table, column) of the primary key columns of every table of *schema*, in key order."""
+        return f"""
+                SELECT
+                    cons.table_name,
+                    cols.column_name
+                FROM all_constraints cons
+                JOIN all_cons_columns cols
+                    ON cons.constraint_name = cols.constraint_name
+                    AND cons.owner = cols.owner
+                WHERE cons.owner = '{schema}'
+                    AND cons.constraint_type = 'P'
+                ORDER BY cons.table_name, cols.position
+            """
+
+    @staticmethod
+    def get_schema_index_columns_sql(schema):
+        """(table, index, uniqueness, column) of every index column of *schema*, in index order."""
+        return f"""
+                SELECT
+                    i.table_name,
+                    i.index_name,
+                    i.uniqueness,
+                    ic.column_name
+                FROM all_indexes i
+                JOIN all_ind_columns ic
+                    ON i.owner = ic.index_owner
+                AND i.index_name = ic.index_name
+                WHERE i.owner = '{schema}'
+                ORDER BY i.table_name, i.index_name, ic.column_position
+            """
+
+    @staticmethod
+    def get_schema_view_queries_sql(schema):
+        return f"""
+            SELECT view_name, text
+            FROM all_views
+            WHERE owner = '{schema}'
+        """
+
+    @staticmethod
+    def get_schema_routine_sources_sql(schema):
+        """('procedure' or 'function', name, source line) of the stored routines of *schema*, in line order."""
+        return f"""
+            SELECT LOWER(type), name, text
+            FROM all_source
+            WHERE owner = '{schema}'
+              AND type IN ('PROCEDURE', 'FUNCTION')
+            ORDER BY type, name, line
+        """
+
+    @staticmethod
+    def savepoint_sql(name):
+        return f"SAVEPOINT {name}"
+
+    @staticmethod
+    def rollback_to_savepoint_sql(name):
+        return f"ROLLBACK TO SAVEPOINT {name}"
+
+    @staticmethod
+    def release_savepoint_sql(name):
+        # Oracle has no RELEASE SAVEPOINT; savepoints end with the transaction
+        return None
+
+    @staticmethod
+    def statement_timeout_sql():
+        # No session setting: oracledb bounds each round trip with connection.call_timeout,
+        # ODBC with the query timeout of the connection
+        return None
+
 # ======================================================================
 # SQLITE QUERIES
 # ======================================================================
@@ -912,80 +1302,319 @@ class QueriesSQLite(Queries):
     def limit_results_to(limit_value):
         return  f"LIMIT {limit_value}"
 
-# ======================================================================
-# POSTGRESQL QUERIES
-# ======================================================================
+    @staticmethod
+    def quote_identifier(name):
+        return '"' + str(name).replace('"', '""') + '"'
 
-class QueriesPostgreSQL(Queries):
-    """PostgreSQL-specific SQL queries"""
+    @staticmethod
+    def get_qualified_name(schema, table):
+        # Tables are addressed without schema, as in get_first_x_rows
+        return QueriesSQLite.quote_identifier(table)
 
     @staticmethod
-    def get_col_names(schema, table):
-        query = f"""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_schema = '{schema}' AND table_name = '{table}' 
-            ORDER BY ordinal_position
-        """
-        return query
+    def get_key_bounds_sql(schema, table, key_column):
+        return f"SELECT MIN({QueriesSQLite.quote_identifier(key_column)}), MAX({QueriesSQLite.quote_identifier(key_column)}) FROM {QueriesSQLite.get_qualified_name(schema, table)}"
 
     @staticmethod
-    def extract_col_names(rows):
-        col_names = [row[0] for row in rows]
-        return col_names
+    def get_physical_bounds_sql(schema, table):
+        return f"SELECT MIN(rowid), MAX(rowid) FROM {QueriesSQLite.get_qualified_name(schema, table)}"
 
     @staticmethod
-    def get_first_x_rows(schema, table, limit, colnames):
-        fields = ",\n  ".join(f'"{col}"' for col in colnames)
-        return f'SELECT\n  {fields}\nFROM "{schema}"."{table}"\nLIMIT {limit}'
+    def get_physical_range_predicate(low, high):
+        conditions = []
+        if low is not None:
+            conditions.append(f"rowid >= {low}")
+        if high is not None:
+            conditions.append(f"rowid < {high}")
+        return " AND ".join(conditions) or "1 = 1"
 
     @staticmethod
-    def get_all_schemas_with_their_table_count():
+    def get_hash_partition_predicate(index, count):
+        return f"rowid % {count} = {index}"
+
+    @staticmethod
+    def get_column_type_sql(category, length, precision, scale):
+        """SQLite declared type (drives the column affinity) for a generic category."""
+        return {
+            "integer":   "INTEGER",
+            "decimal":   "NUMERIC",
+            "float":     "REAL",
+            "boolean":   "INTEGER",
+            "date":      "DATE",
+            "timestamp": "TIMESTAMP",
+            "time":      "TIME",
+            "binary":    "BLOB",
+        }.get(category, "TEXT")
+
+    @staticmethod
+    def get_create_table_sql(schema, table, column_definitions):
+        """column_definitions: (name, type_sql, nullable) tuples."""
+        columns = ",\n  ".join(
+            f"{QueriesSQLite.quote_identifier(name)} {type_sql}{'' if nullable else ' NOT NULL'}"
+            for name, type_sql, nullable in column_definitions
+        )
+        return f"CREATE TABLE {QueriesSQLite.get_qualified_name(schema, table)} (\n  {columns}\n)"
+
+    @staticmethod
+    def get_range_checksum_sql(schema, table, columns, predicate, lob_columns=()):
+        # No hash function in SQLite: range checksums are computed on the client
+        return None
+
+    @staticmethod
+    def get_create_index_sql(schema, table, index, columns, unique):
+        column_list = ", ".join(QueriesSQLite.quote_identifier(column) for column in columns)
+        return (f"CREATE {'UNIQUE ' if unique else ''}INDEX {QueriesSQLite.quote_identifier(index)} "
+                f"ON {QueriesSQLite.get_qualified_name(schema, table)} ({column_list})")
+
+    @staticmethod
+    def get_estimated_row_counts_sql(schema):
+        """(table name, row count) from sqlite_stat1, which exists once ANALYZE has been run."""
+        # The first number of each stat is the row count of the table
         return """
-            SELECT table_schema AS owner, COUNT(*) AS table_count
-            FROM information_schema.tables
-            WHERE table_type = 'BASE TABLE'
-              AND table_schema NOT IN ('pg_catalog', 'information_schema')
-            GROUP BY table_schema
-            ORDER BY table_schema
+            SELECT tbl, MAX(CAST(stat AS INTEGER))
+            FROM sqlite_stat1
+            GROUP BY tbl
         """
 
     @staticmethod
-    def get_all_table_names_in_schema(schema):
-        return f"""
-            SELECT table_name
-            FROM information_schema.tables
-            WHERE table_schema = '{schema}'
-              AND table_type = 'BASE TABLE'
-            ORDER BY table_name
+    def get_table_sizes_sql(schema):
+        """(table name, rows, bytes of the table and its indexes) from the dbstat virtual table."""
+        # Cells on the leaf pages of a table b-tree are its rows
+        return """
+            SELECT m.tbl_name,
+                   SUM(CASE WHEN m.type = 'table' AND d.pagetype = 'leaf' THEN d.ncell ELSE 0 END),
+                   SUM(d.pgsize)
+            FROM sqlite_master m
+            JOIN dbstat d ON d.name = m.name
+            WHERE m.type IN ('table', 'index')
+              AND m.tbl_name NOT LIKE 'sqlite_%'
+            GROUP BY m.tbl_name
         """
 
     @staticmethod
-    def get_table_primary_keys(schema, table):
-        return f"""
-            SELECT
-                kcu.column_name,
-                'P' AS constraint_type
-            FROM information_schema.table_constraints tc
-            JOIN information_schema.key_column_usage kcu
-                ON tc.constraint_name = kcu.constraint_name
-                AND tc.table_schema  = kcu.table_schema
-            WHERE tc.constraint_type = 'PRIMARY KEY'
-              AND tc.table_schema = '{schema}'
-              AND tc.table_name   = '{table}'
-            ORDER BY kcu.ordinal_position
+    def get_current_schema_sql():
+        """The main database; attached databases are never the default schema."""
+        return "SELECT 'main'"
+
+    @staticmethod
+    def get_keyset_page_sql(schema, table, columns, key_columns, predicate, descending, limit):
+        """First *limit* rows matching *predicate* in primary key order; the key index makes it a range seek."""
+        q         = QueriesSQLite.quote_identifier
+        direction = " DESC" if descending else ""
+        where     = f"\nWHERE {predicate}" if predicate else ""
+        return (f"SELECT {', '.join(q(c) for c in columns)}\nFROM {QueriesSQLite.get_qualified_name(schema, table)}{where}\n"
+                f"ORDER BY {', '.join(q(c) + direction for c in key_columns)}\nLIMIT {limit}")
+
+    @staticmethod
+    def get_keyset_predicate_sql(key_columns, operator, bind):
         """
+        Rows after (operator '>') or before ('<') a key in key order, as a row-value
+        comparison (k1, k2) > (?, ?). bind(i) returns the placeholder of key value i.
+        """
+        q = QueriesSQLite.quote_identifier
+        if len(key_columns) == 1:
+            return f"{q(key_columns[0])} {operator} {bind(0)}"
+        return (f"({', '.join(q(c) for c in key_columns)}) {operator} "
+                f"({', '.join(bind(i) for i in range(len(key_columns)))})")
 
     @staticmethod
-    def get_table_foreign_keys(schema, table):
-        return f"""
-            SELECT
-                kcu.column_name,
-                'R' AS constraint_type,
-                ccu.table_schema AS r_owner,
-                tc.constraint_name AS r_constraint_name,
-                ccu.table_name AS referenced_table
-            FROM information_schema.table_constraints tc
+    def get_sample_sql(schema, table, columns, percent, limit, is_view):
+        """
+        Random rows of a table or view, at most *limit*. A table with a row target is
+        read as up to 10 ranges of consecutive rowids from random starting points, a
+        few index seeks; otherwise rows are kept with probability *percent* % (or
+        shuffled when it is None).
+        """
+        q      = QueriesSQLite.quote_identifier
+        name   = QueriesSQLite.get_qualified_name(schema, table)
+        fields = ", ".join(q(c) for c in columns)
+        if limit and not is_view:
+            ranges = min(10, limit)
+            size   = -(-limit // ranges)
+            start  = f"(SELECT MIN(rowid) + abs(random()) % (MAX(rowid) - MIN(rowid) + 1) FROM {name})"
+            picks  = "\n    UNION ALL\n".join(
+                f"    SELECT rowid FROM (SELECT rowid FROM {name} WHERE rowid >= {start} ORDER BY rowid LIMIT {size})"
+                for _ in range(ranges)
+            )
+            return f"SELECT {fields}\nFROM {name}\nWHERE rowid IN (\n{picks}\n)\nLIMIT {limit}"
+        sql = f"SELECT {fields}\nFROM {name}"
+        if percent is None:
+            sql += "\nORDER BY random()"
+        elif percent < 100:
+            sql += f"\nWHERE abs(random()) % 1000000 < {int(percent * 10000)}"
+        if limit:
+            sql += f"\nLIMIT {limit}"
+        return sql
+
+    @staticmethod
+    def get_profile_sql(source, columns, kinds, exact=True):
+        """One aggregate row over *source*, in the layout of QueriesOracle.get_profile_sql (no mode in SQLite)."""
+        expressions = ["COUNT(*)"]
+        for column, kind in zip(columns, kinds):
+            c = QueriesSQLite.quote_identifier(column)
+            expressions += [
+                f"COUNT({c})",
+                "NULL" if kind == "opaque" or not exact else f"COUNT(DISTINCT {c})",
+                f"MIN({c})" if kind in ("numeric", "ordered") else "NULL",
+                f"MAX({c})" if kind in ("numeric", "ordered") else "NULL",
+                f"AVG({c})" if kind == "numeric" else "NULL",
+                "NULL",
+            ]
+        return "SELECT\n  " + ",\n  ".join(expressions) + f"\nFROM {source}"
+
+    @staticmethod
+    def get_column_statistics_sql(schema, table):
+        """None: sqlite_stat1 has no per-column distinct counts."""
+        return None
+
+    @staticmethod
+    def get_schema_columns_sql(schema):
+        # Table-valued pragmas joined to sqlite_master: all tables in one statement
+        return """
+            SELECT
+                m.name AS table_name,
+                c.name AS fieldname,
+                c.type AS type,
+                NULL AS data_length,
+                NULL AS data_precision,
+                NULL AS data_scale,
+                CASE WHEN c."notnull" = 1 THEN 'N' ELSE 'Y' END AS nullable
+            FROM sqlite_master m
+            JOIN pragma_table_info(m.name) c
+            WHERE m.type = 'table'
+            ORDER BY m.name, c.cid
+        """
+
+    @staticmethod
+    def get_schema_primary_keys_sql(schema):
+        return """
+            SELECT m.name AS table_name, c.name AS column_name
+            FROM sqlite_master m
+            JOIN pragma_table_info(m.name) c
+            WHERE m.type = 'table'
+              AND c.pk > 0
+            ORDER BY m.name, c.pk
+        """
+
+    @staticmethod
+    def get_schema_index_columns_sql(schema):
+        return """
+            SELECT
+                m.name AS table_name,
+                il.name AS index_name,
+                CASE WHEN il."unique" = 1 THEN 'UNIQUE' ELSE 'NONUNIQUE' END AS uniqueness,
+                ii.name AS column_name
+            FROM sqlite_master m
+            JOIN pragma_index_list(m.name) il
+            JOIN pragma_index_info(il.name) ii
+            WHERE m.type = 'table'
+            ORDER BY m.name, il.name, ii.seqno
+        """
+
+    @staticmethod
+    def get_schema_view_queries_sql(schema):
+        return """
+            SELECT name, sql AS text
+            FROM sqlite_master
+            WHERE type='view'
+        """
+
+    @staticmethod
+    def get_schema_routine_sources_sql(schema):
+        # SQLite doesn't have stored procedures or functions
+        return "SELECT NULL AS kind, NULL AS name, NULL AS text WHERE 0=1"
+
+    @staticmethod
+    def savepoint_sql(name):
+        return f"SAVEPOINT {name}"
+
+    @staticmethod
+    def rollback_to_savepoint_sql(name):
+        return f"ROLLBACK TO SAVEPOINT {name}"
+
+    @staticmethod
+    def release_savepoint_sql(name):
+        return f"RELEASE SAVEPOINT {name}"
+
+    @staticmethod
+    def statement_timeout_sql():
+        # sqlite3 statements are interrupted from a progress handler instead
+        return None
+
+# ======================================================================
+# POSTGRESQL QUERIES
+# ======================================================================
+
+class QueriesPostgreSQL(Queries):
+    """PostgreSQL-specific SQL queries"""
+
+    @staticmethod
+    def get_col_names(schema, table):
+        query = f"""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_schema = '{schema}' AND table_name = '{table}' 
+            ORDER BY ordinal_position
+        """
+        return query
+
+    @staticmethod
+    def extract_col_names(rows):
+        col_names = [row[0] for row in rows]
+        return col_names
+
+    @staticmethod
+    def get_first_x_rows(schema, table, limit, colnames):
+        fields = ",\n  ".join(f'"{col}"' for col in colnames)
+        return f'SELECT\n  {fields}\nFROM "{schema}"."{table}"\nLIMIT {limit}'
+
+    @staticmethod
+    def get_all_schemas_with_their_table_count():
+        return """
+            SELECT table_schema AS owner, COUNT(*) AS table_count
+            FROM information_schema.tables
+            WHERE table_type = 'BASE TABLE'
+              AND table_schema NOT IN ('pg_catalog', 'information_schema')
+            GROUP BY table_schema
+            ORDER BY table_schema
+        """
+
+    @staticmethod
+    def get_all_table_names_in_schema(schema):
+        return f"""
+            SELECT table_name
+            FROM information_schema.tables
+            WHERE table_schema = '{schema}'
+              AND table_type = 'BASE TABLE'
+            ORDER BY table_name
+        """
+
+    @staticmethod
+    def get_table_primary_keys(schema, table):
+        return f"""
+            SELECT
+                kcu.column_name,
+                'P' AS constraint_type
+            FROM information_schema.table_constraints tc
+            JOIN information_schema.key_column_usage kcu
+                ON tc.constraint_name = kcu.constraint_name
+                AND tc.table_schema  = kcu.table_schema
+            WHERE tc.constraint_type = 'PRIMARY KEY'
+              AND tc.table_schema = '{schema}'
+              AND tc.table_name   = '{table}'
+            ORDER BY kcu.ordinal_position
+        """
+
+    @staticmethod
+    def get_table_foreign_keys(schema, table):
+        return f"""
+            SELECT
+                kcu.column_name,
+                'R' AS constraint_type,
+                ccu.table_schema AS r_owner,
+                tc.constraint_name AS r_constraint_name,
+                ccu.table_name AS referenced_table
+            FROM information_schema.table_constraints tc
             JOIN information_schema.key_column_usage kcu
                 ON tc.constraint_name = kcu.constraint_name
                 AND tc.table_schema  = kcu.table_schema
@@ -1303,6 +1932,290 @@ class QueriesPostgreSQL(Queries):
     def limit_results_to(limit_value):
         return  f"LIMIT {limit_value}"
 
+    @staticmethod
+    def quote_identifier(name):
+        return '"' + str(name).replace('"', '""') + '"'
+
+    @staticmethod
+    def get_qualified_name(schema, table):
+        return f"{QueriesPostgreSQL.quote_identifier(schema)}.{QueriesPostgreSQL.quote_identifier(table)}"
+
+    @staticmethod
+    def get_key_bounds_sql(schema, table, key_column):
+        return f"SELECT MIN({QueriesPostgreSQL.quote_identifier(key_column)}), MAX({QueriesPostgreSQL.quote_identifier(key_column)}) FROM {QueriesPostgreSQL.get_qualified_name(schema, table)}"
+
+    @staticmethod
+    def get_physical_bounds_sql(schema, table):
+        # Heap pages; ctid range scans read only the pages of their range (PostgreSQL 14+)
+        regclass = QueriesPostgreSQL.get_qualified_name(schema, table).replace("'", "''")
+        return f"SELECT 0, relpages FROM pg_class WHERE oid = '{regclass}'::regclass"
+
+    @staticmethod
+    def get_physical_range_predicate(low, high):
+        conditions = []
+        if low is not None:
+            conditions.append(f"ctid >= '({low},0)'::tid")
+        if high is not None:
+            conditions.append(f"ctid < '({high},0)'::tid")
+        return " AND ".join(conditions) or "1 = 1"
+
+    @staticmethod
+    def get_hash_partition_predicate(index, count):
+        return f"abs(hashtext(ctid::text)) % {count} = {index}"
+
+    @staticmethod
+    def get_column_type_sql(category, length, precision, scale):
+        """PostgreSQL column type for a generic category (see ColumnTypeMapper.category)."""
+        if category == "integer":
+            return "INTEGER" if precision and precision <= 9 else "BIGINT"
+        if category == "decimal":
+            return f"NUMERIC({precision},{scale or 0})" if precision and precision <= 1000 else "NUMERIC"
+        if category == "float":
+            return "DOUBLE PRECISION"
+        if category == "boolean":
+            return "BOOLEAN"
+        if category == "date":
+            return "DATE"
+        if category == "timestamp":
+            return "TIMESTAMP"
+        if category == "time":
+            return "TIME"
+        if category == "binary":
+            return "BYTEA"
+        return f"VARCHAR({length})" if length and length > 0 else "TEXT"
+
+    @staticmethod
+    def get_create_table_sql(schema, table, column_definitions):
+        """column_definitions: (name, type_sql, nullable) tuples."""
+        columns = ",\n  ".join(
+            f"{QueriesPostgreSQL.quote_identifier(name)} {type_sql}{'' if nullable else ' NOT NULL'}"
+            for name, type_sql, nullable in column_definitions
+        )
+        return f"CREATE TABLE {QueriesPostgreSQL.get_qualified_name(schema, table)} (\n  {columns}\n)"
+
+    @staticmethod
+    def get_range_checksum_sql(schema, table, columns, predicate, lob_columns=()):
+        """COUNT(*) and the sum of the first 60 bits of md5 of each row (rows of *predicate*)."""
+        # text and bytea have a text form of any length: no special case for large values
+        row = ", ".join(QueriesPostgreSQL.quote_identifier(column) for column in columns)
+        return (f"SELECT COUNT(*), SUM(('x' || LEFT(MD5(ROW({row})::text), 15))::bit(60)::bigint) "
+                f"FROM {QueriesPostgreSQL.get_qualified_name(schema, table)} WHERE {predicate}")
+
+    @staticmethod
+    def get_create_index_sql(schema, table, index, columns, unique):
+        # The index is created in the schema of its table
+        column_list = ", ".join(QueriesPostgreSQL.quote_identifier(column) for column in columns)
+        return (f"CREATE {'UNIQUE ' if unique else ''}INDEX {QueriesPostgreSQL.quote_identifier(index)} "
+                f"ON {QueriesPostgreSQL.get_qualified_name(schema, table)} ({column_list})")
+
+    @staticmethod
+    def get_estimated_row_counts_sql(schema):
+        """(table name, row count) of every table of *schema* from pg_class.reltuples (-1 until analyzed)."""
+        return f"""
+            SELECT c.relname,
+                   CASE WHEN c.reltuples < 0 THEN NULL ELSE c.reltuples::bigint END
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = '{schema}'
+              AND c.relkind IN ('r', 'p')
+        """
+
+    @staticmethod
+    def get_table_sizes_sql(schema):
+        """(table name, rows from reltuples, pg_total_relation_size) of every table of *schema*."""
+        return f"""
+            SELECT c.relname,
+                   CASE WHEN c.reltuples < 0 THEN NULL ELSE c.reltuples::bigint END,
+                   pg_total_relation_size(c.oid)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = '{schema}'
+              AND c.relkind IN ('r', 'p')
+        """
+
+    @staticmethod
+    def get_current_schema_sql():
+        """First schema of the search_path that exists."""
+        return "SELECT current_schema()"
+
+    @staticmethod
+    def get_keyset_page_sql(schema, table, columns, key_columns, predicate, descending, limit):
+        """First *limit* rows matching *predicate* in primary key order (descending to read backwards)."""
+        q         = QueriesPostgreSQL.quote_identifier
+        direction = " DESC" if descending else ""
+        where     = f"\nWHERE {predicate}" if predicate else ""
+        return (f"SELECT {', '.join(q(c) for c in columns)}\nFROM {QueriesPostgreSQL.get_qualified_name(schema, table)}{where}\n"
+                f"ORDER BY {', '.join(q(c) + direction for c in key_columns)}\nLIMIT {limit}")
+
+    @staticmethod
+    def get_keyset_predicate_sql(key_columns, operator, bind):
+        """
+        Rows after (operator '>') or before ('<') a key in key order, as a row-value
+        comparison (k1, k2) > (?, ?). bind(i) returns the placeholder of key value i.
+        """
+        q = QueriesPostgreSQL.quote_identifier
+        if len(key_columns) == 1:
+            return f"{q(key_columns[0])} {operator} {bind(0)}"
+        return (f"({', '.join(q(c) for c in key_columns)}) {operator} "
+                f"({', '.join(bind(i) for i in range(len(key_columns)))})")
+
+    @staticmethod
+    def get_sample_sql(schema, table, columns, percent, limit, is_view):
+        """
+        Random rows of a table or view: about *percent* % of them (None: unknown, the
+        rows are shuffled instead), at most *limit*. Below 1 % TABLESAMPLE SYSTEM reads
+        only the sampled pages; above, BERNOULLI picks rows uniformly in one scan.
+        Views cannot be TABLESAMPLEd and are filtered on random().
+        """
+        fields = ", ".join(QueriesPostgreSQL.quote_identifier(c) for c in columns)
+        sql    = f"SELECT {fields}\nFROM {QueriesPostgreSQL.get_qualified_name(schema, table)}"
+        if percent is None:
+            sql += "\nORDER BY random()"
+        elif percent < 100 and is_view:
+            sql += f"\nWHERE random() < {percent / 100}"
+        elif percent < 100:
+            sql += f" TABLESAMPLE {'SYSTEM' if percent < 1 else 'BERNOULLI'} ({percent})"
+        if limit:
+            sql += f"\nLIMIT {limit}"
+        return sql
+
+    @staticmethod
+    def get_profile_sql(source, columns, kinds, exact=True):
+        """
+        One aggregate row over *source*, in the layout of QueriesOracle.get_profile_sql.
+        No mode: mode() WITHIN GROUP sorts the whole column, the most frequent values
+        come from get_column_statistics_sql. COUNT(DISTINCT) (a sort too) only if *exact*.
+        """
+        expressions = ["COUNT(*)"]
+        for column, kind in zip(columns, kinds):
+            c = QueriesPostgreSQL.quote_identifier(column)
+            expressions += [
+                f"COUNT({c})",
+                "NULL" if kind == "opaque" or not exact else f"COUNT(DISTINCT {c})",
+                f"MIN({c})" if kind in ("numeric", "ordered") else "NULL",
+                f"MAX({c})" if kind in ("numeric", "ordered") else "NULL",
+                f"AVG({c})" if kind == "numeric" else "NULL",
+                "NULL",
+            ]
+        return "SELECT\n  " + ",\n  ".join(expressions) + f"\nFROM {source}"
+
+    @staticmethod
+    def get_column_statistics_sql(schema, table):
+        """
+        (column, estimated distinct count, up to 3 most common values, their frequencies)
+        from the planner statistics of ANALYZE; a negative n_distinct is a fraction of the rows.
+        """
+        return f"""
+            SELECT
+                s.attname,
+                ROUND(CASE WHEN s.n_distinct < 0 THEN -s.n_distinct * c.reltuples ELSE s.n_distinct END),
+                (s.most_common_vals::text::text[])[1:3],
+                s.most_common_freqs[1:3]
+            FROM pg_stats s
+            JOIN pg_namespace n ON n.nspname = s.schemaname
+            JOIN pg_class c     ON c.relnamespace = n.oid AND c.relname = s.tablename
+            WHERE s.schemaname = '{schema}'
+              AND s.tablename  = '{table}'
+        """
+
+    @staticmethod
+    def get_schema_columns_sql(schema):
+        """(table, then the columns of get_table_structure) of every base table column of *schema*."""
+        return f"""
+            SELECT
+                c.table_name,
+                c.column_name  AS fieldname,
+                c.data_type    AS type,
+                c.character_maximum_length AS data_length,
+                c.numeric_precision        AS data_precision,
+                c.numeric_scale            AS data_scale,
+                CASE WHEN c.is_nullable = 'YES' THEN 'Y' ELSE 'N' END AS nullable
+            FROM information_schema.columns c
+            JOIN information_schema.tables t
+                ON t.table_schema = c.table_schema
+                AND t.table_name  = c.table_name
+                AND t.table_type  = 'BASE TABLE'
+            WHERE c.table_schema = '{schema}'
+            ORDER BY c.table_name, c.ordinal_position
+        """
+
+    @staticmethod
+    def get_schema_primary_keys_sql(schema):
+        return f"""
+            SELECT
+                tc.table_name,
+                kcu.column_name
+            FROM information_schema.table_constraints tc
+            JOIN information_schema.key_column_usage kcu
+                ON tc.constraint_name = kcu.constraint_name
+                AND tc.table_schema  = kcu.table_schema
+            WHERE tc.constraint_type = 'PRIMARY KEY'
+              AND tc.table_schema = '{schema}'
+            ORDER BY tc.table_name, kcu.ordinal_position
+        """
+
+    @staticmethod
+    def get_schema_index_columns_sql(schema):
+        """(table, index, uniqueness, column) of the index columns of *schema*, primary keys excluded."""
+        return f"""
+            SELECT
+                t.relname  AS table_name,
+                i.relname  AS index_name,
+                CASE WHEN ix.indisunique THEN 'UNIQUE' ELSE 'NONUNIQUE' END AS uniqueness,
+                a.attname  AS column_name
+            FROM pg_class t
+            JOIN pg_index ix    ON t.oid = ix.indrelid
+            JOIN pg_class i     ON i.oid = ix.indexrelid
+            JOIN pg_namespace n ON t.relnamespace = n.oid
+            JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = ANY(ix.indkey)
+            WHERE n.nspname = '{schema}'
+              AND NOT ix.indisprimary
+            ORDER BY t.relname, i.relname, array_position(ix.indkey, a.attnum)
+        """
+
+    @staticmethod
+    def get_schema_view_queries_sql(schema):
+        return f"""
+            SELECT table_name, view_definition AS text
+            FROM information_schema.views
+            WHERE table_schema = '{schema}'
+        """
+
+    @staticmethod
+    def get_schema_routine_sources_sql(schema):
+        # Overloads share a name: their definitions are concatenated, in a stable order
+        return f"""
+            SELECT
+                LOWER(routine_type),
+                routine_name,
+                routine_definition AS text
+            FROM information_schema.routines
+            WHERE routine_schema = '{schema}'
+              AND routine_type IN ('PROCEDURE', 'FUNCTION')
+            ORDER BY routine_name, specific_name
+        """
+
+    @staticmethod
+    def savepoint_sql(name):
+        return f"SAVEPOINT {name}"
+
+    @staticmethod
+    def rollback_to_savepoint_sql(name):
+        return f"ROLLBACK TO SAVEPOINT {name}"
+
+    @staticmethod
+    def release_savepoint_sql(name):
+        return f"RELEASE SAVEPOINT {name}"
+
+    @staticmethod
+    def statement_timeout_sql():
+        """
+        Server-side limit of the following statements of the current transaction only
+        (set_config(..., true) is SET LOCAL), bound to one value in milliseconds.
+        Returns the setting it replaces.
+        """
+        return "SELECT current_setting('statement_timeout'), set_config('statement_timeout', %s, true)"
+
 # ======================================================================
 # MICROSOFT SQL SERVER QUERIES
 # ======================================================================
@@ -1754,6 +2667,284 @@ class QueriesMSSQL(Queries):
     def limit_results_to(limit_value):
         return  f"SELECT TOP({limit_value})"
 
+    @staticmethod
+    def quote_identifier(name):
+        return "[" + str(name).replace("]", "]]") + "]"
+
+    @staticmethod
+    def get_qualified_name(schema, table):
+        return f"{QueriesMSSQL.quote_identifier(schema)}.{QueriesMSSQL.quote_identifier(table)}"
+
+    @staticmethod
+    def get_key_bounds_sql(schema, table, key_column):
+        return f"SELECT MIN({QueriesMSSQL.quote_identifier(key_column)}), MAX({QueriesMSSQL.quote_identifier(key_column)}) FROM {QueriesMSSQL.get_qualified_name(schema, table)}"
+
+    @staticmethod
+    def get_physical_bounds_sql(schema, table):
+        return None
+
+    @staticmethod
+    def get_physical_range_predicate(low, high):
+        return None
+
+    @staticmethod
+    def get_hash_partition_predicate(index, count):
+        return f"ABS(CAST(BINARY_CHECKSUM(*) AS BIGINT)) % {count} = {index}"
+
+    @staticmethod
+    def get_column_type_sql(category, length, precision, scale):
+        """SQL Server column type for a generic category (see ColumnTypeMapper.category)."""
+        if category == "integer":
+            return "INT" if precision and precision <= 9 else "BIGINT"
+        if category == "decimal":
+            return f"DECIMAL({precision},{scale or 0})" if precision and precision <= 38 else "FLOAT"
+        if category == "float":
+            return "FLOAT"
+        if category == "boolean":
+            return "BIT"
+        if category == "date":
+            return "DATE"
+        if category == "timestamp":
+            return "DATETIME2"
+        if category == "time":
+            return "TIME"
+        if category == "binary":
+            return "VARBINARY(MAX)"
+        return f"NVARCHAR({length})" if length and 0 < length <= 4000 else "NVARCHAR(MAX)"
+
+    @staticmethod
+    def get_create_table_sql(schema, table, column_definitions):
+        """column_definitions: (name, type_sql, nullable) tuples."""
+        columns = ",\n  ".join(
+            f"{QueriesMSSQL.quote_identifier(name)} {type_sql}{'' if nullable else ' NOT NULL'}"
+            for name, type_sql, nullable in column_definitions
+        )
+        return f"CREATE TABLE {QueriesMSSQL.get_qualified_name(schema, table)} (\n  {columns}\n)"
+
+    @staticmethod
+    def get_range_checksum_sql(schema, table, columns, predicate, lob_columns=()):
+        """COUNT_BIG(*) and the sum of the first 48 bits of the MD5 HASHBYTES of each row (rows of *predicate*)."""
+        row_text = ", '|', ".join(QueriesMSSQL.quote_identifier(column) for column in columns)
+        row_hash = f"HASHBYTES('MD5', CONCAT({row_text}, ''))"
+        return (f"SELECT COUNT_BIG(*), SUM(CAST(CAST(SUBSTRING({row_hash}, 1, 6) AS BIGINT) AS DECIMAL(38, 0))) "
+                f"FROM {QueriesMSSQL.get_qualified_name(schema, table)} WHERE {predicate}")
+
+    @staticmethod
+    def get_create_index_sql(schema, table, index, columns, unique):
+        column_list = ", ".join(QueriesMSSQL.quote_identifier(column) for column in columns)
+        return (f"CREATE {'UNIQUE ' if unique else ''}INDEX {QueriesMSSQL.quote_identifier(index)} "
+                f"ON {QueriesMSSQL.get_qualified_name(schema, table)} ({column_list})")
+
+    @staticmethod
+    def get_estimated_row_counts_sql(schema):
+        """(table name, row count) of every table of *schema* from the heap or clustered index partitions."""
+        return f"""
+            SELECT t.name, SUM(p.rows)
+            FROM sys.tables t
+            JOIN sys.schemas s    ON t.schema_id = s.schema_id
+            JOIN sys.partitions p ON p.object_id = t.object_id
+                                 AND p.index_id IN (0, 1)
+            WHERE s.name = '{schema}'
+            GROUP BY t.name
+        """
+
+    @staticmethod
+    def get_table_sizes_sql(schema):
+        """(table name, rows, reserved bytes of the table and its indexes) from sys.dm_db_partition_stats."""
+        return f"""
+            SELECT t.name,
+                   SUM(CASE WHEN ps.index_id IN (0, 1) THEN ps.row_count ELSE 0 END),
+                   SUM(ps.reserved_page_count) * 8192
+            FROM sys.tables t
+            JOIN sys.schemas s                ON t.schema_id  = s.schema_id
+            JOIN sys.dm_db_partition_stats ps ON ps.object_id = t.object_id
+            WHERE s.name = '{schema}'
+            GROUP BY t.name
+        """
+
+    @staticmethod
+    def get_current_schema_sql():
+        """Default schema of the database user."""
+        return "SELECT SCHEMA_NAME()"
+
+    @staticmethod
+    def get_keyset_page_sql(schema, table, columns, key_columns, predicate, descending, limit):
+        """TOP (*limit*) rows matching *predicate* in primary key order (descending to read backwards)."""
+        q         = QueriesMSSQL.quote_identifier
+        direction = " DESC" if descending else ""
+        where     = f"\nWHERE {predicate}" if predicate else ""
+        return (f"SELECT TOP ({limit}) {', '.join(q(c) for c in columns)}\nFROM {QueriesMSSQL.get_qualified_name(schema, table)}{where}\n"
+                f"ORDER BY {', '.join(q(c) + direction for c in key_columns)}")
+
+    @staticmethod
+    def get_keyset_predicate_sql(key_columns, operator, bind):
+        """
+        Rows after (operator '>') or before ('<') a key in key order. No row-value
+        comparison here: k1 >= ? AND (k1 > ? OR (k1 = ? AND k2 > ?) ...), the leading
+        bound letting the optimizer seek in the key index. bind(i) returns the
+        placeholder of key value i, called once per occurrence.
+        """
+        q            = QueriesMSSQL.quote_identifier
+        quoted       = [q(c) for c in key_columns]
+        leading      = f"{quoted[0]} {operator}= {bind(0)} AND " if len(quoted) > 1 else ""  # bound first: text order
+        alternatives = []
+        for i in range(len(quoted)):
+            terms = [f"{quoted[j]} = {bind(j)}" for j in range(i)]
+            terms.append(f"{quoted[i]} {operator} {bind(i)}")
+            alternatives.append("(" + " AND ".join(terms) + ")")
+        if len(quoted) == 1:
+            return alternatives[0]
+        return f"{leading}({' OR '.join(alternatives)})"
+
+    @staticmethod
+    def get_sample_sql(schema, table, columns, percent, limit, is_view):
+        """
+        Random rows of a table or view: about *percent* % of them (None: unknown, the
+        rows are shuffled instead), at most *limit*. TABLESAMPLE reads whole pages;
+        views cannot be sampled and keep each row on a random checksum.
+        """
+        fields = ", ".join(QueriesMSSQL.quote_identifier(c) for c in columns)
+        top    = f"TOP ({limit}) " if limit else ""
+        sql    = f"SELECT {top}{fields}\nFROM {QueriesMSSQL.get_qualified_name(schema, table)}"
+        if percent is None:
+            sql += "\nORDER BY NEWID()"
+        elif percent < 100 and is_view:
+            sql += f"\nWHERE ABS(CHECKSUM(NEWID())) % 1000000 < {int(percent * 10000)}"
+        elif percent < 100:
+            sql += f" TABLESAMPLE SYSTEM ({percent} PERCENT)"
+        return sql
+
+    @staticmethod
+    def get_profile_sql(source, columns, kinds, exact=True):
+        """
+        One aggregate row over *source*, in the layout of QueriesOracle.get_profile_sql.
+        AVG is taken on FLOAT (integer columns would average to an integer) and there is
+        no mode aggregate. COUNT(DISTINCT) is exact (APPROX_COUNT_DISTINCT needs 2019),
+        so it is only taken if *exact*.
+        """
+        expressions = ["COUNT(*)"]
+        for column, kind in zip(columns, kinds):
+            c = QueriesMSSQL.quote_identifier(column)
+            expressions += [
+                f"COUNT({c})",
+                "NULL" if kind == "opaque" or not exact else f"COUNT(DISTINCT {c})",
+                f"MIN({c})" if kind in ("numeric", "ordered") else "NULL",
+                f"MAX({c})" if kind in ("numeric", "ordered") else "NULL",
+                f"AVG(CAST({c} AS FLOAT))" if kind == "numeric" else "NULL",
+                "NULL",
+            ]
+        return "SELECT\n  " + ",\n  ".join(expressions) + f"\nFROM {source}"
+
+    @staticmethod
+    def get_column_statistics_sql(schema, table):
+        """None: the statistics histograms are only read per statistic, with DBCC SHOW_STATISTICS."""
+        return None
+
+    @staticmethod
+    def get_schema_columns_sql(schema):
+        return f"""
+            SELECT
+                t.name                   AS table_name,
+                c.name                   AS fieldname,
+                tp.name                  AS type,
+                c.max_length             AS data_length,
+                c.precision              AS data_precision,
+                c.scale                  AS data_scale,
+                CASE WHEN c.is_nullable = 1 THEN 'Y' ELSE 'N' END AS nullable
+            FROM sys.columns c
+            JOIN sys.types tp   ON c.user_type_id  = tp.user_type_id
+            JOIN sys.tables t   ON c.object_id      = t.object_id
+            JOIN sys.schemas s  ON t.schema_id      = s.schema_id
+            WHERE s.name = '{schema}'
+            ORDER BY t.name, c.column_id
+        """
+
+    @staticmethod
+    def get_schema_primary_keys_sql(schema):
+        return f"""
+            SELECT
+                t.name AS table_name,
+                c.name AS column_name
+            FROM sys.tables t
+            JOIN sys.schemas s     ON t.schema_id             = s.schema_id
+            JOIN sys.key_constraints kc
+                                   ON kc.parent_object_id     = t.object_id
+                                  AND kc.type                 = 'PK'
+            JOIN sys.index_columns ic
+                                   ON ic.object_id            = kc.parent_object_id
+                                  AND ic.index_id             = kc.unique_index_id
+            JOIN sys.columns c     ON c.object_id             = ic.object_id
+                                  AND c.column_id             = ic.column_id
+            WHERE s.name = '{schema}'
+            ORDER BY t.name, ic.key_ordinal
+        """
+
+    @staticmethod
+    def get_schema_index_columns_sql(schema):
+        """(table, index, uniqueness, column) of the index columns of *schema*, without primary keys and heaps."""
+        return f"""
+            SELECT
+                t.name                                                          AS table_name,
+                i.name                                                          AS index_name,
+                CASE WHEN i.is_unique = 1 THEN 'UNIQUE' ELSE 'NONUNIQUE' END   AS uniqueness,
+                c.name                                                          AS column_name
+            FROM sys.indexes i
+            JOIN sys.tables t   ON i.object_id   = t.object_id
+            JOIN sys.schemas s  ON t.schema_id   = s.schema_id
+            JOIN sys.index_columns ic
+                                ON i.object_id   = ic.object_id
+                               AND i.index_id    = ic.index_id
+            JOIN sys.columns c  ON ic.object_id  = c.object_id
+                               AND ic.column_id  = c.column_id
+            WHERE s.name = '{schema}'
+              AND i.is_primary_key = 0
+              AND i.type > 0
+            ORDER BY t.name, i.name, ic.key_ordinal
+        """
+
+    @staticmethod
+    def get_schema_view_queries_sql(schema):
+        return f"""
+            SELECT v.name, sm.definition AS text
+            FROM sys.sql_modules sm
+            JOIN sys.views v   ON sm.object_id = v.object_id
+            JOIN sys.schemas s ON v.schema_id  = s.schema_id
+            WHERE s.name = '{schema}'
+        """
+
+    @staticmethod
+    def get_schema_routine_sources_sql(schema):
+        return f"""
+            SELECT
+                CASE WHEN o.type = 'P' THEN 'procedure' ELSE 'function' END,
+                o.name,
+                sm.definition AS text
+            FROM sys.sql_modules sm
+            JOIN sys.objects o  ON sm.object_id = o.object_id
+            JOIN sys.schemas s  ON o.schema_id  = s.schema_id
+            WHERE s.name = '{schema}'
+              AND o.type IN ('P', 'FN', 'IF', 'TF')
+            ORDER BY o.name
+        """
+
+    @staticmethod
+    def savepoint_sql(name):
+        return f"SAVE TRANSACTION {name}"
+
+    @staticmethod
+    def rollback_to_savepoint_sql(name):
+        return f"ROLLBACK TRANSACTION {name}"
+
+    @staticmethod
+    def release_savepoint_sql(name):
+        # SQL Server savepoints cannot be released; they end with the transaction
+        return None
+
+    @staticmethod
+    def statement_timeout_sql():
+        # The ODBC query timeout of the connection bounds statements (SET LOCK_TIMEOUT only covers lock waits)
+        return None
+
 # ======================================================================
 # QUERY MANAGER
 # ======================================================================
@@ -1763,9 +2954,45 @@ class QueryManager:
     Executes SQL and dispatches results to the UI.
     """
 
+    # Savepoint guarding each statement inside a pending PostgreSQL transaction
+    STATEMENT_SAVEPOINT = "dbexp_stmt"
+    # Savepoint guarding each executemany chunk in manual transaction mode
+    BATCH_SAVEPOINT     = "dbexp_batch"
+    # Savepoint guarding a file import in manual transaction mode
+    IMPORT_SAVEPOINT    = "dbexp_import"
+
+    # Bind placeholder style expected by each driver
+    PARAMSTYLES = {
+        "PostgreSQL": "format",   # psycopg2: %s
+        "OracleDB":   "numeric",  # python-oracledb: :1, :2 ...
+        "Oracle":     "qmark",    # pyodbc
+        "MSSQL":      "qmark",    # pyodbc
+        "SQLite":     "qmark",
+    }
+
+    # Characters (bytes) up to which an oracledb LOB is read with the rows when fetch_lobs_inline
+    LOB_INLINE_SIZE = 32 * 1024
+
+    # Limits of the statements run from the editor, 0 meaning none:
+    # timeout in seconds, max_rows fetched, max_bytes fetched (estimated from the values)
+    DEFAULT_LIMITS = {"timeout": 0, "max_rows": 0, "max_bytes": 0}
+
+    FETCH_CHUNK = 1000               # rows per fetchmany() while a row/size limit is checked
+    SQLITE_PROGRESS_STEPS = 10000    # SQLite VM instructions between two timeout checks
+    PG_TRANSACTION_INTRANS = 2       # psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
     def __init__(self, db_connection, panel_query_result):
         self.db_connection = db_connection
         self.panel_query_result = panel_query_result
+        self.dml_batch_size = 1000  # rows per executemany call / commit in scripts
+        self.auto_commit    = True  # False: statements accumulate until commit()/rollback()
+        self.transaction_pending = False
+        self.on_transaction_state_change = None  # callback(pending: bool)
+        self.metadata_cache = MetadataCache()  # catalog query results of the current connection
+        self.fetch_lobs_inline = False # oracledb: LOBs up to LOB_INLINE_SIZE are read with the rows, not on opening
+        self.query_limits      = dict(self.DEFAULT_LIMITS)  # limits of every connection
+        self.connection_limits = {}    # connection name -> limits replacing query_limits for it
+        self.connection_name   = None  # name of the current connection, set on connect
 
     def _clean_sql(self, sql: str) -> str:
         """
@@ -1805,56 +3032,485 @@ class QueryManager:
         return sql
 
     def cursor_execute(self, sql: str, cursor):
-        try:
-            cursor.execute(sql)
-        except Exception as e:
-            # If we get a transaction error, try to rollback
-            if "current transaction is aborted" in str(e):
-                self.db_connection.current_connection.rollback()
-                # Try executing again after rollback
-                cursor.execute(sql)
-            else:
-                raise
-
+        self.run_guarded(lambda: cursor.execute(sql))
+        if SQLScript.is_ddl(sql):
+            self.metadata_cache.clear()
         return cursor
-        
 
-    def execute_query(self, sql: str) -> Dict[str, Any]:
+    def fetch_metadata(self, sql: str):
+        """
+        (column names, rows) of the catalog query *sql*: from the metadata cache, which
+        the background prefetch fills, or run on the current connection and cached.
+        """
+        cached = self.metadata_cache.get(sql)
+        if cached is None:
+            cursor = self.cursor_execute(sql, self.db_connection.current_connection.cursor())
+            columns = [description[0] for description in cursor.description or ()]
+            self.metadata_cache.put(sql, columns, cursor.fetchall())
+            cursor.close()
+            cached = self.metadata_cache.get(sql)
+        return cached
+
+    def get_column_names(self, schema: str, table: str) -> List[str]:
+        """Column names of a table or view, in their order, from the metadata cache."""
+        queries = self.db_connection.get_queries_instance(self.db_connection.current_connection)
+        _, rows = self.fetch_metadata(queries.get_col_names(schema, table))
+        return queries.extract_col_names(rows)
+
+    def run_guarded(self, action):
+        """
+        Run *action*, a callable using the current connection, and return its result.
+        A failed statement aborts the whole transaction on PostgreSQL. When work
+        is pending, the action runs inside a savepoint so that only the failed
+        statement is undone; otherwise the aborted transaction is rolled back
+        right away so that the session stays usable.
+        """
+        if self.db_connection.get_connection_type() != "PostgreSQL":
+            return action()
+
+        connection = self.db_connection.current_connection
+        if not self.transaction_pending:
+            try:
+                return action()
+            except Exception:
+                connection.rollback()
+                raise
+
+        queries = self.db_connection.get_queries_instance(connection)
+        cursor  = connection.cursor()
+        try:
+            cursor.execute(queries.savepoint_sql(self.STATEMENT_SAVEPOINT))
+            try:
+                result = action()
+            except Exception:
+                cursor.execute(queries.rollback_to_savepoint_sql(self.STATEMENT_SAVEPOINT))
+                raise
+            cursor.execute(queries.release_savepoint_sql(self.STATEMENT_SAVEPOINT))
+            return result
+        finally:
+            cursor.close()
+
+    # ------------------------------------------------------------------
+    # Timeouts and fetch limits
+    # ------------------------------------------------------------------
+
+    def limits_for(self, limits: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Limits of a statement on the current connection: the defaults, replaced by
+        those of the connection if any, then by the *limits* of this execution.
+        """
+        result = dict(self.DEFAULT_LIMITS)
+        result.update(self.connection_limits.get(self.connection_name) or self.query_limits)
+        result.update({key: value for key, value in (limits or {}).items() if value is not None})
+        return result
+
+    def _apply_timeout(self, connection, conn_type, timeout):
+        """
+        Bound the statements run next on *connection* to *timeout* seconds (0: no
+        bound) with the mechanism of its driver. Returns the callable restoring
+        the connection once the statement and its fetch are done.
+        """
+        if conn_type == "SQLite":
+            if not timeout:
+                return lambda: None
+            deadline = time.monotonic() + timeout
+            # A non-zero return interrupts the statement (sqlite3.OperationalError: interrupted)
+            connection.set_progress_handler(lambda: time.monotonic() > deadline, self.SQLITE_PROGRESS_STEPS)
+            return lambda: connection.set_progress_handler(None, self.SQLITE_PROGRESS_STEPS)
+        if conn_type == "OracleDB":
+            connection.call_timeout = int(timeout * 1000)  # milliseconds, per round trip
+            return lambda: setattr(connection, "call_timeout", 0)
+        if conn_type in ("Oracle", "MSSQL"):
+            connection.timeout = max(1, round(timeout)) if timeout else 0  # pyodbc: seconds, for new cursors
+            return lambda: setattr(connection, "timeout", 0)
+        if conn_type == "PostgreSQL" and timeout:
+            # Local to the transaction: a commit or rollback ends it, and statements
+            # without a timeout pay no round trip
+            sql    = self.db_connection.get_queries_instance(connection).statement_timeout_sql()
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql, (str(int(timeout * 1000)),))
+                previous = cursor.fetchone()[0]
+            finally:
+                cursor.close()
+
+            def restore():
+                # Still in the transaction (a query, a manual transaction): put back the
+                # previous setting. An aborted one cannot run it, and its rollback will.
+                if connection.get_transaction_status() != self.PG_TRANSACTION_INTRANS:
+                    return
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(sql, (previous,))
+                finally:
+                    cursor.close()
+            return restore
+        return lambda: None
+
+    def apply_timeout(self, connection, limits: Dict[str, Any] = None):
+        """
+        Bound the statements run next on *connection*, a connection of the current type
+        used outside execute_query (exports), by the timeout of limits_for(*limits*).
+        Returns (timeout, the callable restoring the connection).
+        """
+        timeout = self.limits_for(limits)["timeout"]
+        return timeout, self._apply_timeout(connection, self.db_connection.get_connection_type(), timeout)
+
+    # Driver error codes of a statement cancelled by its timeout: oracledb call timeout
+    # (thick and thin modes), ODBC timeout expired
+    TIMEOUT_ERROR_CODES = {"DPI-1067", "DPY-4024", "HYT00"}
+
+    @classmethod
+    def is_timeout(cls, error) -> bool:
+        """
+        Whether *error* cancelled a statement at its timeout, from the driver error
+        rather than the elapsed time: sqlite3 "interrupted" (progress handler),
+        psycopg2 QueryCanceled (SQLSTATE 57014), oracledb DPI-1067/DPY-4024, ODBC HYT00.
+        """
+        if getattr(error, "pgcode", None) == "57014":
+            return True
+        args = getattr(error, "args", ())
+        if args and getattr(args[0], "full_code", None) in cls.TIMEOUT_ERROR_CODES:  # oracledb _Error
+            return True
+        if args and isinstance(args[0], str) and args[0] in cls.TIMEOUT_ERROR_CODES:   # pyodbc (sqlstate, message)
+            return True
+        text = str(error)
+        return text == "interrupted" or text.split(":", 1)[0] in cls.TIMEOUT_ERROR_CODES
+
+    @staticmethod
+    def timeout_message(timeout, error) -> str:
+        return f"Query cancelled: it ran longer than the {timeout:g} s timeout.\n\n{error}"
+
+    @staticmethod
+    def estimate_size(rows) -> int:
+        """Approximate memory of fetched *rows*: text and binary lengths, 8 bytes per other value."""
+        return sum(len(value) if isinstance(value, (str, bytes, bytearray)) else 8 for row in rows for value in row)
+
+    def fetch_limited(self, cursor, max_rows=0, max_bytes=0) -> Tuple[List[Tuple], str]:
+        """
+        Rows of *cursor*, stopping after *max_rows* rows or about *max_bytes* bytes
+        (0: no limit). Returns (rows, None) when the whole result was read, else the
+        rows kept and the reason of the stop.
+        """
+        if not max_rows and not max_bytes:
+            return cursor.fetchall(), None
+        rows, size = [], 0
+        while True:
+            # One row past the limit tells whether the result goes on
+            count = self.FETCH_CHUNK if not max_rows else min(self.FETCH_CHUNK, max_rows + 1 - len(rows))
+            chunk = cursor.fetchmany(count)
+            if not chunk:
+                return rows, None
+            rows.extend(chunk)
+            if max_rows and len(rows) > max_rows:
+                del rows[max_rows:]
+                return rows, f"stopped at the limit of {max_rows:,} rows".replace(",", "'")
+            if max_bytes:
+                size += self.estimate_size(chunk)
+                if size > max_bytes:
+                    return rows, f"stopped at the limit of {max_bytes / 1048576:g} MB ({len(rows):,} rows)".replace(",", "'")
+
+    def execute_query(self, sql: str, limits: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Run *sql* on the current connection within the limits of the connection,
+        or *limits* for this execution (see limits_for). A result cut at a fetch limit
+        carries the reason in "truncated"; a statement cancelled by the timeout fails
+        with an error saying so.
+        """
+        limits     = self.limits_for(limits)
+        timeout    = limits["timeout"]
+        connection = self.db_connection.current_connection
+        conn_type  = self.db_connection.get_connection_type()
         try:
             sql = self._clean_sql(sql)
-            cursor = self.db_connection.current_connection.cursor()
+            restore = self._apply_timeout(connection, conn_type, timeout)
+            try:
+                cursor = connection.cursor()
+                self.cursor_execute(sql, cursor)
+
+                if cursor.description:
+                    columns = [d[0] for d in cursor.description]
+                    rows, truncated = self.fetch_limited(cursor, limits["max_rows"], limits["max_bytes"])
+                    rows = LobValue.wrap_rows(rows, cursor.description,
+                                              inline_size=self.LOB_INLINE_SIZE if self.fetch_lobs_inline else 0)
+                    result = {
+                        "success": True,
+                        "columns": columns,
+                        "rows": rows,
+                        "description": cursor.description,
+                        "rowcount": len(rows),
+                    }
+                    if truncated:
+                        cursor.close()  # discard the rows not read
+                        result["truncated"] = truncated
+                    return result
+                else:
+                    self.commit_statement()
+                    return {
+                        "success": True,
+                        "message": f"Query executed successfully ({cursor.rowcount} row(s))",
+                    }
+            finally:
+                restore()
+
+        except Exception as e:
+            if timeout and self.is_timeout(e):
+                return {"success": False, "timeout": True, "error": self.timeout_message(timeout, e)}
+            return {"success": False, "error": str(e)}
+
+    # ------------------------------------------------------------------
+    # Transaction control
+    # ------------------------------------------------------------------
+
+    def _set_transaction_pending(self, pending: bool):
+        if pending != self.transaction_pending:
+            self.transaction_pending = pending
+            if self.on_transaction_state_change:
+                self.on_transaction_state_change(pending)
+
+    def commit_statement(self):
+        """
+        Call after a data-modifying statement: commits in auto-commit mode,
+        otherwise only records that the transaction has pending work.
+        """
+        if self.auto_commit:
+            self.db_connection.current_connection.commit()
+        else:
+            self._set_transaction_pending(True)
 
+    def rollback_statement(self):
+        """
+        Call after a data-modifying statement failed: rolls back in auto-commit
+        mode, otherwise keeps the pending work of the transaction untouched.
+        """
+        if self.auto_commit:
+            self.db_connection.current_connection.rollback()
+
+    def begin_guarded(self, name) -> bool:
+        """
+        Before a multi-statement operation on the current connection (a file import):
+        take savepoint *name* if a manual transaction has pending work, the only work
+        that a full rollback would lose. Returns whether it was taken.
+        """
+        if self.auto_commit or not self.transaction_pending:
+            return False
+        connection = self.db_connection.current_connection
+        cursor     = connection.cursor()
+        try:
+            cursor.execute(self.db_connection.get_queries_instance(connection).savepoint_sql(name))
+        finally:
+            cursor.close()
+        return True
+
+    def end_guarded(self, name, guarded, success):
+        """
+        After the operation of begin_guarded(): on success commit it (auto-commit) or
+        keep it pending; on failure undo it - back to savepoint *name* when *guarded*,
+        otherwise entirely, which loses nothing else.
+        """
+        connection = self.db_connection.current_connection
+        queries    = self.db_connection.get_queries_instance(connection)
+        sql        = queries.release_savepoint_sql(name) if success else queries.rollback_to_savepoint_sql(name)
+        if guarded and sql:
+            cursor = connection.cursor()
             try:
                 cursor.execute(sql)
-            except Exception as e:
-                # If we get a transaction error, try to rollback
-                if "current transaction is aborted" in str(e):
-                    self.db_connection.current_connection.rollback()
-                    # Try executing again after rollback
-                    cursor.execute(sql)
-                else:
-                    raise
-
-            if cursor.description:
-                columns = [d[0] for d in cursor.description]
-                rows = cursor.fetchall()
-                return {
-                    "success": True,
-                    "columns": columns,
-                    "rows": rows,
-                    "description": cursor.description,
-                    "rowcount": len(rows),
-                }
-            else:
-                self.db_connection.current_connection.commit()
-                return {
-                    "success": True,
-                    "message": f"Query executed successfully ({cursor.rowcount} row(s))",
-                }
+            finally:
+                cursor.close()
+        if success:
+            self.commit_statement()
+        elif not guarded:
+            connection.rollback()
+
+    def set_auto_commit(self, enabled: bool):
+        """
+        Switch between auto-commit (commit after every statement) and manual
+        mode. Switching back to auto-commit commits any pending work.
+        """
+        if enabled and self.transaction_pending:
+            result = self.commit()
+            if not result["success"]:
+                return result
+        self.auto_commit = enabled
+        return {"success": True}
+
+    def commit(self) -> Dict[str, Any]:
+        try:
+            self.db_connection.current_connection.commit()
+            self._set_transaction_pending(False)
+            return {"success": True, "message": "Transaction committed"}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
 
+    def rollback(self) -> Dict[str, Any]:
+        try:
+            self.db_connection.current_connection.rollback()
+            self._set_transaction_pending(False)
+            return {"success": True, "message": "Transaction rolled back"}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    def reset_transaction_state(self):
+        """Forget pending work, e.g. after the connection was closed or replaced."""
+        self._set_transaction_pending(False)
+
+    def execute_script(self, sql: str, limits: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Execute a multi-statement script.
+        Runs of structurally identical INSERT/UPDATE statements are sent as one
+        parameterised batch and committed every dml_batch_size rows; every other
+        statement goes through execute_query. Stops at the first failing statement.
+        The result of the last statement returning rows is kept for display.
+        *limits* apply to each statement, as in execute_query.
+        """
+        statements = SQLScript.split_statements(sql)
+        if len(statements) <= 1:
+            return self.execute_query(sql, limits)
+
+        executed     = 0
+        batched      = 0
+        last_rows    = None
+        for kind, item in SQLScript.group_statements(statements):
+            if kind == 'batch':
+                result = self.execute_dml_batch(item, limits)
+                if not result["success"]:
+                    failed_at = executed + result.get("failed_index", 0) + 1
+                    return {"success": False, "error": f"Statement {failed_at} failed:\n{result['error']}"}
+                executed += len(item.rows)
+                batched  += len(item.rows)
+            else:
+                result = self.execute_query(item, limits)
+                if not result["success"]:
+                    return {"success": False, "error": f"Statement {executed + 1} failed:\n{result['error']}"}
+                executed += 1
+                if "columns" in result:
+                    last_rows = result
+
+        if last_rows:
+            return last_rows
+
+        message = f"Script executed successfully ({executed} statement(s)"
+        if batched:
+            message += f", {batched} sent as batched DML"
+        return {"success": True, "message": message + ")"}
+
+    def execute_dml_batch(self, batch: DMLBatch, limits: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Execute a DMLBatch with the fastest bulk path of the current driver,
+        committing every dml_batch_size rows (auto-commit mode only). If a chunk
+        fails it is rolled back - to a savepoint in manual mode - and replayed
+        statement by statement, in one transaction undone again at the failing
+        statement, to report the exact failing row without keeping the rows before it.
+        Each chunk, with its replay, is bounded by the timeout of *limits* (see
+        limits_for); a chunk cancelled by it is not replayed.
+        """
+        connection = self.db_connection.current_connection
+        conn_type  = self.db_connection.get_connection_type()
+        queries    = self.db_connection.get_queries_instance(connection)
+        sql        = batch.parameterized_sql(self.PARAMSTYLES.get(conn_type, "qmark"))
+        rows       = batch.rows
+        if conn_type == "SQLite":
+            # sqlite3 cannot bind Decimal; a REAL is what the literal would have produced
+            rows = [tuple(float(v) if isinstance(v, Decimal) else v for v in row) for row in rows]
+
+        timeout = self.limits_for(limits)["timeout"]
+        size    = max(1, int(self.dml_batch_size))
+        for start in range(0, len(rows), size):
+            chunk   = rows[start:start + size]
+            restore = self._apply_timeout(connection, conn_type, timeout)
+            cursor  = connection.cursor()
+            # Only pending work needs protecting; otherwise a full rollback loses nothing
+            guarded = not self.auto_commit and self.transaction_pending
+            try:
+                if guarded:
+                    cursor.execute(queries.savepoint_sql(self.BATCH_SAVEPOINT))
+                self._executemany(cursor, conn_type, batch, sql, chunk)
+                if self.auto_commit:
+                    connection.commit()
+                else:
+                    release_sql = queries.release_savepoint_sql(self.BATCH_SAVEPOINT)
+                    if guarded and release_sql:
+                        cursor.execute(release_sql)
+                    self._set_transaction_pending(True)
+            except Exception as e:
+                try:
+                    if guarded:
+                        cursor.execute(queries.rollback_to_savepoint_sql(self.BATCH_SAVEPOINT))
+                    else:
+                        connection.rollback()
+                except Exception:
+                    pass
+                if timeout and self.is_timeout(e):
+                    return {"success": False, "timeout": True, "error": self.timeout_message(timeout, e),
+                            "failed_index": start}
+                failure = self._replay_chunk(connection, queries, batch.statements[start:start + size], guarded)
+                if failure:
+                    offset, error = failure
+                    return {"success": False, "error": error, "failed_index": start + offset}
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+                restore()
+
+        return {"success": True, "message": f"Batch executed successfully ({len(rows)} row(s))"}
+
+    def _replay_chunk(self, connection, queries, statements, guarded):
+        """
+        Run the *statements* of a failed chunk one at a time, as one unit: at the
+        first failure everything the replay did is rolled back (to the batch
+        savepoint when *guarded*) and (offset, error) is returned. If they all
+        succeed, the chunk is committed or kept pending like a bulk chunk.
+        """
+        cursor = connection.cursor()
+        try:
+            if guarded:
+                cursor.execute(queries.savepoint_sql(self.BATCH_SAVEPOINT))
+            for offset, statement in enumerate(statements):
+                try:
+                    cursor.execute(self._clean_sql(statement))
+                except Exception as e:
+                    try:
+                        if guarded:
+                            cursor.execute(queries.rollback_to_savepoint_sql(self.BATCH_SAVEPOINT))
+                        else:
+                            connection.rollback()
+                    except Exception:
+                        pass
+                    return offset, str(e)
+            if self.auto_commit:
+                connection.commit()
+            else:
+                release_sql = queries.release_savepoint_sql(self.BATCH_SAVEPOINT)
+                if guarded and release_sql:
+                    cursor.execute(release_sql)
+                self._set_transaction_pending(True)
+            return None
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    def _executemany(self, cursor, conn_type, batch, sql, rows):
+        """Send *rows* for the parameterised *sql* using the driver's bulk API."""
+        if conn_type == "PostgreSQL":
+            from psycopg2 import extras
+            values = batch.values_clause(sql)
+            if values:
+                # Multi-row VALUES: one statement per page instead of one per row
+                prefix, row_template = values
+                extras.execute_values(cursor, prefix + "%s", rows, template=row_template, page_size=len(rows))
+            else:
+                extras.execute_batch(cursor, sql, rows, page_size=len(rows))
+        elif conn_type == "MSSQL":
+            cursor.fast_executemany = True
+            cursor.executemany(sql, rows)
+        else:
+            # oracledb binds the whole list as array DML; sqlite3/pyodbc loop natively
+            cursor.executemany(sql, rows)
+
     # def run_query(self, sql: str):
     #     result = self.execute_query(sql)
 
@@ -0,0 +1,678 @@
+"""
+ResultStore.py - Client-side processing of query results already fetched
+
+This module works on the rows kept in PanelSQLQueryEditor.tab_results, without
+going back to the database server:
+- ResultStore: typed rows of the result grid with client-side sorting, filtering
+  and aggregates of a selection
+- ResultDiff: comparison of two results aligned on key columns, by streamed row hashes
+- LocalResultDatabase: in-memory SQLite database exposing the last result of each
+  SQL tab as a table (tab_1, tab_2, ...) for local SELECTs across tabs and connections
+- LobValue: placeholder of a large cell (LOB locator, long text, bytes) shown by its
+  size and first characters, its content being read on demand
+"""
+
+import math
+import re
+from hashlib import blake2b
+import sqlite3
+from datetime import date, datetime, time
+from decimal  import Decimal, localcontext
+from operator import itemgetter
+from typing   import Any, Dict, Iterable, List, Sequence, Tuple
+
+
+class LobValue:
+    """
+    A large value of a result cell. The grid shows its kind, size and first
+    characters (bytes as hex); load() returns the whole content. Values fetched
+    inline are kept as they are; of an oracledb LOB locator only the size and the
+    first characters are read with the rows, the content on the first load().
+    """
+    __slots__ = ("kind", "_content", "_locator", "_size", "_head")
+
+    INLINE_LIMIT = 1000  # characters (bytes) up to which a text (binary) value stays a plain value
+    PREVIEW      = 80    # characters (bytes) shown in the grid
+
+    # Type codes of cursor.description columns holding LOBs: oracledb type names and
+    # psycopg2 type OIDs (bytea, text, json, xml, varchar, jsonb)
+    LOB_TYPE_NAMES = {"DB_TYPE_CLOB", "DB_TYPE_NCLOB", "DB_TYPE_BLOB", "DB_TYPE_BFILE",
+                      "DB_TYPE_LONG", "DB_TYPE_LONG_NVARCHAR", "DB_TYPE_LONG_RAW"}
+    LOB_TYPE_OIDS  = {17, 25, 114, 142, 1043, 3802}
+    # Sized text and binary types, large only when declared longer than the inline limit
+    SIZED_TYPE_NAMES = {"DB_TYPE_VARCHAR", "DB_TYPE_NVARCHAR", "DB_TYPE_CHAR", "DB_TYPE_NCHAR", "DB_TYPE_RAW"}
+
+    def __init__(self, kind, content=None, locator=None):
+        self.kind     = kind  # 'CLOB' or 'BLOB'
+        self._content = content
+        self._locator = locator
+        self._size    = None  # of the locator, with its first characters
+        self._head    = None
+
+    @staticmethod
+    def is_locator(value) -> bool:
+        return type(value).__name__ in ("LOB", "AsyncLOB") and hasattr(value, "read")
+
+    @property
+    def is_binary(self) -> bool:
+        return self.kind == "BLOB"
+
+    @property
+    def loaded(self) -> bool:
+        return self._content is not None
+
+    def load(self):
+        """The whole content, str or bytes (read through the locator the first time)."""
+        if self._content is None:
+            content       = self._locator.read()
+            self._content = bytes(content) if self.is_binary else str(content)
+        return self._content
+
+    def size(self) -> int:
+        if self._content is not None:
+            return len(self._content)
+        if self._size is None:
+            self._size = self._locator.size()
+        return self._size
+
+    def _preview(self):
+        """The first PREVIEW characters (bytes), read through the locator while not loaded."""
+        if self._content is not None:
+            return self._content[:self.PREVIEW]
+        if self._head is None:
+            head       = self._locator.read(1, self.PREVIEW) if self.size() else ""
+            self._head = bytes(head) if self.is_binary else str(head)
+        return self._head
+
+    def __str__(self):
+        size = self.size()
+        unit = "bytes" if self.is_binary else "chars"
+        head = self._preview()
+        head = head.hex(" ") if self.is_binary else head.replace("\n", " ")
+        more = "..." if size > self.PREVIEW else ""
+        return f"<{self.kind} {size:,} {unit}> ".replace(",", "'") + head + more
+
+    @classmethod
+    def wrap(cls, value, limit=INLINE_LIMIT, inline_size=0):
+        """
+        *value*, or a LobValue when it is longer than *limit* or a LOB locator. A locator
+        of at most *inline_size* characters (bytes) is read at once, other ones only get
+        their size and preview read.
+        """
+        if cls.is_locator(value):
+            lob = cls("BLOB" if "BLOB" in str(getattr(value, "type", "")) else "CLOB", locator=value)
+            if lob.size() <= inline_size:
+                return cls.wrap(lob.load(), limit)
+            lob._preview()
+            return lob
+        if isinstance(value, (bytes, bytearray, memoryview)) and len(value) > limit:
+            return cls("BLOB", bytes(value))
+        if isinstance(value, str) and len(value) > limit:
+            return cls("CLOB", value)
+        return value
+
+    @classmethod
+    def large_columns(cls, description, limit=INLINE_LIMIT) -> List[int]:
+        """
+        Indexes of the columns of a cursor *description* that can hold values longer than
+        *limit*: LOBs, and texts or binaries not declared at most *limit* long (pyodbc
+        reports them as str or bytes, with a size of 0 for the (max) types). sqlite3 gives
+        no type codes, so any of its columns can.
+        """
+        indexes = []
+        for index, column in enumerate(description or ()):
+            type_code = column[1]
+            size      = column[3] if len(column) > 3 else None
+            name      = getattr(type_code, "name", None)
+            if type_code is None or name in cls.LOB_TYPE_NAMES or \
+                    (isinstance(type_code, int) and type_code in cls.LOB_TYPE_OIDS):
+                indexes.append(index)
+            elif (name in cls.SIZED_TYPE_NAMES or type_code in (str, bytes, bytearray)) and \
+                    not (size and 0 < size <= limit):
+                indexes.append(index)
+        return indexes
+
+    @classmethod
+    def wrap_rows(cls, rows: List[Tuple], description, limit=INLINE_LIMIT, inline_size=0) -> List[Tuple]:
+        """
+        *rows* with LOB locators and values longer than *limit* replaced by LobValues
+        (see wrap). Only the columns that the *description* of their cursor says can hold
+        them are looked at: results without such columns are returned as they are.
+        """
+        columns = cls.large_columns(description, limit)
+        if not rows or not columns:
+            return rows
+        wrap    = cls.wrap
+        wrapped = []
+        for row in rows:
+            row = list(row)
+            for index in columns:
+                row[index] = wrap(row[index], limit, inline_size)
+            wrapped.append(tuple(row))
+        return wrapped
+
+
+class ResultStore:
+    """
+    The rows of one result as fetched (typed values, not the formatted grid text).
+    Sorting uses one key list per column and direction, computed once, and keeps
+    the permutation of every sort specification it produced, so switching back
+    to a previous order costs nothing.
+    """
+
+    # Values of different kinds in one column (possible on SQLite) are ordered by kind first
+    _NUMBER, _TEXT, _DATETIME, _DATE, _TIME, _BINARY, _OTHER = range(7)
+
+    def __init__(self, columns: Sequence[str], rows: List[Tuple]):
+        self.columns = list(columns)
+        self.rows    = rows
+        self._sort_keys: Dict[int, List] = {}
+        self._permutations: Dict[Tuple, List[int]] = {}
+        self._lowered: Dict[int, List[str]] = {}
+        self._numeric: Dict[int, bool] = {}
+        self._lowered_rows: List[str] = None
+        self._last_filter = None  # (terms, find text, matching row indexes)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def sort_key(cls, value):
+        """Key ordering values of different kinds: by kind first, then by value."""
+        if isinstance(value, (int, float, Decimal)):  # bool is an int
+            return cls._NUMBER, value
+        if isinstance(value, str):
+            return cls._TEXT, value
+        if isinstance(value, datetime):
+            return cls._DATETIME, value
+        if isinstance(value, date):
+            return cls._DATE, value
+        if isinstance(value, time):
+            return cls._TIME, value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return cls._BINARY, bytes(value)
+        if isinstance(value, LobValue) and value.loaded:
+            return (cls._BINARY if value.is_binary else cls._TEXT), value.load()
+        return cls._OTHER, str(value)
+
+    def column_sort_keys(self, index: int) -> List:
+        """
+        Sort key of every row for column *index*, None for NULL. Columns holding
+        one kind of value (the usual case) are keyed by the values themselves.
+        """
+        keys = self._sort_keys.get(index)
+        if keys is None:
+            keys  = [row[index] for row in self.rows]
+            kinds = {self.sort_key(kind())[0] if kind in (str, int, float, Decimal, bool) else kind
+                     for kind in set(map(type, keys)) if kind is not type(None)}
+            if len(kinds) > 1 or not kinds <= {self._NUMBER, self._TEXT, datetime, date, time}:
+                sort_key = self.sort_key
+                keys = [None if value is None else sort_key(value) for value in keys]
+            self._sort_keys[index] = keys
+        return keys
+
+    def sort(self, spec: Sequence[Tuple[int, bool]]) -> List[int]:
+        """
+        Row indexes ordered by *spec*, a list of (column index, descending) from the
+        most to the least significant key. NULLs sort last, equal rows keep their
+        fetched order.
+        """
+        spec = tuple(spec)
+        permutation = self._permutations.get(spec)
+        if permutation is None:
+            permutation = list(range(len(self.rows)))
+            # Stable sorts from the least significant key up give the multi-key order
+            for index, descending in reversed(spec):
+                keys  = self.column_sort_keys(index)
+                nulls = [i for i in permutation if keys[i] is None]
+                if nulls:
+                    permutation = [i for i in permutation if keys[i] is not None]
+                permutation.sort(key=keys.__getitem__, reverse=descending)
+                permutation += nulls
+            self._permutations[spec] = permutation
+        return permutation
+
+    # ------------------------------------------------------------------
+    # Filtering
+    # ------------------------------------------------------------------
+
+    FILTER_OPERATORS = ("~", "=", "!=", ">", ">=", "<", "<=")
+    FILTER_TERM      = re.compile(r"^\s*(.+?)\s*(~|!=|>=|<=|=|>|<)\s*(.*?)\s*$")
+
+    def parse_filter(self, text: str) -> List[Tuple[int, str, str]]:
+        """
+        'name ~ smith; amount >= 100' -> [(column index, operator, text), ...].
+        Terms are separated by ';', column names are matched case-insensitively.
+        """
+        names = {column.lower(): index for index, column in enumerate(self.columns)}
+        terms = []
+        for part in text.split(";"):
+            if not part.strip():
+                continue
+            match = self.FILTER_TERM.match(part)
+            if not match:
+                raise ValueError(f"Expected 'column operator value', got {part.strip()!r}")
+            column, operator, value = match.groups()
+            if column.lower() not in names:
+                raise ValueError(f"Unknown column {column!r}")
+            terms.append((names[column.lower()], operator, value))
+        return terms
+
+    def lowered_column(self, index: int) -> List[str]:
+        """Lower-cased text of every value of column *index* ('' for NULL), computed once."""
+        lowered = self._lowered.get(index)
+        if lowered is None:
+            lowered = ["" if row[index] is None else str(row[index]).lower() for row in self.rows]
+            self._lowered[index] = lowered
+        return lowered
+
+    def lowered_rows(self) -> List[str]:
+        """Lower-cased text of every row, values joined by NUL, for the global find."""
+        if self._lowered_rows is None:
+            columns = [self.lowered_column(index) for index in range(len(self.columns))]
+            self._lowered_rows = ["\0".join(values) for values in zip(*columns)] if columns else []
+        return self._lowered_rows
+
+    def is_numeric_column(self, index: int) -> bool:
+        numeric = self._numeric.get(index)
+        if numeric is None:
+            kinds   = set(map(type, self.column_sort_keys(index))) - {type(None)}
+            numeric = bool(kinds) and kinds <= {int, float, Decimal}
+            self._numeric[index] = numeric
+        return numeric
+
+    def _term_predicate(self, index, operator, text):
+        """Row index -> bool for one 'column <operator> text' term."""
+        if operator not in self.FILTER_OPERATORS:
+            raise ValueError(f"Unknown filter operator {operator!r}")
+        text = text.strip()
+        if operator != "~" and text and self.is_numeric_column(index):
+            try:
+                operand = Decimal(text.replace("'", "").replace(",", ""))
+            except ArithmeticError:
+                operand = None
+            if operand is not None:
+                keys = self.column_sort_keys(index)
+                compare = {
+                    "=":  lambda v: v == operand, "!=": lambda v: v != operand,
+                    ">":  lambda v: v >  operand, ">=": lambda v: v >= operand,
+                    "<":  lambda v: v <  operand, "<=": lambda v: v <= operand,
+                }[operator]
+                return lambda i: keys[i] is not None and compare(keys[i])
+
+        # Text comparison on the lower-cased values (ISO dates compare correctly as text);
+        # NULL reads as '' for ~, = and !=, and never passes an ordering comparison
+        lowered = self.lowered_column(index)
+        keys    = self.column_sort_keys(index)
+        text    = text.lower()
+        return {
+            "~":  lambda i: text in lowered[i],
+            "=":  lambda i: lowered[i] == text, "!=": lambda i: lowered[i] != text,
+            ">":  lambda i: keys[i] is not None and lowered[i] >  text,
+            ">=": lambda i: keys[i] is not None and lowered[i] >= text,
+            "<":  lambda i: keys[i] is not None and lowered[i] <  text,
+            "<=": lambda i: keys[i] is not None and lowered[i] <= text,
+        }[operator]
+
+    @staticmethod
+    def _narrows(previous, terms, find) -> bool:
+        """
+        True when the rows matching (terms, find) are a subset of the previous match:
+        same or more terms, each previous 'contains' text extended, other terms unchanged.
+        """
+        previous_terms, previous_find, _ = previous
+        if previous_find.lower() not in find.lower():
+            return False
+        current = {(index, operator): text for index, operator, text in terms}
+        for index, operator, text in previous_terms:
+            new_text = current.get((index, operator))
+            if new_text is None:
+                return False
+            if operator == "~" and text.lower() in new_text.lower():
+                continue
+            if new_text != text:
+                return False
+        return len(current) == len(terms)  # at most one term per column and operator
+
+    def filter(self, terms: Sequence[Tuple[int, str, str]], find: str = "") -> List[int]:
+        """
+        Indexes (in fetched order) of the rows matching every (column index, operator, text)
+        term and containing *find* in any column, case-insensitively. When the criteria only
+        narrow the previous ones (e.g. one more character typed), just the previous matches
+        are scanned again.
+        """
+        terms = tuple((index, operator, text) for index, operator, text in terms)
+        if self._last_filter and self._narrows(self._last_filter, terms, find):
+            candidates = self._last_filter[2]
+        else:
+            candidates = range(len(self.rows))
+
+        matches = candidates
+        if find:
+            lowered_rows, needle = self.lowered_rows(), find.lower()
+            matches = [i for i in matches if needle in lowered_rows[i]]
+        for term in terms:
+            predicate = self._term_predicate(*term)
+            matches   = [i for i in matches if predicate(i)]
+        matches = list(matches)
+
+        self._last_filter = (terms, find, matches)
+        return matches
+
+    # ------------------------------------------------------------------
+    # Aggregates
+    # ------------------------------------------------------------------
+
+    SUM_PRECISION = 100  # digits kept while summing Decimals, so that NUMBER sums stay exact
+
+    def aggregate(self, index: int, row_indexes: Sequence[int] = None) -> Dict[str, Any]:
+        """
+        count/nulls/distinct/min/max of column *index* over *row_indexes* (all rows when None),
+        plus sum/avg for numeric columns. Decimal values are summed exactly, floats with fsum.
+        """
+        rows   = self.rows if row_indexes is None else [self.rows[i] for i in row_indexes]
+        column = [row[index] for row in rows]
+        values = [value for value in column if value is not None]
+        result = {"count": len(values), "nulls": len(column) - len(values)}
+        if not values:
+            return result
+
+        try:
+            result["distinct"] = len(set(values))
+        except TypeError:  # unhashable values (memoryview...)
+            result["distinct"] = None
+
+        kinds = set(map(type, values))
+        if kinds <= {int, float, Decimal}:
+            if float in kinds:
+                total = math.fsum(values)
+            elif Decimal in kinds:
+                with localcontext() as context:
+                    context.prec = self.SUM_PRECISION
+                    total = sum(values, Decimal(0))
+            else:
+                total = sum(values)
+            result.update(sum=total, avg=total / len(values), min=min(values), max=max(values))
+        elif len(kinds) == 1 and LobValue not in kinds:
+            result.update(min=min(values), max=max(values))
+        else:
+            sort_key = self.sort_key
+            result.update(min=min(values, key=sort_key), max=max(values, key=sort_key))
+        return result
+
+
+class ResultDiff:
+    """
+    Compares two results aligned on key columns (matched by name on both sides),
+    on the non-key columns they have in common. Each side is read as a stream of
+    row chunks: the left one is reduced to {key: digest of the compared values},
+    the right one is checked against it on the fly, so neither result has to be
+    held as rows. Only the rows found different are read again by collect_rows()
+    to show their values.
+    """
+
+    MAX_DETAIL_ROWS = 10000  # differences shown with their values
+
+    def __init__(self, left_columns, right_columns, key_columns):
+        left_names  = [str(column).lower() for column in left_columns]
+        right_names = [str(column).lower() for column in right_columns]
+        keys        = [str(column).lower() for column in key_columns]
+        missing = [column for column, name in zip(key_columns, keys) if name not in left_names or name not in right_names]
+        if not keys or missing:
+            raise ValueError(f"Key column(s) missing on one side: {', '.join(missing) or '(none given)'}")
+
+        self.key_columns      = list(key_columns)
+        self.compared_columns = [column for column, name in zip(left_columns, left_names)
+                                 if name in right_names and name not in keys]
+        compared = [str(column).lower() for column in self.compared_columns]
+        self.key_indexes   = ([left_names.index(name) for name in keys], [right_names.index(name) for name in keys])
+        self.value_indexes = ([left_names.index(name) for name in compared], [right_names.index(name) for name in compared])
+
+        self.added:   List[Tuple] = []  # keys only found on the right
+        self.removed: List[Tuple] = []  # keys only found on the left
+        self.changed: List[Tuple] = []  # keys whose compared values differ
+        self.duplicate_keys = 0
+        self.rows_read = [0, 0]
+        self.cancelled = False
+
+    @staticmethod
+    def normalize(value):
+        """Comparable form of a value, so that equal data fetched by different drivers compares equal."""
+        if isinstance(value, float):
+            return Decimal(repr(value))  # 0.1 and Decimal('0.1'); ints and Decimals already compare by value
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (datetime, date, time)):
+            return str(value)  # SQLite returns dates as text
+        if isinstance(value, (bytearray, memoryview)):
+            return bytes(value)
+        if value is None or isinstance(value, (str, bytes, int, Decimal)):
+            return value
+        if isinstance(value, LobValue):
+            return value.load()
+        return str(value)
+
+    # Types compared as they are; columns holding only these skip normalize() in a chunk
+    PLAIN_TYPES = {str, int, Decimal, bytes, type(None)}
+
+    def _columns(self, rows, indexes) -> List[List]:
+        """Normalized values of the columns *indexes* of a chunk, column by column."""
+        columns = []
+        for index in indexes:
+            column = list(map(itemgetter(index), rows))
+            if not set(map(type, column)) <= self.PLAIN_TYPES:
+                column = list(map(self.normalize, column))
+            columns.append(column)
+        return columns
+
+    @staticmethod
+    def _canonical(value):
+        """Equal numbers in one form: 2, 2.0 and Decimal('2.00') all as 2, Decimal('1.50') as Decimal('1.5')."""
+        if isinstance(value, Decimal) and value.is_finite():
+            value = value.normalize()
+            return int(value) if value == value.to_integral_value() else value
+        return value
+
+    @classmethod
+    def digest(cls, values, size=16) -> bytes:
+        """
+        Stable digest of normalized *values*. Unlike hash(), which collides on plain
+        values (hash(-1) == hash(-2)), different data practically never shares one.
+        """
+        return blake2b(repr(tuple(map(cls._canonical, values))).encode(), digest_size=size).digest()
+
+    def _keys(self, rows, side) -> List[Tuple]:
+        return list(zip(*self._columns(rows, self.key_indexes[side])))
+
+    def _keyed_digests(self, rows, side):
+        values  = self._columns(rows, self.value_indexes[side])
+        digests = map(self.digest, zip(*values)) if values else [self.digest(())] * len(rows)
+        return zip(self._keys(rows, side), digests)
+
+    def compare(self, left_chunks: Iterable[List[Tuple]], right_chunks: Iterable[List[Tuple]]):
+        """Fill added/removed/changed from the two streams of row chunks."""
+        digests = {}
+        for rows in left_chunks:
+            if self.cancelled:
+                return
+            for key, digest in self._keyed_digests(rows, 0):
+                if key in digests:
+                    self.duplicate_keys += 1
+                digests[key] = digest
+            self.rows_read[0] += len(rows)
+
+        for rows in right_chunks:
+            if self.cancelled:
+                return
+            for key, digest in self._keyed_digests(rows, 1):
+                left_digest = digests.pop(key, None)
+                if left_digest is None:
+                    self.added.append(key)
+                elif left_digest != digest:
+                    self.changed.append(key)
+            self.rows_read[1] += len(rows)
+        self.removed = list(digests)
+
+    @property
+    def difference_count(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def collect_rows(self, chunks: Iterable[List[Tuple]], side: int, keys) -> Dict[Tuple, Tuple]:
+        """Second pass over one side: the rows whose key is in *keys*."""
+        wanted, found = set(keys), {}
+        for rows in chunks:
+            if self.cancelled:
+                break
+            for key, row in zip(self._keys(rows, side), rows):
+                if key in wanted:
+                    found[key] = row
+        return found
+
+    def detail_keys(self):
+        """(status, key) of the differences shown with their values, at most MAX_DETAIL_ROWS."""
+        detail = [("changed", key) for key in self.changed] + \
+                 [("removed", key) for key in self.removed] + \
+                 [("added",   key) for key in self.added]
+        return detail[:self.MAX_DETAIL_ROWS]
+
+    def detail_rows(self, left_rows: Dict[Tuple, Tuple], right_rows: Dict[Tuple, Tuple]):
+        """
+        Columns and rows of the difference grid: status, key columns, compared columns.
+        Changed cells read 'left → right'.
+        """
+        columns = ["Diff"] + self.key_columns + self.compared_columns
+        rows    = []
+        for status, key in self.detail_keys():
+            left, right = left_rows.get(key), right_rows.get(key)
+            if status == "changed" and left and right:
+                values = []
+                for left_index, right_index in zip(*self.value_indexes):
+                    left_value, right_value = left[left_index], right[right_index]
+                    if self.normalize(left_value) == self.normalize(right_value):
+                        values.append(left_value)
+                    else:
+                        values.append(f"{left_value} → {right_value}")
+            elif status == "removed" and left:
+                values = [left[i] for i in self.value_indexes[0]]
+            elif right:
+                values = [right[i] for i in self.value_indexes[1]]
+            else:
+                values = [None] * len(self.compared_columns)
+            rows.append((status, *key, *values))
+        return columns, rows
+
+    def summary(self) -> str:
+        text = (f"{self.rows_read[0]:,} vs {self.rows_read[1]:,} row(s): {len(self.changed):,} changed, "
+                f"{len(self.removed):,} only left, {len(self.added):,} only right")
+        if self.duplicate_keys:
+            text += f", {self.duplicate_keys:,} duplicate key(s) on the left"
+        if self.difference_count > self.MAX_DETAIL_ROWS:
+            text += f" (first {self.MAX_DETAIL_ROWS:,} shown)"
+        return text
+
+
+class LocalResultDatabase:
+    """
+    In-memory SQLite database where the last result of each SQL tab is a table
+    named after the tab id (tab_1, tab_2, ...). Tables are (re)loaded by sync()
+    only when the result of their tab changed, each one with executemany in a
+    single transaction.
+    """
+
+    def __init__(self):
+        self.connection = sqlite3.connect(":memory:")
+        self._loaded: Dict[str, List] = {}  # table -> rows list it was loaded from
+
+    @staticmethod
+    def unique_columns(columns) -> List[str]:
+        """Column names made unique for CREATE TABLE: id, id -> id, id_2."""
+        names, seen = [], set()
+        for column in columns:
+            name, suffix = str(column), 1
+            while name.lower() in seen:
+                suffix += 1
+                name = f"{column}_{suffix}"
+            seen.add(name.lower())
+            names.append(name)
+        return names
+
+    @staticmethod
+    def column_affinity(rows, index) -> str:
+        """SQLite column type from the first non-NULL value of the column."""
+        for row in rows:
+            value = row[index]
+            if value is None:
+                continue
+            if isinstance(value, (bool, int, float, Decimal)):
+                return "NUMERIC"  # Decimal is bound as text, NUMERIC turns it back into a number
+            if isinstance(value, (bytes, bytearray, memoryview)):
+                return "BLOB"
+            return "TEXT"
+        return ""
+
+    @staticmethod
+    def normalize(value):
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (Decimal, date, time)):  # datetime is a date subclass
+            return str(value)
+        if isinstance(value, (bytearray, memoryview)):
+            return bytes(value)
+        if isinstance(value, (str, bytes, int, float)) or value is None:
+            return value
+        if isinstance(value, LobValue):
+            return value.load()
+        return str(value)  # UUIDs, intervals...
+
+    def load_table(self, table, columns, rows):
+        """Replace *table* with *rows*, in one transaction."""
+        names = self.unique_columns(columns)
+        definitions = ", ".join(
+            f'"{name}" {self.column_affinity(rows, index)}'.rstrip() for index, name in enumerate(names)
+        )
+        placeholders = ", ".join(["?"] * len(names))
+        with self.connection:
+            self.connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self.connection.execute(f'CREATE TABLE "{table}" ({definitions})')
+            self.connection.executemany(
+                f'INSERT INTO "{table}" VALUES ({placeholders})',
+                (tuple(self.normalize(value) for value in row) for row in rows)
+            )
+        self._loaded[table] = rows
+
+    def sync(self, tab_results: Dict[str, Dict[str, Any]]):
+        """Bring the tables in line with the results of the tabs; unchanged results are not reloaded."""
+        for table, result in tab_results.items():
+            if result.get("type") != "results":
+                continue
+            if self._loaded.get(table) is not result["rows"]:
+                self.load_table(table, result["columns"], result["rows"])
+        for table in [table for table in self._loaded if tab_results.get(table, {}).get("type") != "results"]:
+            with self.connection:
+                self.connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+            del self._loaded[table]
+
+    def tables(self) -> List[str]:
+        return sorted(self._loaded)
+
+    def execute_query(self, sql: str) -> Dict[str, Any]:
+        """Run *sql* locally; same result dict as QueryManager.execute_query()."""
+        try:
+            cursor = self.connection.execute(sql)
+            if cursor.description:
+                columns = [d[0] for d in cursor.description]
+                rows = cursor.fetchall()
+                return {
+                    "success": True,
+                    "columns": columns,
+                    "rows": rows,
+                    "description": cursor.description,
+                    "rowcount": len(rows),
+                }
+            self.connection.commit()
+            return {"success": True, "message": f"Query executed locally ({cursor.rowcount} row(s))"}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def close(self):
+        self.connection.close()
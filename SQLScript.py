@@ -0,0 +1,447 @@
+import re
+from decimal import Decimal
+from typing  import List, Tuple, Optional
+
+# ======================================================================
+# TOKENIZER
+# ======================================================================
+
+class Token:
+    """A lexical token of a SQL statement with its span in the source text."""
+    __slots__ = ("kind", "text", "start", "end")
+
+    def __init__(self, kind, text, start, end):
+        self.kind  = kind    # 'word', 'string', 'number', 'qident', 'dollar', 'op', 'comment', 'space'
+        self.text  = text
+        self.start = start
+        self.end   = end
+
+    def __repr__(self):
+        return f"Token({self.kind!r}, {self.text!r})"
+
+
+class SQLTokenizer:
+    """Minimal SQL lexer: enough to split scripts and find literals safely."""
+
+    _reg_space   = re.compile(r"\s+")
+    _reg_word    = re.compile(r"[A-Za-z_][A-Za-z0-9_$#]*")
+    _reg_number  = re.compile(r"(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?")
+    _reg_dollar  = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)?\$")
+    _two_char_ops = ("<=", ">=", "<>", "!=", "||", "::", ":=", "=>")
+
+    @staticmethod
+    def tokenize(sql: str) -> List[Token]:
+        tokens = []
+        i      = 0
+        n      = len(sql)
+        while i < n:
+            c = sql[i]
+
+            if c.isspace():
+                m = SQLTokenizer._reg_space.match(sql, i)
+                tokens.append(Token('space', m.group(), i, m.end()))
+                i = m.end()
+
+            elif sql.startswith("--", i):
+                end = sql.find("\n", i)
+                end = n if end == -1 else end
+                tokens.append(Token('comment', sql[i:end], i, end))
+                i = end
+
+            elif sql.startswith("/*", i):
+                end = sql.find("*/", i + 2)
+                end = n if end == -1 else end + 2
+                tokens.append(Token('comment', sql[i:end], i, end))
+                i = end
+
+            elif c == "'":
+                j = i + 1
+                while j < n:
+                    if sql[j] == "'":
+                        if j + 1 < n and sql[j + 1] == "'":
+                            j += 2
+                            continue
+                        break
+                    j += 1
+                end = min(j + 1, n)
+                tokens.append(Token('string', sql[i:end], i, end))
+                i = end
+
+            elif c == '"':
+                end = sql.find('"', i + 1)
+                end = n if end == -1 else end + 1
+                tokens.append(Token('qident', sql[i:end], i, end))
+                i = end
+
+            elif c == '$' and SQLTokenizer._reg_dollar.match(sql, i):
+                # PostgreSQL dollar-quoted body ($$ ... $$ or $tag$ ... $tag$)
+                tag = SQLTokenizer._reg_dollar.match(sql, i).group()
+                end = sql.find(tag, i + len(tag))
+                end = n if end == -1 else end + len(tag)
+                tokens.append(Token('dollar', sql[i:end], i, end))
+                i = end
+
+            elif c.isdigit() or (c == '.' and i + 1 < n and sql[i + 1].isdigit()):
+                m = SQLTokenizer._reg_number.match(sql, i)
+                tokens.append(Token('number', m.group(), i, m.end()))
+                i = m.end()
+
+            elif c.isalpha() or c == '_':
+                m = SQLTokenizer._reg_word.match(sql, i)
+                tokens.append(Token('word', m.group(), i, m.end()))
+                i = m.end()
+
+            else:
+                op = sql[i:i + 2]
+                if op in SQLTokenizer._two_char_ops:
+                    tokens.append(Token('op', op, i, i + 2))
+                    i += 2
+                else:
+                    tokens.append(Token('op', c, i, i + 1))
+                    i += 1
+        return tokens
+
+
+# ======================================================================
+# SCRIPT SPLITTING
+# ======================================================================
+
+class SQLScript:
+    """
+    Splits an editor script into single statements and detects runs of
+    structurally identical INSERT/UPDATE statements that can be sent as one
+    parameterised batch (executemany / array DML / multi-row VALUES).
+    """
+
+    # Words that open a procedural block: ';' no longer ends the statement,
+    # only a '/' line (SQL*Plus), a 'GO' line (T-SQL) or the end of the script.
+    _block_routine_words = ("PROCEDURE", "FUNCTION", "PACKAGE", "TRIGGER", "TYPE")
+
+    # Only the elements of a VALUES (...) row and the right operand of '=' in the
+    # SET and WHERE clauses are values. Any other literal (function argument, CASE
+    # operand, ORDER BY 1, NUMBER(10, 2), DATE '2024-01-01' ...) stays in the SQL
+    # text, where it keeps the types and the plan the statement would have had.
+    _bindable_clauses = {"SET", "WHERE"}
+
+    # Top-level words starting a clause of an INSERT/UPDATE statement
+    _clause_words = {
+        "SET", "WHERE", "VALUES", "SELECT", "FROM", "JOIN", "ON", "USING", "GROUP", "ORDER",
+        "HAVING", "LIMIT", "OFFSET", "FETCH", "UNION", "INTERSECT", "EXCEPT", "MINUS", "INTO",
+        "CONFLICT", "DUPLICATE",
+    }
+
+    # Words before a parenthesis that only groups conditions (not a call or a subquery)
+    _grouping_words = {None, "WHERE", "AND", "OR", "NOT"}
+
+    # Statements returning rows are never batched: their result sets would be lost
+    _returning_words = {"RETURNING", "OUTPUT"}
+
+    # First words of the statements that change the catalog (and invalidate the cached metadata)
+    _ddl_words = {"CREATE", "ALTER", "DROP", "RENAME", "COMMENT"}
+
+    @staticmethod
+    def _leading_words(tokens, count=4):
+        words = []
+        for tok in tokens:
+            if tok.kind in ('space', 'comment'):
+                continue
+            if tok.kind != 'word':
+                break
+            words.append(tok.text.upper())
+            if len(words) == count:
+                break
+        return words
+
+    @staticmethod
+    def is_ddl(sql: str) -> bool:
+        """True if *sql* creates, alters, renames or drops a database object."""
+        words = SQLScript._leading_words(SQLTokenizer.tokenize(sql), 1)
+        return bool(words) and words[0] in SQLScript._ddl_words
+
+    @staticmethod
+    def _is_block_start(tokens):
+        words = SQLScript._leading_words(tokens, 5)
+        if not words:
+            return False
+        if words[0] == "DECLARE":
+            return True
+        if words[0] == "BEGIN":
+            # 'BEGIN;' / 'BEGIN TRANSACTION;' only start a transaction
+            significant = [t for t in tokens if t.kind not in ('space', 'comment')]
+            if len(significant) < 2 or significant[1].text == ';':
+                return False
+            return significant[1].text.upper() not in ("TRANSACTION", "TRAN", "WORK")
+        if words[0] != "CREATE":
+            return False
+        for word in words[1:]:
+            if word in ("OR", "REPLACE", "EDITIONABLE", "NONEDITIONABLE", "ALTER"):
+                continue
+            return word in SQLScript._block_routine_words
+        return False
+
+    @staticmethod
+    def _is_separator_line(sql, tok):
+        """True if *tok* ('/' or 'GO') stands alone on its line."""
+        line_start = sql.rfind("\n", 0, tok.start) + 1
+        line_end   = sql.find("\n", tok.end)
+        line_end   = len(sql) if line_end == -1 else line_end
+        return sql[line_start:line_end].strip().upper() == tok.text.upper()
+
+    @staticmethod
+    def split_statements(sql: str) -> List[str]:
+        """
+        Split a script into statements.
+
+        Plain statements end with ';'. Procedural blocks (BEGIN/DECLARE,
+        CREATE PROCEDURE/FUNCTION/PACKAGE/TRIGGER/TYPE) run until a line holding
+        only '/' or 'GO', or until the end of the script, except PostgreSQL
+        bodies whose dollar-quoted text already protects the inner semicolons.
+        """
+        tokens     = SQLTokenizer.tokenize(sql)
+        statements = []
+        current    = []
+
+        def flush(keep_semicolon=False):
+            text = sql[current[0].start:current[-1].end] if current else ""
+            if not keep_semicolon:
+                text = text.rstrip()
+                if text.endswith(";"):
+                    text = text[:-1]
+            text = text.strip()
+            if text and any(t.kind not in ('space', 'comment') for t in current):
+                statements.append(text)
+            current.clear()
+
+        for tok in tokens:
+            is_separator = (
+                (tok.kind == 'op' and tok.text == '/') or
+                (tok.kind == 'word' and tok.text.upper() == 'GO')
+            ) and SQLScript._is_separator_line(sql, tok)
+
+            if is_separator:
+                flush(keep_semicolon=SQLScript._is_block_start(current))
+                continue
+
+            current.append(tok)
+
+            if tok.kind == 'op' and tok.text == ';':
+                if not SQLScript._is_block_start(current):
+                    flush()
+                elif any(t.kind == 'dollar' for t in current):
+                    flush()
+
+        flush(keep_semicolon=SQLScript._is_block_start(current))
+        return statements
+
+    # ------------------------------------------------------------------
+    # DML SHAPES
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _literal_value(tok):
+        if tok.kind == 'string':
+            return tok.text[1:-1].replace("''", "'")
+        if tok.kind == 'number':
+            text = tok.text
+            if '.' in text or 'e' in text or 'E' in text:
+                return Decimal(text)
+            return int(text)
+        return None  # NULL keyword
+
+    @staticmethod
+    def parse_dml_shape(sql: str) -> Optional["DMLShape"]:
+        """
+        Return the DMLShape of an INSERT/UPDATE statement, or None if the
+        statement is not a batchable DML statement (no bindable literal, other verb).
+        """
+        tokens = SQLTokenizer.tokenize(sql)
+        words  = SQLScript._leading_words(tokens, 1)
+        if not words or words[0] not in ("INSERT", "UPDATE"):
+            return None
+
+        significant = [t for t in tokens if t.kind not in ('space', 'comment')]
+        if any(t.kind == 'dollar' for t in significant):
+            return None
+        if any(t.kind == 'word' and t.text.upper() in SQLScript._returning_words for t in significant):
+            return None
+
+        key_parts   = []
+        spans       = []
+        values      = []
+        kinds       = []
+        paren_owner = []   # word that precedes each open parenthesis ('VALUES' for a row)
+        clause      = None # top-level clause being read
+        case_depth  = 0    # CASE ... END nesting
+        before      = None # token before *previous*
+        previous    = None
+
+        for tok in significant:
+            upper = tok.text.upper() if tok.kind == 'word' else tok.text
+
+            is_literal = tok.kind in ('string', 'number') or (tok.kind == 'word' and upper == 'NULL')
+            bindable   = False
+            if is_literal and previous is not None:
+                # The sign of a number stays in the SQL text: VALUES (-?), SET a = -?
+                operator = previous
+                if previous.kind == 'op' and previous.text in ('-', '+') and before is not None:
+                    operator = before
+                op_text = operator.text if operator.kind == 'op' else None
+                if paren_owner == ["VALUES"]:
+                    bindable = op_text in ('(', ',')
+                elif op_text == '=':
+                    bindable = (clause in SQLScript._bindable_clauses and case_depth == 0 and
+                                all(owner in SQLScript._grouping_words for owner in paren_owner))
+
+            if bindable:
+                key_parts.append("?")
+                spans.append((tok.start, tok.end))
+                values.append(SQLScript._literal_value(tok))
+                kinds.append(None if upper == 'NULL' else tok.kind)
+            else:
+                key_parts.append(upper)
+
+            if tok.kind == 'op' and tok.text == '(':
+                if not paren_owner and clause == "VALUES":
+                    owner = "VALUES"
+                else:
+                    owner = previous.text.upper() if previous is not None and previous.kind == 'word' else None
+                paren_owner.append(owner)
+            elif tok.kind == 'op' and tok.text == ')' and paren_owner:
+                paren_owner.pop()
+            elif tok.kind == 'word' and upper == 'CASE':
+                case_depth += 1
+            elif tok.kind == 'word' and upper == 'END' and case_depth:
+                case_depth -= 1
+            elif tok.kind == 'word' and not paren_owner and upper in SQLScript._clause_words:
+                clause = upper
+
+            before, previous = previous, tok
+
+        if not spans:
+            return None
+
+        return DMLShape(sql, " ".join(key_parts), spans, tuple(values), tuple(kinds), words[0])
+
+    @staticmethod
+    def group_statements(statements: List[str], min_run: int = 2) -> List[Tuple[str, object]]:
+        """
+        Group consecutive statements into ('single', sql) and ('batch', DMLBatch) items.
+        A batch is a run of at least *min_run* statements sharing the same shape and
+        binding compatible literal kinds (NULL is compatible with anything).
+        """
+        items = []
+        run   = None
+
+        def close_run():
+            nonlocal run
+            if run is None:
+                return
+            if len(run.rows) >= min_run:
+                items.append(('batch', run))
+            else:
+                items.extend(('single', s) for s in run.statements)
+            run = None
+
+        for statement in statements:
+            shape = SQLScript.parse_dml_shape(statement)
+            if shape is None:
+                close_run()
+                items.append(('single', statement))
+                continue
+            if run is not None and run.accepts(shape):
+                run.add(shape)
+            else:
+                close_run()
+                run = DMLBatch(shape)
+
+        close_run()
+        return items
+
+
+class DMLShape:
+    """Literal-free skeleton of one DML statement plus the literals it carried."""
+    __slots__ = ("sql", "key", "spans", "values", "kinds", "verb")
+
+    def __init__(self, sql, key, spans, values, kinds, verb):
+        self.sql    = sql
+        self.key    = key
+        self.spans  = spans
+        self.values = values
+        self.kinds  = kinds
+        self.verb   = verb
+
+
+class DMLBatch:
+    """A run of structurally identical DML statements, ready for executemany."""
+
+    def __init__(self, shape: DMLShape):
+        self.template   = shape
+        self.kinds      = list(shape.kinds)
+        self.rows       = [shape.values]
+        self.statements = [shape.sql]
+
+    def accepts(self, shape: DMLShape) -> bool:
+        if shape.key != self.template.key:
+            return False
+        for known, kind in zip(self.kinds, shape.kinds):
+            if known is not None and kind is not None and known != kind:
+                return False
+        return True
+
+    def add(self, shape: DMLShape):
+        for i, kind in enumerate(shape.kinds):
+            if self.kinds[i] is None:
+                self.kinds[i] = kind
+        self.rows.append(shape.values)
+        self.statements.append(shape.sql)
+
+    def parameterized_sql(self, paramstyle: str) -> str:
+        """
+        Rebuild the first statement with bind placeholders.
+        paramstyle: 'qmark' (?), 'format' (%s) or 'numeric' (:1, :2 ...).
+        """
+        sql    = self.template.sql
+        parts  = []
+        cursor = 0
+        for index, (start, end) in enumerate(self.template.spans, start=1):
+            chunk = sql[cursor:start]
+            if paramstyle == 'format':
+                chunk = chunk.replace('%', '%%')
+            parts.append(chunk)
+            if paramstyle == 'format':
+                parts.append('%s')
+            elif paramstyle == 'numeric':
+                parts.append(f':{index}')
+            else:
+                parts.append('?')
+            cursor = end
+        tail = sql[cursor:]
+        parts.append(tail.replace('%', '%%') if paramstyle == 'format' else tail)
+        return "".join(parts)
+
+    def values_clause(self, sql: str):
+        """
+        Split a parameterised 'INSERT ... VALUES (...)' into (prefix, row template)
+        when the VALUES group is the whole statement tail, else None.
+        Used to turn a PostgreSQL batch into multi-row VALUES.
+        """
+        if self.template.verb != "INSERT":
+            return None
+        tokens = SQLTokenizer.tokenize(sql)
+        for i, tok in enumerate(tokens):
+            if tok.kind == 'word' and tok.text.upper() == 'VALUES':
+                rest = [t for t in tokens[i + 1:] if t.kind not in ('space', 'comment')]
+                if not rest or rest[0].text != '(':
+                    return None
+                depth = 0
+                for j, t in enumerate(rest):
+                    if t.kind == 'op' and t.text == '(':
+                        depth += 1
+                    elif t.kind == 'op' and t.text == ')':
+                        depth -= 1
+                        if depth == 0:
+                            if j != len(rest) - 1:
+                                return None
+                            return sql[:rest[0].start], sql[rest[0].start:t.end]
+                return None
+        return None
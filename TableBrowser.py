@@ -0,0 +1,190 @@
+"""
+TableBrowser.py - Paging through the rows of a table from the explorer
+
+- KeysetPager: pages of a table in primary key order, each read with a seek on the
+  key values of the edge of the current page, the next page being read ahead
+- TableSample: sample size of the sampled preview (a percentage or a row target)
+"""
+
+import threading
+from typing  import List, Sequence
+
+
+class KeysetPager:
+    """
+    Pages of *page_size* rows of a table in primary key order. A page is read with
+    a WHERE on the key of the last (or first) row of the current page instead of an
+    OFFSET, so that the database seeks in the key index and page 20'000 costs the
+    same as page 1. While a page is displayed, the next one is read in a background
+    thread. The pager owns *connection* (opened shared) and closes it in close().
+    """
+
+    def __init__(self, connection, queries, schema, table, columns: Sequence[str], key_columns: Sequence[str],
+                 page_size=500, paramstyle="qmark"):
+        self.connection  = connection
+        self.queries     = queries
+        self.schema      = schema
+        self.table       = table
+        self.columns     = list(columns)
+        lowered          = [str(c).lower() for c in self.columns]
+        self.key_columns = [self.columns[lowered.index(str(k).lower())] for k in key_columns]
+        self.key_indexes = [self.columns.index(k) for k in self.key_columns]
+        self.page_size   = page_size
+        self.paramstyle  = paramstyle  # of the driver of *connection*, see QueryManager.PARAMSTYLES
+        self.rows: List[tuple] = []  # current page
+        self.page        = 0         # index of the current page, from the start of the table
+        self._lock       = threading.Lock()  # one statement at a time on the connection
+        self._ahead      = None      # (key the page follows, thread, {"rows"|"error": ...})
+
+    # Bind placeholder of the n-th parameter (from 1) for each driver paramstyle
+    PLACEHOLDERS = {"qmark": lambda n: "?", "numeric": lambda n: f":{n}", "format": lambda n: "%s"}
+
+    def key_of(self, row) -> tuple:
+        return tuple(row[i] for i in self.key_indexes)
+
+    def key_predicate(self, key, operator):
+        """
+        Rows after (operator '>') or before ('<') *key* in key order, as (predicate, params):
+        the key values are bound, whatever their type (dates, UUIDs, bytes ...).
+        """
+        params      = []
+        placeholder = self.PLACEHOLDERS[self.paramstyle]
+
+        def bind(i):
+            params.append(key[i])
+            return placeholder(len(params))
+
+        return self.queries.get_keyset_predicate_sql(self.key_columns, operator, bind), params
+
+    def _fetch(self, after=None, before=None) -> List[tuple]:
+        if before is not None:
+            predicate, params = self.key_predicate(before, "<")
+        elif after is not None:
+            predicate, params = self.key_predicate(after, ">")
+        else:
+            predicate, params = None, []
+        sql = self.queries.get_keyset_page_sql(self.schema, self.table, self.columns, self.key_columns,
+                                               predicate, before is not None, self.page_size)
+        with self._lock:
+            cursor = self.connection.cursor()
+            try:
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+                try:
+                    self.connection.rollback()  # do not keep a read transaction open between pages
+                except Exception:
+                    pass
+        return rows[::-1] if before is not None else rows
+
+    def _read_ahead(self):
+        self._ahead = None
+        if len(self.rows) < self.page_size:
+            return
+        key    = self.key_of(self.rows[-1])
+        result = {}
+
+        def work():
+            try:
+                result["rows"] = self._fetch(after=key)
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+        self._ahead = (key, thread, result)
+
+    @property
+    def has_previous(self) -> bool:
+        return self.page > 0
+
+    @property
+    def has_next(self) -> bool:
+        if len(self.rows) < self.page_size:
+            return False
+        if self._ahead and not self._ahead[1].is_alive() and self._ahead[2].get("rows") == []:
+            return False  # the table ends exactly with this page
+        return True
+
+    def first(self) -> List[tuple]:
+        self.rows = self._fetch()
+        self.page = 0
+        self._read_ahead()
+        return self.rows
+
+    def next(self) -> List[tuple]:
+        """Move to the following page (read ahead if possible) and return it; stays put at the end."""
+        if not self.rows:
+            return self.rows
+        key  = self.key_of(self.rows[-1])
+        rows = None
+        if self._ahead and self._ahead[0] == key:
+            _, thread, result = self._ahead
+            thread.join()
+            if "error" in result:
+                raise result["error"]
+            rows = result["rows"]
+        if rows is None:
+            rows = self._fetch(after=key)
+        if rows:
+            self.rows  = rows
+            self.page += 1
+            self._read_ahead()
+        return self.rows
+
+    def previous(self) -> List[tuple]:
+        """Move to the page before the current one and return it."""
+        if not self.has_previous:
+            return self.rows
+        rows = self._fetch(before=self.key_of(self.rows[0]))
+        if not rows:  # the rows before were deleted meanwhile
+            return self.first()
+        self.rows  = rows
+        self.page -= 1
+        self._read_ahead()
+        return self.rows
+
+    def close(self):
+        if self._ahead:
+            self._ahead[1].join()
+        with self._lock:
+            self.connection.close()
+
+
+class TableSample:
+    """
+    Sample size of the sampled preview, typed as a percentage ("1%", "0.5 %") or a
+    number of rows ("1000"). A row target is turned into a percentage from the row
+    estimate of the optimizer statistics, oversampled because sampling by page only
+    approaches the requested fraction, the surplus being cut by the row limit.
+    """
+
+    OVERSAMPLING = 2
+
+    @staticmethod
+    def parse(text) -> tuple:
+        """(percent, None) or (None, row target) from the text of the sample size."""
+        text = str(text).strip().replace("'", "")
+        try:
+            value = float(text[:-1]) if text.endswith("%") else int(text)
+        except ValueError:
+            raise ValueError(f"Not a percentage or a number of rows: {text}")
+        if text.endswith("%"):
+            if not 0 < value <= 100:
+                raise ValueError("The sample percentage must be above 0 and at most 100")
+            return value, None
+        rows = value
+        if rows <= 0:
+            raise ValueError("The number of sampled rows must be positive")
+        return None, rows
+
+    @staticmethod
+    def percent_for(rows, estimate):
+        """Percentage to sample to get about *rows* rows from *estimate* rows; None if unknown."""
+        if not estimate or estimate <= 0:
+            return None
+        return max(0.000001, round(min(100.0, 100.0 * TableSample.OVERSAMPLING * rows / float(estimate)), 6))
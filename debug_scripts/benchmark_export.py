@@ -0,0 +1,80 @@
+import sys
+import argparse
+import csv
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+from BulkTransfer import Exporter, ExporterSQLite, ExporterPostgreSQL
+
+# Compares the grid export path (rows materialised as Python objects, formatted one
+# value at a time as PanelQueryResult.export_to_csv does) with the native exporters.
+
+def export_like_result_grid(connection, sql, path):
+    """Current path: fetchall() into Python rows, then per-value str() and newline stripping."""
+    cursor = connection.cursor()
+    cursor.execute(sql)
+    columns = [d[0] for d in cursor.description]
+    rows    = cursor.fetchall()
+    cursor.close()
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter='\t')
+        writer.writerow(columns)
+        for values in rows:
+            row = [
+                str(v).replace('\n', ' ').replace('\r', ' ') if v else ''
+                for v in values
+            ]
+            writer.writerow(row)
+    return len(rows)
+
+def make_sqlite_database(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE bench (id INTEGER PRIMARY KEY, name TEXT, amount REAL, created TEXT, note TEXT)")
+    conn.executemany(
+        "INSERT INTO bench VALUES (?, ?, ?, ?, ?)",
+        ((i, f"name {i}", i * 1.25, "2024-01-01 12:00:00", None if i % 3 else "a note") for i in range(rows))
+    )
+    conn.commit()
+    return conn
+
+def run(label, function, *args):
+    started = time.perf_counter()
+    count   = function(*args)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {count:>12,} rows  {elapsed:8.2f} s  {count / elapsed if elapsed else 0:>12,.0f} rows/s")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark result export paths')
+    parser.add_argument('--rows', type=int, default=500000, help='Rows in the generated SQLite table')
+    parser.add_argument('--pg-dsn',   help='PostgreSQL DSN to also benchmark COPY TO (e.g. "host=... dbname=... user=...")')
+    parser.add_argument('--pg-query', help='Query to export from PostgreSQL')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    out_path = os.path.join(work_dir, "out.csv")
+
+    conn = make_sqlite_database(os.path.join(work_dir, "bench.db"), args.rows)
+    sql  = "SELECT * FROM bench"
+    run("SQLite: result grid path",            export_like_result_grid, conn, sql, out_path)
+    run("SQLite: generic fetchmany exporter",  Exporter(conn).export, sql, out_path)
+    run("SQLite: direct iteration exporter",   ExporterSQLite(conn).export, sql, out_path)
+    conn.close()
+
+    if args.pg_dsn and args.pg_query:
+        import psycopg2
+        pg_conn = psycopg2.connect(args.pg_dsn)
+        run("PostgreSQL: result grid path",    export_like_result_grid, pg_conn, args.pg_query, out_path)
+        run("PostgreSQL: generic exporter",    Exporter(pg_conn).export, args.pg_query, out_path)
+        run("PostgreSQL: COPY TO exporter",    ExporterPostgreSQL(pg_conn).export, args.pg_query, out_path)
+        pg_conn.close()
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,20 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 import unittest
 import sqlite3
-from QueryManager import QueriesSQLite  # Import the QueriesSQLite class
+from QueryManager import QueriesSQLite, QueriesOracle, QueriesPostgreSQL, QueryManager  # Import the QueriesSQLite class
+from SQLScript    import SQLScript
+from BulkTransfer import ColumnTypeMapper, DelimitedFileReader, BulkLoaderSQLite
+from BulkTransfer import ExporterSQLite, TablePartitioner, ParallelTableExport, TableCopy, SnapshotStore, TableDiff
+from BulkTransfer import SchemaCatalog, SchemaDiff, ParallelRowCount
+from ResultStore  import ResultStore, ResultDiff, LocalResultDatabase, LobValue
+from CatalogModel import DatabaseCatalog, MetadataCache, CatalogPrefetcher
+from TableBrowser import KeysetPager, TableSample
+from ColumnProfiler import ColumnProfiler
+from decimal      import Decimal
+import datetime
+import tempfile
+import os
+import shutil
 
 class TestQueriesSQLite(unittest.TestCase):
     def setUp(self):
@@ -29,5 +42,734 @@ class TestQueriesSQLite(unittest.TestCase):
         count = self.cursor.fetchone()[0]
         self.assertEqual(count, 2)  # Assuming we have 2 tables with names starting with 'test'
 
+class SQLiteConnectionHolder:
+    """Minimal stand-in for DBConnection around an already opened sqlite3 connection."""
+    def __init__(self, conn):
+        self.current_connection = conn
+        self.current_connection_type = "SQLite"
+
+    def get_connection_type(self):
+        return self.current_connection_type
+
+    def get_queries_instance(self, connection):
+        return QueriesSQLite()
+
+class TestSQLScript(unittest.TestCase):
+    def test_split_statements_keeps_plsql_blocks(self):
+        script = (
+            "INSERT INTO t VALUES (1, 'a;b');\n"
+            "BEGIN\n  x := 1;\nEND;\n/\n"
+            "SELECT 1"
+        )
+        statements = SQLScript.split_statements(script)
+        self.assertEqual(statements, ["INSERT INTO t VALUES (1, 'a;b')", "BEGIN\n  x := 1;\nEND;", "SELECT 1"])
+
+    def test_identical_inserts_are_batched(self):
+        statements = [
+            "INSERT INTO t (a, b) VALUES (1, 'x')",
+            "INSERT INTO t (a, b) VALUES (2, NULL)",
+            "INSERT INTO t (a, b) VALUES (3, 'it''s')",
+            "SELECT * FROM t WHERE d = DATE '2020-01-01'",
+        ]
+        items = SQLScript.group_statements(statements)
+        self.assertEqual([kind for kind, _ in items], ['batch', 'single'])
+        batch = items[0][1]
+        self.assertEqual(batch.parameterized_sql('qmark'), "INSERT INTO t (a, b) VALUES (?, ?)")
+        self.assertEqual(batch.rows, [(1, 'x'), (2, None), (3, "it's")])
+
+        # Only VALUES items and SET/WHERE '=' operands are values: not ordinals,
+        # function arguments or CASE operands
+        shape = SQLScript.parse_dml_shape("INSERT INTO s SELECT a, COUNT(*) + 1 FROM t WHERE b = 'x' GROUP BY 1 ORDER BY 1, 2")
+        self.assertEqual(shape.values, ('x',))
+        shape = SQLScript.parse_dml_shape(
+            "UPDATE t SET a = SUBSTR('abc', 1, 2), b = CASE WHEN c = 1 THEN 'y' ELSE 'n' END, d = -5 "
+            "WHERE (e = 'k' OR e IN (1, 2))")
+        self.assertEqual(shape.values, (5, 'k'))
+        self.assertEqual(SQLScript.parse_dml_shape("INSERT INTO t (a) VALUES (-1), (UPPER('x'))").values, (1,))
+        # Statements returning rows are never batched
+        self.assertIsNone(SQLScript.parse_dml_shape("INSERT INTO t (a) VALUES (1) RETURNING a"))
+        self.assertIsNone(SQLScript.parse_dml_shape("INSERT INTO t (a) OUTPUT inserted.a VALUES (1)"))
+
+    def test_execute_script_batches_and_commits(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE TABLE t (a INTEGER, b TEXT)")
+        query_manager = QueryManager(SQLiteConnectionHolder(conn), None)
+        query_manager.dml_batch_size = 2
+        script = ";\n".join(f"INSERT INTO t (a, b) VALUES ({i}, 'v{i}')" for i in range(5)) + ";\nSELECT COUNT(*) FROM t"
+        result = query_manager.execute_script(script)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["rows"], [(5,)])
+
+        # A failing chunk commits none of its rows, even those before the failing statement
+        conn.execute("CREATE UNIQUE INDEX t_a ON t (a)")
+        script = ";\n".join(f"INSERT INTO t (a, b) VALUES ({a}, 'w')" for a in (10, 11, 12, 4))
+        result = query_manager.execute_script(script)
+        self.assertFalse(result["success"])
+        self.assertIn("Statement 4 failed", result["error"])
+        self.assertEqual([a for a, in conn.execute("SELECT a FROM t WHERE a >= 10 ORDER BY a")], [10, 11])
+        conn.close()
+
+    def test_manual_mode_keeps_changes_until_commit(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE TABLE t (a INTEGER PRIMARY KEY)")
+        query_manager = QueryManager(SQLiteConnectionHolder(conn), None)
+        query_manager.set_auto_commit(False)
+
+        self.assertTrue(query_manager.execute_query("INSERT INTO t (a) VALUES (1)")["success"])
+        self.assertTrue(query_manager.transaction_pending)
+        script = "INSERT INTO t (a) VALUES (2);\nINSERT INTO t (a) VALUES (1);\nINSERT INTO t (a) VALUES (3)"
+        self.assertFalse(query_manager.execute_script(script)["success"])
+        # The failed batch is undone as a whole, up to its savepoint; earlier work is kept
+        self.assertEqual(conn.execute("SELECT a FROM t ORDER BY a").fetchall(), [(1,)])
+
+        # A failed file import goes back to its own savepoint the same way
+        guarded = query_manager.begin_guarded(query_manager.IMPORT_SAVEPOINT)
+        BulkLoaderSQLite(conn, QueriesSQLite(), "main", "t", [("a", "INTEGER", None, None, None, 'N')]).load_values([(5,), (6,)])
+        query_manager.end_guarded(query_manager.IMPORT_SAVEPOINT, guarded, success=False)
+        self.assertTrue(guarded)
+        self.assertEqual(conn.execute("SELECT a FROM t ORDER BY a").fetchall(), [(1,)])
+        self.assertTrue(query_manager.transaction_pending)
+
+        query_manager.rollback()
+        self.assertFalse(query_manager.transaction_pending)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone(), (0,))
+        conn.close()
+
+    def test_column_names_are_cached_until_ddl(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (a INTEGER, b TEXT)")
+        query_manager = QueryManager(SQLiteConnectionHolder(conn), None)
+
+        self.assertEqual(query_manager.get_column_names("main", "t"), ["a", "b"])
+        conn.execute("ALTER TABLE t ADD COLUMN c TEXT")  # behind the app's back: still cached
+        self.assertEqual(query_manager.get_column_names("main", "t"), ["a", "b"])
+        self.assertTrue(query_manager.execute_query("/* app */ ALTER TABLE t ADD COLUMN d TEXT")["success"])
+        self.assertEqual(query_manager.get_column_names("main", "t"), ["a", "b", "c", "d"])
+        self.assertFalse(SQLScript.is_ddl("SELECT * FROM t"))
+        conn.close()
+
+    def test_timeout_and_fetch_limits(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (a INTEGER, b TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, "x" * 100) for i in range(2500)])
+        query_manager = QueryManager(SQLiteConnectionHolder(conn), None)
+
+        runaway = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n"
+        result  = query_manager.execute_query(runaway, {"timeout": 0.2})
+        self.assertFalse(result["success"])
+        self.assertTrue(result["timeout"])
+        self.assertIn("0.2 s timeout", result["error"])
+        # The progress handler is removed once the statement is done
+        self.assertEqual(query_manager.execute_query("SELECT count(*) FROM t")["rows"], [(2500,)])
+
+        # Batched DML is bounded too; other errors are not taken for timeouts
+        conn.execute("CREATE TABLE s (a INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TRIGGER slow BEFORE INSERT ON s WHEN NEW.a > 1 BEGIN SELECT count(*) FROM t x, t y, t z; END")
+        conn.commit()
+        result = query_manager.execute_script("INSERT INTO s VALUES (2);\nINSERT INTO s VALUES (3);", {"timeout": 0.2})
+        self.assertIn("0.2 s timeout", result["error"])
+        result = query_manager.execute_script("INSERT INTO s VALUES (1);\nINSERT INTO s VALUES (1);", {"timeout": 0.2})
+        self.assertIn("UNIQUE", result["error"])
+        self.assertNotIn("timeout", result["error"])
+        self.assertTrue(QueryManager.is_timeout(Exception("HYT00", "[HYT00] Query timeout expired")))
+        self.assertTrue(QueryManager.is_timeout(Exception("DPY-4024: call timeout of 200 ms exceeded")))
+        self.assertFalse(QueryManager.is_timeout(Exception("ORA-00001: unique constraint violated")))
+
+        query_manager.connection_name   = "local"
+        query_manager.connection_limits = {"local": {"max_rows": 1000}}
+        result = query_manager.execute_query("SELECT a FROM t ORDER BY a")
+        self.assertEqual((len(result["rows"]), result["rows"][-1]), (1000, (999,)))
+        self.assertIn("1'000 rows", result["truncated"])
+        self.assertNotIn("truncated", query_manager.execute_query("SELECT a FROM t LIMIT 1000"))
+        result = query_manager.execute_query("SELECT * FROM t", {"max_rows": 0, "max_bytes": 50000})
+        self.assertEqual(len(result["rows"]), 1000)  # whole fetch chunks, cut past about 50 KB
+        self.assertIn("MB", result["truncated"])
+        conn.close()
+
+class TestBulkTransfer(unittest.TestCase):
+    def test_type_mapper_converts_by_column_type(self):
+        structure = [
+            ("ID",      "NUMBER",    22,   10,   0,    "N"),
+            ("AMOUNT",  "NUMBER",    22,   10,   2,    "Y"),
+            ("CREATED", "timestamp", None, None, None, "Y"),
+            ("NAME",    "VARCHAR2",  50,   None, None, "Y"),
+        ]
+        mapper = ColumnTypeMapper(structure)
+        self.assertEqual(mapper.convert_row(["7", "1.50", "2024-01-02 03:04:05", ""]),
+                         (7, Decimal("1.50"), datetime.datetime(2024, 1, 2, 3, 4, 5), None))
+        with self.assertRaises(ValueError):
+            mapper.convert_row(["x", "1", "", ""])
+
+    def test_sqlite_loader_streams_file_with_header(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE TABLE t (a INTEGER, b TEXT)")
+        with tempfile.NamedTemporaryFile('w', suffix='.tsv', delete=False, newline='') as f:
+            f.write("b\ta\nx\t1\n\t2\ny\n")
+            path = f.name
+        try:
+            reader = DelimitedFileReader(path)
+            self.assertEqual(reader.peek_row(), ["b", "a"])
+            reader.skip_row()
+            loader = BulkLoaderSQLite(conn, QueriesSQLite(), "main", "t",
+                                      [("b", "TEXT", None, None, None, "Y"), ("a", "INTEGER", None, None, None, "Y")])
+            loader.load(reader.read_chunk(100), 1)
+            reader.close()
+        finally:
+            os.remove(path)
+        self.assertEqual(loader.rows_loaded, 2)
+        self.assertEqual(loader.errors, [(3, "expected 2 field(s), found 1")])
+        self.assertEqual(conn.execute("SELECT a, b FROM t ORDER BY a").fetchall(), [(1, 'x'), (2, None)])
+        conn.close()
+
+class SQLiteFilePool:
+    """ConnectionPool stand-in opening thread-shareable connections to one SQLite file."""
+    def __init__(self, path):
+        self.path = path
+        self.opened = []
+
+    def acquire(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.opened.append(conn)
+        return conn
+
+    def release(self, connection):
+        pass
+
+class TestParallelTableExport(unittest.TestCase):
+    def test_partitions_cover_every_row_once(self):
+        work_dir = tempfile.mkdtemp()
+        db_path  = os.path.join(work_dir, "source.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", ((i, f"v{i}") for i in range(1, 1001)))
+        conn.commit()
+
+        structure = conn.execute(QueriesSQLite.get_table_structure("main", "t")).fetchall()
+        strategy, predicates = TablePartitioner(QueriesSQLite(), "main", "t").plan(conn.cursor(), ["id"], structure, 8)
+        self.assertEqual(len(predicates), 8)
+        self.assertEqual(sum(conn.execute(f"SELECT COUNT(*) FROM t WHERE {p}").fetchone()[0] for p in predicates), 1000)
+        conn.close()
+
+        output = os.path.join(work_dir, "out.csv")
+        pool   = SQLiteFilePool(db_path)
+        job    = ParallelTableExport(pool, lambda c, header: ExporterSQLite(c, header=header),
+                                     "SELECT * FROM t", predicates, output, merge=True)
+        job.start(3)
+        for thread in job._threads:
+            thread.join()
+        self.assertTrue(job.finish())
+        with open(output, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "id\tv")
+        self.assertEqual(lines[1:], [f"{i}\tv{i}" for i in range(1, 1001)])
+        for c in pool.opened:
+            c.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+class TestRowCounts(unittest.TestCase):
+    def test_statistics_estimate_and_parallel_exact_counts(self):
+        work_dir = tempfile.mkdtemp()
+        db_path  = os.path.join(work_dir, "counts.db")
+        conn = sqlite3.connect(db_path)
+        for table, rows in (("a", 300), ("b", 20), ("c", 0)):
+            conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, v TEXT)")
+            conn.execute(f"CREATE INDEX {table}_v ON {table} (v)")
+            conn.executemany(f"INSERT INTO {table} VALUES (?, ?)", ((i, f"v{i}") for i in range(rows)))
+        conn.commit()
+        conn.execute("ANALYZE")
+        self.assertEqual(dict(conn.execute(QueriesSQLite.get_estimated_row_counts_sql("main")).fetchall()),
+                         {"a": 300, "b": 20})  # no statistics row for the empty table
+        sizes = {name: (rows, size) for name, rows, size in conn.execute(QueriesSQLite.get_table_sizes_sql("main"))}
+        self.assertEqual({name: rows for name, (rows, _) in sizes.items()}, {"a": 300, "b": 20, "c": 0})
+        self.assertEqual(sizes["c"][1], 2 * conn.execute("PRAGMA page_size").fetchone()[0])  # table and index pages
+        conn.close()
+
+        pool = SQLiteFilePool(db_path)
+        job  = ParallelRowCount(pool, QueriesSQLite(), [("main", "a"), ("main", "b"), ("main", "c"), ("main", "missing")])
+        job.start(2)
+        for thread in job._threads:
+            thread.join()
+        self.assertEqual(job.counts, {("main", "a"): 300, ("main", "b"): 20, ("main", "c"): 0})
+        self.assertEqual(list(job.errors), [("main", "missing")])
+        for c in pool.opened:
+            c.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+class TestTableCopy(unittest.TestCase):
+    def test_copy_streams_rows_into_created_table(self):
+        source = sqlite3.connect(':memory:', check_same_thread=False)
+        source.execute("CREATE TABLE t (id INTEGER, amount DECIMAL(10,2), name VARCHAR(20))")
+        source.executemany("INSERT INTO t VALUES (?, ?, ?)", ((i, i / 4, None if i % 2 else f"n{i}") for i in range(25000)))
+        target = sqlite3.connect(':memory:', check_same_thread=False)
+
+        structure   = source.execute(QueriesSQLite.get_table_structure("main", "t")).fetchall()
+        definitions = [(row[0], QueriesSQLite.get_column_type_sql(ColumnTypeMapper.category(row[1], row[4]), row[2], row[3], row[4]), True)
+                       for row in structure]
+        self.assertEqual([d[1] for d in definitions], ["INTEGER", "NUMERIC", "TEXT"])
+        target.execute(QueriesSQLite.get_create_table_sql("main", "copy", definitions))
+
+        loader = BulkLoaderSQLite(target, QueriesSQLite(), "main", "copy", [(d[0], d[1], None, None, None, 'Y') for d in definitions])
+        copy = TableCopy(source, "SELECT id, amount, name FROM t", target, loader)
+        copy.start()
+        for thread in copy._threads:
+            thread.join()
+        self.assertIsNone(copy.error)
+        self.assertEqual(copy.rows_copied, 25000)
+        self.assertEqual(target.execute("SELECT COUNT(*), SUM(amount), COUNT(name) FROM copy").fetchone(),
+                         source.execute("SELECT COUNT(*), SUM(amount), COUNT(name) FROM t").fetchone())
+        source.close()
+        target.close()
+
+class TestSnapshotStore(unittest.TestCase):
+    def _copy(self, source, sql, local, definitions, params=(), name="snap"):
+        loader = BulkLoaderSQLite(local, QueriesSQLite(), "main", name, [(d[0], d[1], None, None, None, 'Y') for d in definitions])
+        copy = TableCopy(source, sql, local, loader, params)
+        copy.start()
+        for thread in copy._threads:
+            thread.join()
+        self.assertIsNone(copy.error)
+
+    def test_replace_then_append_by_key(self):
+        work_dir = tempfile.mkdtemp()
+        try:
+            source = sqlite3.connect(':memory:', check_same_thread=False)
+            source.execute("CREATE TABLE t (id INTEGER, name TEXT)")
+            source.executemany("INSERT INTO t VALUES (?, ?)", ((i, f"n{i}") for i in range(1, 101)))
+            store = SnapshotStore("prod", work_dir)
+            self.assertEqual(store.connection_name, "prod-local")
+            local = store.connect()
+            definitions = [("id", "", True), ("name", "", True)]
+            sql = "SELECT id, name FROM t"
+
+            store.prepare_replace(local, "snap", definitions)
+            self._copy(source, sql, local, definitions)
+            self.assertEqual(store.record(local, "snap", sql, "id"), 100)
+            self.assertEqual(store.get(local, "snap")["last_key"], 100)
+
+            source.executemany("INSERT INTO t VALUES (?, ?)", ((i, f"n{i}") for i in range(101, 131)))
+            incremental, params = store.incremental_sql(QueriesSQLite(), sql, "id", store.get(local, "snap")["last_key"])
+            self.assertEqual(params, (100,))
+            self._copy(source, incremental, local, definitions, params)
+            self.assertEqual(store.record(local, "snap", sql, "id"), 130)
+            self.assertEqual(local.execute("SELECT COUNT(DISTINCT id), MAX(name) FROM snap").fetchone(), (130, "n99"))
+            local.close()
+            source.close()
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def test_typed_keys_of_query_snapshots(self):
+        work_dir = tempfile.mkdtemp()
+        try:
+            # Decimal and datetime keys, as fetched from Oracle through pyodbc
+            description = [("K", Decimal, None, 22, 10, 2, True), ("D", datetime.datetime, None, 23, 0, 0, True),
+                           ("NAME", str, None, 20, 0, 0, True)]
+            definitions = SnapshotStore.column_definitions(description)
+            self.assertEqual([d[1] for d in definitions], ["NUMERIC", "TIMESTAMP", ""])
+
+            rows   = [(Decimal(i), datetime.datetime(2024, 1, i), f"n{i}") for i in range(1, 13)]
+            store  = SnapshotStore("prod", work_dir)
+            local  = store.connect()
+            for name, key in (("by_k", "K"), ("by_d", "D")):
+                store.prepare_replace(local, name, definitions)
+                BulkLoaderSQLite(local, QueriesSQLite(), "main", name,
+                                 [(d[0], d[1], None, None, None, 'Y') for d in definitions]).load_values(rows)
+                store.record(local, name, "SELECT ...", key)
+            # 12 and not '9': the key column compares as numbers
+            self.assertEqual(store.get(local, "by_k")["last_key"], Decimal(12))
+            self.assertEqual(store.get(local, "by_d")["last_key"], datetime.datetime(2024, 1, 12))
+            sql, params = store.incremental_sql(QueriesOracle(), "SELECT * FROM t WHERE n LIKE 'a%'", "D",
+                                                store.get(local, "by_d")["last_key"], "format")
+            self.assertTrue(sql.endswith('"D" > %s'))
+            self.assertIn("'a%%'", sql)
+            self.assertEqual(params, (datetime.datetime(2024, 1, 12),))
+            local.close()
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+class TestLocalResultDatabase(unittest.TestCase):
+    def test_join_tab_results_and_reload_on_change(self):
+        orders    = [(1, 10, Decimal("12.50")), (2, 11, Decimal("7.25")), (3, 10, None)]
+        customers = [(10, "Ann"), (11, "Bob")]
+        tab_results = {
+            "tab_1": {"type": "results", "columns": ["ID", "CUSTOMER_ID", "AMOUNT"], "rows": orders},
+            "tab_2": {"type": "results", "columns": ["ID", "NAME"], "rows": customers},
+            "tab_3": {"type": "error", "error": "boom"},
+        }
+        db = LocalResultDatabase()
+        db.sync(tab_results)
+        self.assertEqual(db.tables(), ["tab_1", "tab_2"])
+        result = db.execute_query(
+            "SELECT c.name, SUM(o.amount) FROM tab_1 o JOIN tab_2 c ON c.id = o.customer_id GROUP BY c.name ORDER BY 1"
+        )
+        self.assertTrue(result["success"])
+        self.assertEqual(result["rows"], [("Ann", 12.5), ("Bob", 7.25)])
+
+        tab_results["tab_2"] = {"type": "results", "columns": ["ID", "ID"], "rows": [(10, 1)]}
+        del tab_results["tab_1"]
+        db.sync(tab_results)
+        self.assertEqual(db.tables(), ["tab_2"])
+        self.assertEqual(db.execute_query("SELECT id, id_2 FROM tab_2")["rows"], [(10, 1)])
+        self.assertFalse(db.execute_query("SELECT * FROM tab_1")["success"])
+        db.close()
+
+class TestResultStore(unittest.TestCase):
+    def test_multi_key_sort_is_type_aware_and_stable(self):
+        rows = [
+            (1, "b", Decimal("10")),
+            (2, "a", None),
+            (3, "b", Decimal("9.5")),
+            (4, "a", Decimal("100")),
+            (5, None, Decimal("9.5")),
+        ]
+        store = ResultStore(["ID", "NAME", "AMOUNT"], rows)
+        # Numbers compare as numbers (9.5 < 10 < 100), NULLs last in both directions
+        self.assertEqual([rows[i][0] for i in store.sort([(2, False)])], [3, 5, 1, 4, 2])
+        self.assertEqual([rows[i][0] for i in store.sort([(2, True)])],  [4, 1, 3, 5, 2])
+        self.assertEqual([rows[i][0] for i in store.sort([(1, False), (2, True)])], [4, 2, 1, 3, 5])
+        self.assertIs(store.sort([(2, False)]), store.sort([(2, False)]))
+
+        mixed = ResultStore(["V"], [("x",), (2,), (None,), (1.5,)])
+        self.assertEqual(mixed.sort([(0, False)]), [3, 1, 0, 2])
+
+    def test_filter_terms_find_and_narrowing(self):
+        rows = [
+            (1, "Smith", Decimal("120.50"), datetime.date(2024, 3, 1)),
+            (2, "smithers", Decimal("80"), datetime.date(2023, 12, 31)),
+            (3, "Jones", None, None),
+            (4, "Smithson", Decimal("1000"), datetime.date(2024, 6, 30)),
+        ]
+        store = ResultStore(["ID", "NAME", "AMOUNT", "CREATED"], rows)
+        terms = store.parse_filter("name ~ SMITH; Amount >= 100")
+        self.assertEqual(terms, [(1, "~", "SMITH"), (2, ">=", "100")])
+        self.assertEqual(store.filter(terms), [0, 3])
+        self.assertEqual(store.filter(store.parse_filter("created < 2024-04")), [0, 1])
+        self.assertEqual(store.filter([], "jon"), [2])
+        with self.assertRaises(ValueError):
+            store.parse_filter("missing = 1")
+
+        # Each extra character only rescans the previous matches
+        self.assertEqual(store.filter([], "smi"), [0, 1, 3])
+        self.assertTrue(store._narrows(store._last_filter, (), "smit"))
+        self.assertEqual(store.filter([], "smith"), [0, 1, 3])
+        self.assertFalse(store._narrows(store._last_filter, (), "mit"))
+        self.assertEqual(store.filter([(1, "!=", "smith")], "smith"), [1, 3])
+
+    def test_aggregate_is_decimal_exact(self):
+        rows  = [(Decimal("0.1"), "a"), (Decimal("0.2"), None), (None, "b"),
+                 (Decimal("12345678901234567890123456789.01"), "a")]
+        store = ResultStore(["AMOUNT", "CODE"], rows)
+        stats = store.aggregate(0)
+        self.assertEqual(stats["sum"], Decimal("12345678901234567890123456789.31"))
+        self.assertEqual((stats["count"], stats["nulls"], stats["distinct"]), (3, 1, 3))
+        self.assertEqual(store.aggregate(0, [0, 1])["avg"], Decimal("0.15"))
+        self.assertEqual(store.aggregate(1), {"count": 3, "nulls": 1, "distinct": 2, "min": "a", "max": "b"})
+
+    def test_large_values_become_lob_placeholders(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE docs (id INTEGER, body TEXT, data BLOB)")
+        conn.executemany("INSERT INTO docs VALUES (?, ?, ?)",
+                         [(1, "short", b"\x01"), (2, "line\n" * 500, bytes(range(256)) * 8)])
+        cursor  = conn.execute("SELECT id, body, data FROM docs ORDER BY id")
+        rows    = cursor.fetchall()
+        wrapped = LobValue.wrap_rows(rows, cursor.description)
+        self.assertEqual(wrapped[0], (1, "short", b"\x01"))
+        body, data = wrapped[1][1], wrapped[1][2]
+        self.assertIsInstance(body, LobValue)
+        self.assertEqual(body.load(), "line\n" * 500)
+        self.assertTrue(str(body).startswith("<CLOB 2'500 chars> line line"))
+        self.assertTrue(data.is_binary)
+        self.assertEqual(data.size(), 2048)
+        self.assertTrue(str(data).startswith("<BLOB 2'048 bytes> 00 01 02"))
+        self.assertEqual(ResultStore(["BODY"], [(body,), ("a",)]).aggregate(0)["max"], body)
+        conn.close()
+
+    def test_lob_columns_from_the_description_and_locator_previews(self):
+        class LOB:  # stand-in of an oracledb LOB locator
+            type = "DB_TYPE_CLOB"
+            def __init__(self, text):
+                self.text, self.reads = text, []
+            def size(self):
+                return len(self.text)
+            def read(self, offset=1, amount=None):
+                self.reads.append(amount)
+                return self.text[offset - 1:offset - 1 + amount if amount else None]
+
+        class DbType:
+            def __init__(self, name):
+                self.name = name
+
+        # pyodbc: a bounded VARCHAR is left alone, NVARCHAR(MAX) (size 0) and CLOB columns are wrapped
+        description = [("id", int, None, 10), ("code", str, None, 20), ("note", str, None, 0),
+                       ("doc", DbType("DB_TYPE_CLOB"), None, None)]
+        self.assertEqual(LobValue.large_columns(description), [2, 3])
+        rows = [(1, "x" * 20, "y" * 1500, LOB("z" * 5000)), (2, "a", "b", LOB("small"))]
+        self.assertIs(LobValue.wrap_rows(rows, description[:2]), rows)
+
+        wrapped = LobValue.wrap_rows(rows, description, inline_size=100)
+        large   = wrapped[0][3]
+        self.assertEqual(wrapped[0][1], "x" * 20)
+        self.assertIsInstance(wrapped[0][2], LobValue)
+        self.assertEqual(wrapped[1][3], "small")
+        self.assertFalse(large.loaded)
+        self.assertEqual(str(large), "<CLOB 5'000 chars> " + "z" * 80 + "...")
+        self.assertEqual(large._locator.reads, [80])
+        self.assertEqual(len(large.load()), 5000)
+
+class TestResultDiff(unittest.TestCase):
+    def test_diff_by_key_across_driver_types(self):
+        # Left as fetched from Oracle (Decimal, datetime), right from SQLite (int/float, text)
+        left  = [(Decimal(1), "a", Decimal("1.5"), datetime.datetime(2024, 1, 1, 12, 0)),
+                 (Decimal(2), "b", Decimal("2"),   datetime.datetime(2024, 1, 2, 0, 0)),
+                 (Decimal(3), "c", Decimal("3"),   None)]
+        right = [(1, "a", 1.5, "2024-01-01 12:00:00"),
+                 (2, "B", 2.0, "2024-01-02 00:00:00"),
+                 (4, "d", 4.0, None)]
+        diff = ResultDiff(["ID", "NAME", "AMOUNT", "CREATED"], ["id", "name", "amount", "created"], ["id"])
+        diff.compare([left[:2], left[2:]], [right])
+        self.assertEqual((diff.changed, diff.removed, diff.added), ([(2,)], [(3,)], [(4,)]))
+
+        keys = [key for _, key in diff.detail_keys()]
+        columns, rows = diff.detail_rows(diff.collect_rows([left], 0, keys), diff.collect_rows([right], 1, keys))
+        self.assertEqual(columns, ["Diff", "id", "NAME", "AMOUNT", "CREATED"])
+        self.assertEqual(rows[0][:3], ("changed", 2, "b → B"))
+        self.assertEqual(rows[0][3], Decimal("2"))
+        self.assertEqual([row[0] for row in rows], ["changed", "removed", "added"])
+
+        with self.assertRaises(ValueError):
+            ResultDiff(["ID"], ["OTHER"], ["id"])
+
+        # Values whose hash() collides are still told apart
+        diff = ResultDiff(["id", "v"], ["id", "v"], ["id"])
+        diff.compare([[(1, -1)]], [[(1, -2)]])
+        self.assertEqual(diff.changed, [(1,)])
+
+class TestTableDiff(unittest.TestCase):
+    def test_bisects_to_the_differing_rows(self):
+        left, right = sqlite3.connect(':memory:'), sqlite3.connect(':memory:')
+        for conn in (left, right):
+            conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+            conn.executemany("INSERT INTO t VALUES (?, ?)", ((i, f"n{i}") for i in range(1, 50001)))
+        right.execute("UPDATE t SET name = 'x' WHERE id = 123")
+        right.execute("DELETE FROM t WHERE id = 40000")
+        right.execute("INSERT INTO t VALUES (60000, 'new')")
+
+        side = lambda conn: {"connection": conn, "queries": QueriesSQLite(), "schema": "main", "table": "t", "columns": ["id", "name"]}
+        diff = TableDiff(side(left), side(right))
+        diff.leaf_rows = 500
+        diff.run()
+        self.assertFalse(diff.server_side)
+        self.assertEqual(diff.rows_hashed, 100000)  # every row hashed once, whatever the bisection depth
+        self.assertEqual((diff.changed, diff.removed, diff.added), (1, 1, 1))
+        self.assertEqual([row[:2] for row in diff.detail], [("changed", 123), ("removed", 40000), ("added", 60000)])
+        self.assertGreater(diff.rows_verified, 45000)
+        left.close()
+        right.close()
+
+        # Values whose hash() collides do not cancel out in the client checksums
+        left, right = sqlite3.connect(':memory:'), sqlite3.connect(':memory:')
+        for conn, value in ((left, -1), (right, -2)):
+            conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name INTEGER)")
+            conn.execute("INSERT INTO t VALUES (1, ?)", (value,))
+        diff = TableDiff(side(left), side(right))
+        diff.run()
+        self.assertEqual(diff.changed, 1)
+        left.close()
+        right.close()
+
+        # Oracle cannot concatenate or ORA_HASH a LOB: it is hashed by length and first characters
+        sql = QueriesOracle.get_range_checksum_sql("S", "T", ["ID", "DOC"], "1 = 1", {"DOC"})
+        self.assertIn('DBMS_LOB.GETLENGTH("DOC")', sql)
+        self.assertNotIn('ORA_HASH("DOC")', sql)
+
+class TestSchemaDiff(unittest.TestCase):
+    def test_diff_and_ddl_delta(self):
+        left, right = sqlite3.connect(':memory:'), sqlite3.connect(':memory:')
+        left.executescript("""
+            CREATE TABLE a (id INTEGER PRIMARY KEY, name TEXT, amount NUMERIC);
+            CREATE INDEX a_name ON a (name);
+            CREATE TABLE b (id INTEGER);
+            CREATE VIEW v AS SELECT id FROM a;
+        """)
+        right.executescript("""
+            CREATE TABLE A (id INTEGER PRIMARY KEY, name INTEGER, extra TEXT);
+            CREATE TABLE c (id INTEGER);
+            CREATE VIEW v AS SELECT id   FROM a;
+        """)
+        catalogs = [SchemaCatalog(conn, QueriesSQLite(), "main", "SQLite") for conn in (left, right)]
+        statements = []
+        left.set_trace_callback(statements.append)
+        for catalog in catalogs:
+            catalog.load()
+        left.set_trace_callback(None)
+        # 9 statements per schema, whatever the number of objects (pragma calls are traced as "--" lines)
+        self.assertEqual(len([sql for sql in statements if not sql.startswith("--")]), 9)
+        self.assertEqual(catalogs[0].tables["a"]["primary_key"], ["id"])
+        self.assertEqual(catalogs[0].tables["a"]["indexes"], {"a_name": (False, ("name",))})
+        diff = SchemaDiff(*catalogs)
+        diff.compare()
+        self.assertEqual(sorted(row[:3] for row in diff.rows), [
+            ("added", "column", "a.extra"), ("added", "table", "c"),
+            ("changed", "column", "a.name"), ("removed", "column", "a.amount"),
+            ("removed", "index", "a.a_name"), ("removed", "table", "b"),
+        ])
+        # The script runs on the right side as generated
+        right.executescript(diff.ddl_script())
+        catalogs[1] = SchemaCatalog(right, QueriesSQLite(), "main", "SQLite")
+        catalogs[1].load()
+        diff = SchemaDiff(*catalogs)
+        diff.compare()
+        self.assertEqual(sorted(row[:3] for row in diff.rows),
+                         [("added", "column", "a.extra"), ("added", "table", "c"), ("changed", "column", "a.name")])
+        left.close()
+        right.close()
+
+class TestCatalogModel(unittest.TestCase):
+    def test_lookup_search_and_path_without_the_tree(self):
+        catalog = DatabaseCatalog()
+        schema  = catalog.add_schema("hr", 3)
+        tables  = schema.folder('tables_folder')
+        for name in ("EMPLOYEES", "DEPARTMENTS", "JOB_HISTORY"):
+            tables.add(name, 'table')
+        triggers = tables.by_name["EMPLOYEES"].add('Triggers', 'triggers_folder')
+        trigger  = triggers.add("EMP_AUDIT", 'trigger')
+        catalog.render(trigger, "I042")
+
+        self.assertIs(catalog.object_of("I042"), trigger)
+        self.assertEqual([node.name for node in trigger.path()], ["hr", "Tables", "EMPLOYEES", "Triggers", "EMP_AUDIT"])
+        self.assertEqual(trigger.schema.name, "hr")
+        self.assertEqual([node.name for node in tables.matches("ment")], ["DEPARTMENTS"])
+
+        catalog.forget(tables)
+        self.assertIsNone(catalog.object_of("I042"))
+        self.assertEqual((tables.children, tables.loaded, tables.shown), ([], False, 0))
+
+    def test_prefetcher_fills_the_cache_on_its_own_connection(self):
+        work_dir = tempfile.mkdtemp()
+        db_path  = os.path.join(work_dir, "prefetch.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE a (id INTEGER PRIMARY KEY, v TEXT)")
+        conn.execute("CREATE TABLE b (id INTEGER PRIMARY KEY)")
+        conn.close()
+
+        cache = MetadataCache()
+        cache.put(QueriesSQLite.get_table_structure("main", "b"), ["cached"], [])
+
+        def plan():
+            yield QueriesSQLite.get_current_schema_sql()
+            schema = cache.get(QueriesSQLite.get_current_schema_sql())[1][0][0]
+            yield QueriesSQLite.get_all_table_names_in_schema(schema)
+            yield "SELECT * FROM missing_table"
+            for (table,) in cache.get(QueriesSQLite.get_all_table_names_in_schema(schema))[1]:
+                yield QueriesSQLite.get_table_structure(schema, table)
+
+        prefetcher = CatalogPrefetcher(lambda: sqlite3.connect(db_path, check_same_thread=False), cache, plan(), 0)
+        prefetcher.start()
+        prefetcher._thread.join()
+
+        self.assertEqual(prefetcher.statements_run, 4)  # the cached structure of b is skipped
+        self.assertNotIn("SELECT * FROM missing_table", cache)
+        self.assertEqual(len(cache.get(QueriesSQLite.get_table_structure("main", "a"))[1]), 2)
+        self.assertEqual(cache.get(QueriesSQLite.get_table_structure("main", "b"))[0], ["cached"])
+
+        # A result read before a clear (DDL run meanwhile) is not stored afterwards
+        generation = cache.generation
+        cache.clear()
+        cache.put("SELECT 1", ["x"], [(1,)], generation)
+        self.assertNotIn("SELECT 1", cache)
+        cache.put("SELECT 1", ["x"], [(1,)], cache.generation)
+        self.assertIn("SELECT 1", cache)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+class TestTableBrowser(unittest.TestCase):
+    def test_pages_forward_and_back_on_a_composite_key(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.execute("CREATE TABLE t (g TEXT, n INTEGER, v TEXT, PRIMARY KEY (g, n))")
+        conn.executemany("INSERT INTO t VALUES (?, ?, ?)", ((g, n, f"{g}{n}") for g in ("a", "b'c") for n in range(5)))
+        conn.commit()
+        expected = conn.execute("SELECT g, n, v FROM t ORDER BY g, n").fetchall()
+
+        pager = KeysetPager(conn, QueriesSQLite(), "main", "t", ["g", "n", "v"], ["G", "N"], page_size=4)
+        pages = [pager.first()]
+        while pager.has_next:
+            pages.append(pager.next())
+        self.assertEqual([row for page in pages for row in page], expected)
+        self.assertEqual((pager.page, len(pages[-1])), (2, 2))
+        self.assertEqual(pager.previous(), expected[4:8])
+        self.assertEqual(pager.previous(), expected[:4])
+        self.assertFalse(pager.has_previous)
+        pager.close()
+
+    def test_binds_key_values_of_any_type(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.execute("CREATE TABLE t (k BLOB, d TEXT, PRIMARY KEY (k, d))")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", ((bytes([i]), datetime.date(2024, 1, 1 + i)) for i in range(6)))
+        conn.commit()
+        expected = conn.execute("SELECT k, d FROM t ORDER BY k, d").fetchall()
+        pager = KeysetPager(conn, QueriesSQLite(), "main", "t", ["k", "d"], ["k", "d"], page_size=4)
+        self.assertEqual(pager.first() + pager.next(), expected)
+        self.assertEqual(pager.key_predicate((b"\x01", "x"), ">"), ('("k", "d") > (?, ?)', [b"\x01", "x"]))
+        pager.close()
+
+        numbered = KeysetPager(None, QueriesOracle(), "s", "t", ["A", "B"], ["A", "B"], paramstyle="numeric")
+        self.assertEqual(numbered.key_predicate((1, 2), "<"),
+                         ('"A" <= :1 AND (("A" < :2) OR ("A" = :3 AND "B" < :4))', [1, 1, 1, 2]))
+
+    def test_sample_sizes_and_sqlite_samples(self):
+        self.assertEqual(TableSample.parse(" 0.5 %"), (0.5, None))
+        self.assertEqual(TableSample.parse("1'000"), (None, 1000))
+        self.assertRaises(ValueError, TableSample.parse, "150%")
+        self.assertEqual(TableSample.percent_for(1000, 1000000), 0.2)
+        self.assertIsNone(TableSample.percent_for(1000, None))
+
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", ((i, f"v{i}") for i in range(1, 10001)))
+        conn.execute("CREATE VIEW w AS SELECT * FROM t")
+        rows = conn.execute(QueriesSQLite.get_sample_sql("main", "t", ["id", "v"], None, 50, False)).fetchall()
+        self.assertTrue(0 < len(rows) <= 50)
+        self.assertEqual(len({row[0] for row in rows}), len(rows))  # overlapping ranges do not repeat rows
+        rows = conn.execute(QueriesSQLite.get_sample_sql("main", "w", ["id"], 10, None, True)).fetchall()
+        self.assertTrue(500 < len(rows) < 1500)
+        conn.close()
+
+class TestColumnProfiler(unittest.TestCase):
+    def test_table_profile_in_one_query_matches_the_local_profile(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (id INTEGER, name TEXT, amount NUMERIC(10,2), data BLOB)")
+        conn.executemany("INSERT INTO t VALUES (?, ?, ?, ?)",
+                         [(1, "a", 10, b"x"), (2, "b", None, None), (3, "a", 20, None), (4, None, 30, None)])
+        structure = conn.execute(QueriesSQLite.get_table_structure("main", "t")).fetchall()
+        columns   = [row[0] for row in structure]
+        kinds     = [ColumnProfiler.kind_of(row[1], row[4], "SQLite") for row in structure]
+        self.assertEqual(kinds, ["numeric", "ordered", "numeric", "opaque"])
+
+        row     = conn.execute(QueriesSQLite.get_profile_sql('"t"', columns, kinds)).fetchone()
+        profile = {p[0]: p for p in ColumnProfiler.from_aggregate_row(columns, row)}
+        self.assertEqual(profile["name"][1:7], (4, 1, "25.0%", 2, "a", "b"))
+        self.assertEqual(profile["amount"][7], "20")
+        self.assertEqual(profile["data"][1:5], (4, 3, "75.0%", ""))
+
+        rows  = conn.execute("SELECT id, name, amount FROM t").fetchall()
+        local = {p[0]: p for p in ColumnProfiler.of_result(ResultStore(["id", "name", "amount"], rows))}
+        self.assertEqual(local["name"][1:7], profile["name"][1:7])
+        self.assertEqual(local["name"][8], "a (2), b (1)")
+        self.assertEqual(local["amount"][5:8], profile["amount"][5:8])
+
+        row = conn.execute(QueriesSQLite.get_profile_sql('"t"', columns, kinds, exact=False)).fetchone()
+        estimated = ColumnProfiler.with_statistics(ColumnProfiler.from_aggregate_row(columns, row), kinds,
+                                                   [("NAME", 2.0, ["a", "b"], [0.5, 0.25])])
+        self.assertEqual(estimated[1][4:], (2, "a", "b", "", "a (50.0%), b (25.0%)"))
+        self.assertEqual(estimated[0][4], "")
+        conn.close()
+
+    def test_unordered_types_get_no_min_max(self):
+        self.assertEqual([ColumnProfiler.kind_of("uuid", None, "PostgreSQL"), ColumnProfiler.kind_of("jsonb", None, "PostgreSQL"),
+                          ColumnProfiler.kind_of("UNIQUEIDENTIFIER", None, "MSSQL"), ColumnProfiler.kind_of("UUID", None, "SQLite")],
+                         ["unordered", "unordered", "unordered", "ordered"])
+        sql = QueriesPostgreSQL.get_profile_sql('"t"', ["u"], ["unordered"])
+        self.assertIn('COUNT(DISTINCT "u")', sql)
+        self.assertNotIn("MIN(", sql)
+        self.assertNotIn("mode()", sql)
+
 if __name__ == '__main__':
     unittest.main()